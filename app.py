@@ -1,20 +1,44 @@
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for, flash
+from flask import (Flask, render_template, jsonify, request, session, redirect, url_for, flash, has_request_context, g,
+                   Response, abort, send_from_directory)
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-import pandas as pd
-import random
+from werkzeug.security import generate_password_hash
 from flask_cors import CORS
 import requests
-from bs4 import BeautifulSoup
 import re
 import time
-from urllib.parse import quote
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import mimetypes
 import os
 import socket
+import secrets
+import tempfile
+from collections import Counter
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from functools import wraps
+from registry import AuctionRegistry, DEFAULT_AUCTION_ID, room_for
+from schema import create_schema
+from catalog import (EXCEL_FILE, SHEET_NAME, COLUMNS, Catalog, WorkbookWatcher, diff_player_data, index_map,
+                     is_foreign_player, read_player_data)
+from engine import AuctionEngine, AuctionError, Bidder, ClosedLots, LotSchedule, SQLiteStore, BID_INCREMENT
+from scoring import PlayerRatings, TeamStrength
+from lineup import best_xi, check_xi
+from export_to_excel import export_xlsx, iter_csv, iter_csv_zip
+from history import HISTORY_TABLES, DEFAULT_LIMIT, MAX_LIMIT, encode_cursor, parse_time, query_history
+from profiler import RequestProfiler
+from assets import AssetManifest, build as build_assets, is_stale as assets_stale
+from wire import WireCodec, ENCODED_EVENTS
+from images import ImageCache, ImageFetchError
+from player_sources import PlayerInfoSources
+from upstream import upstream_from_env
+from passwords import HashPool, HashPoolBusy, LoginGuard
+from throttle import BidThrottle
+from outbound import OutboundQueues
+from presence import Presence, FLUSH_INTERVAL as PRESENCE_INTERVAL
+from response_cache import ResponseCache, parse_if_none_match
+from metrics import REGISTRY as METRICS, SIZE_BUCKETS, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 def get_local_ip():
     """Get local IP address for network access"""
@@ -32,79 +56,239 @@ app.config['SECRET_KEY'] = 'ipl-auction-secret-key-change-in-production'
 app.config['DATABASE'] = 'auction.db'
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+# Serving mode, chosen by server.py before this module is imported: 'gevent' (cooperative,
+# monkey-patched) or 'threading' (one OS thread per request; also `python app.py`)
+app.config['SERVER_MODE'] = os.environ.get('SERVER_MODE', 'threading')
+ASYNC_MODE = app.config['SERVER_MODE'] == 'gevent'
+
+if ASYNC_MODE:
+    # Patched threads are greenlets; CPU-bound password hashing needs real OS threads to not stall them.
+    # SQLite calls stay inline: they take microseconds, less than a hop to a thread pool.
+    from gevent.threadpool import ThreadPoolExecutor as OSThreadPoolExecutor
+
 # Initialize extensions
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='gevent' if ASYNC_MODE else 'threading')
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-# Auction state (shared across all users)
-auction_state = {
-    'status': 'waiting',  # waiting, active, paused, completed
-    'current_player': None,
-    'current_player_index': 0,
-    'current_category': None,
-    'current_set': None,
-    'active_pool': None,  # Track which pool is active (format: "category_set")
-    'bids': {},  # {player_name: [{'user_id': X, 'amount': Y, 'timestamp': Z}]}
-    'sold_players': {},  # {player_name: {'user_id': X, 'amount': Y, 'team_name': Z}}
-    'start_time': None,
-    'room_id': 'main_auction_room'
-}
+# Metrics (exposed in Prometheus text format at /api/metrics)
+HTTP_SECONDS = METRICS.histogram('http_request_seconds', 'HTTP request latency', ['endpoint'])
+HTTP_REQUESTS = METRICS.counter('http_requests_total', 'HTTP responses by status', ['endpoint', 'status'])
+HTTP_IN_FLIGHT = METRICS.gauge('http_requests_in_flight', 'HTTP requests being handled', ['endpoint'])
+EVENT_SECONDS = METRICS.histogram('socketio_event_seconds', 'Socket.IO event handler latency', ['event'])
+EVENT_IN_FLIGHT = METRICS.gauge('socketio_events_in_flight', 'Socket.IO events being handled', ['event'])
+EVENT_ERRORS = METRICS.counter('socketio_event_errors_total', 'Socket.IO handlers that raised', ['event'])
+EMIT_BYTES = METRICS.histogram('socketio_emit_bytes', 'Serialized emit payload size', ['event'], SIZE_BUCKETS)
+EMIT_SECONDS = METRICS.histogram('socketio_emit_seconds', 'Time spent emitting an event', ['event'])
+DB_SECONDS = METRICS.histogram('db_query_seconds', 'SQLite statement latency', ['statement'])
+CACHE_REQUESTS = METRICS.counter('cache_requests_total', 'Cache lookups', ['cache', 'result'])
+CACHE_BYTES_SAVED = METRICS.counter('http_cache_bytes_saved_total', 'Response bytes not sent thanks to 304 Not Modified',
+                                    ['endpoint'])
+FETCH_SECONDS = METRICS.histogram('player_info_fetch_seconds', 'Internet player info fetch latency')
+SOURCE_REQUESTS = METRICS.counter('player_info_source_requests_total', 'Player info upstream requests',
+                                  ['source', 'result'])
+SOURCE_BYTES = METRICS.counter('player_info_source_bytes_total', 'Player info bytes transferred', ['source'])
+SOURCE_SECONDS = METRICS.histogram('player_info_source_seconds', 'Player info upstream request latency', ['source'])
+ERRORS = METRICS.counter('errors_total', 'Handled errors', ['where'])
+# BID_THROTTLE=off disables bid rate limiting (load tests of the raw bid path)
+BID_THROTTLE = os.environ.get('BID_THROTTLE', 'on') != 'off'
+BIDS_THROTTLED = METRICS.counter('bids_throttled_total', 'Bids turned away by the rate limiter', ['scope'])
+CONNECTED_CLIENTS = METRICS.gauge('socketio_connected_clients', 'Connected Socket.IO clients', ['auction'])
+ONLINE_USERS = METRICS.gauge('presence_online_users', 'Distinct users connected (tabs counted once)', ['auction'])
+PRESENCE_DIGESTS = METRICS.counter('presence_digests_total', 'Debounced presence digests broadcast', ['auction'])
+
+# Opt-in profiling: sample_rate of events run under cProfile, slow tracked events logged
+app.config['PROFILE_DIR'] = 'profiles'
+profiler = RequestProfiler(app.config['PROFILE_DIR'], sample_rate=0.0, slow_threshold_ms=250,
+                           slow_events=('place_bid', 'sell_player', '/api/player-info/<player_name>'))
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that records how long each statement takes"""
+    _labels = {}
+
+    def execute(self, sql, parameters=()):
+        label = self._labels.get(sql)
+        if label is None:
+            # e.g. "SELECT users", "INSERT bids" - cached per statement text
+            match = re.search(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+(\w+)', sql, re.IGNORECASE)
+            label = self._labels[sql] = f"{sql.split(None, 1)[0].upper()} {match.group(1) if match else ''}".strip()
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_SECONDS.observe(elapsed, label)
+            profiler.add_time(f'db:{label}', elapsed)
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_SECONDS.observe(elapsed, 'COMMIT')
+            profiler.add_time('db:COMMIT', elapsed)
+
+def get_db():
+    """Open a database connection whose cursors are timed"""
+    return sqlite3.connect(app.config['DATABASE'], factory=InstrumentedConnection)
+
+def instrument_event(event):
+    """Decorator: latency, in-flight and error metrics for a Socket.IO handler"""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            EVENT_IN_FLIGHT.inc(event)
+            token = profiler.begin(event)
+            try:
+                return f(*args, **kwargs)
+            except Exception:
+                EVENT_ERRORS.inc(event)
+                raise
+            finally:
+                EVENT_SECONDS.observe(profiler.end(token, args=args), event)
+                EVENT_IN_FLIGHT.dec(event)
+        return wrapper
+    return decorator
+
+# Clients that negotiated the compact wire encoding (see wire.py) {sid: room}. They join
+# '<room>:compact' instead of the room itself, plus WIRE_ROOM for team table updates.
+COMPACT_ENCODING = 'compact'
+WIRE_ROOM = 'wire_compact'
+compact_clients = {}
+compact_rooms = Counter()  # room -> compact clients in it
+
+def compact_room(room):
+    return f'{room}:compact'
+
+def encode_compact(event, data):
+    """Compact payload for an event, announcing any teams the clients have not seen yet"""
+    payload, new_teams = wire_codec.encode(event, data)
+    if new_teams:
+        socketio.emit('wire_teams', new_teams, room=WIRE_ROOM)
+    EMIT_BYTES.observe(len(json.dumps(payload, separators=(',', ':'))), f'{event}:compact')
+    return payload
+
+def send_event(event, data, room=None, **kwargs):
+    """Emit to a room (or back to the sender when no room is given), recording payload size"""
+    start = time.perf_counter()
+    EMIT_BYTES.observe(len(json.dumps(data, default=str, separators=(',', ':'))), event)
+    serialized = time.perf_counter()
+    if room is None:
+        if event in ENCODED_EVENTS and request.sid in compact_clients:
+            data = encode_compact(event, data)
+        emit(event, data, **kwargs)
+    else:
+        # Lagging connections get it through their coalescing queue instead (see outbound.py)
+        lagging = outbound.skip(room)
+        socketio.emit(event, data, room=room, skip_sid=lagging, **kwargs)
+        if compact_rooms[room]:
+            socketio.emit(event, encode_compact(event, data) if event in ENCODED_EVENTS else data,
+                          room=compact_room(room), skip_sid=lagging, **kwargs)
+        for sid in lagging:
+            if not outbound.enqueue(sid, event, data):
+                send_to_client(sid, event, data)  # Caught up in the meantime
+    done = time.perf_counter()
+    EMIT_SECONDS.observe(done - serialized, event)
+    profiler.add_time('serialize', serialized - start)
+    profiler.add_time(f'emit:{event}', done - serialized)
+
+# Auction instances, keyed by auction id (each has its own state and Socket.IO room)
+app.config['AUCTION_STORAGE'] = os.environ.get('AUCTION_STORAGE', 'auction_rooms')
+app.config['AUCTION_IDLE_TIMEOUT'] = 1800  # Seconds before an idle auction is evicted to disk
+app.config['BID_INCREMENT'] = BID_INCREMENT  # Cr between successive maximum-bid (proxy) bids
+auction_registry = AuctionRegistry(app.config['AUCTION_STORAGE'],
+                                   idle_timeout=app.config['AUCTION_IDLE_TIMEOUT'])
+# Which auction each Socket.IO connection joined {sid: auction_id}
+socket_auctions = {}
+
+def send_to_client(sid, event, data):
+    """Emit to one connection, in the encoding it negotiated"""
+    if event in ENCODED_EVENTS and sid in compact_clients:
+        data = encode_compact(event, data)
+    socketio.emit(event, data, to=sid)
+
+def transport_depth(sid):
+    """Packets waiting in a connection's Engine.IO queue (not yet taken by its poll/websocket)"""
+    eio_sid = socketio.server.manager.eio_sid_from_sid(sid, '/')
+    eio_socket = socketio.server.eio.sockets.get(eio_sid) if eio_sid else None
+    return eio_socket.queue.qsize() if eio_socket is not None else 0
+
+def resync_snapshot(sid):
+    """What a connection that fell too far behind gets instead of the messages it missed"""
+    auction_id = socket_auctions.get(sid)
+    if auction_id is None:
+        return []
+    auction = auction_registry.get(auction_id)
+    return [('auction_state', auction.state), ('team_strength', get_team_strength(auction).leaderboard())]
+
+OUTBOUND_INTERVAL = 0.1  # Seconds between outbound queue checks
+# OUTBOUND_QUEUES=off sends every broadcast to every connection as it happens (for comparison runs)
+OUTBOUND_QUEUES = os.environ.get('OUTBOUND_QUEUES', 'on') != 'off'
+OUTBOUND_DEPTH = METRICS.gauge('socketio_outbound_queue_depth',
+                               'Messages waiting for a connection (transport packets or coalesced queue)',
+                               ['auction', 'sid', 'queue'])
+OUTBOUND_COALESCED = METRICS.counter('socketio_outbound_coalesced_total',
+                                     'Messages to lagging connections superseded by a newer one', ['event'])
+OUTBOUND_RESYNCS = METRICS.counter('socketio_outbound_resyncs_total',
+                                   'Lagging connections whose queue was dropped for a state snapshot')
+outbound = OutboundQueues(send_to_client, transport_depth, resync_snapshot,
+                          on_resync=lambda sid: OUTBOUND_RESYNCS.inc(), on_coalesce=OUTBOUND_COALESCED.inc)
+outbound_pump = None
+
+def pump_outbound():
+    """Background task: move lagging connections in and out of their queues, export queue depths"""
+    while True:
+        socketio.sleep(OUTBOUND_INTERVAL)
+        try:
+            connections = dict(socket_auctions)
+            depths = outbound.pump({sid: room_for(auction_id) for sid, auction_id in connections.items()})
+            for sid, (transport, queued) in depths.items():
+                if sid not in socket_auctions:
+                    continue  # Disconnected meanwhile
+                OUTBOUND_DEPTH.set(connections[sid], sid, 'transport', value=transport)
+                OUTBOUND_DEPTH.set(connections[sid], sid, 'coalesced', value=queued)
+        except Exception as e:
+            ERRORS.inc('outbound')
+            print(f"Error pumping outbound queues: {e}")
+
+def start_outbound_pump():
+    global outbound_pump
+    if OUTBOUND_QUEUES and outbound_pump is None:
+        outbound_pump = socketio.start_background_task(pump_outbound)
+
+# Connected users per auction; joins and leaves go out as one debounced `presence` digest (see presence.py)
+presence = Presence()
+presence_pump = None
+
+def pump_presence():
+    """Background task: broadcast each auction's presence changes at most every PRESENCE_INTERVAL"""
+    while True:
+        socketio.sleep(PRESENCE_INTERVAL)
+        try:
+            for auction_id, digest in presence.flush().items():
+                ONLINE_USERS.set(auction_id, value=digest['online'])
+                PRESENCE_DIGESTS.inc(auction_id)
+                send_event('presence', digest, room=room_for(auction_id))
+        except Exception as e:
+            ERRORS.inc('presence')
+            print(f"Error broadcasting presence: {e}")
+
+def start_presence_pump():
+    global presence_pump
+    if presence_pump is None:
+        presence_pump = socketio.start_background_task(pump_presence)
 
 # Initialize database
 def init_db():
     """Initialize database with tables"""
-    conn = sqlite3.connect(app.config['DATABASE'])
-    c = conn.cursor()
-    
-    # Users table
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        team_name TEXT,
-        purse REAL DEFAULT 100.0,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    # Teams table (playing 11)
-    c.execute('''CREATE TABLE IF NOT EXISTS teams (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        player_name TEXT NOT NULL,
-        player_category TEXT,
-        purchase_price REAL,
-        position INTEGER,
-        is_captain INTEGER DEFAULT 0,
-        FOREIGN KEY (user_id) REFERENCES users (id),
-        UNIQUE(user_id, player_name)
-    )''')
-    
-    # Bids table
-    c.execute('''CREATE TABLE IF NOT EXISTS bids (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        player_name TEXT NOT NULL,
-        amount REAL NOT NULL,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        is_winning INTEGER DEFAULT 0,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
-    
-    # Auction log
-    c.execute('''CREATE TABLE IF NOT EXISTS auction_log (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        player_name TEXT NOT NULL,
-        category TEXT,
-        base_price REAL,
-        sold_to_user_id INTEGER,
-        final_price REAL,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (sold_to_user_id) REFERENCES users (id)
-    )''')
-    
+    conn = get_db()
+    create_schema(conn.cursor())
     conn.commit()
     conn.close()
 
@@ -119,7 +303,7 @@ class User(UserMixin):
 
 @login_manager.user_loader
 def load_user(user_id):
-    conn = sqlite3.connect(app.config['DATABASE'])
+    conn = get_db()
     c = conn.cursor()
     c.execute('SELECT id, username, email, team_name, purse FROM users WHERE id = ?', (user_id,))
     user_data = c.fetchone()
@@ -128,80 +312,388 @@ def load_user(user_id):
         return User(user_data[0], user_data[1], user_data[2], user_data[3], user_data[4])
     return None
 
-# Configuration
-EXCEL_FILE = 'AUCTION.xlsx'  # Make sure this matches your Excel file name
-SHEET_NAME = 0
-COLUMNS = [
-    'Indian Bat', 'Foreign Bat', 'Indian AR', 'Foreign AR',
-    'Indian Pace', 'Foreign Pace', 'Indian spin', 'Foreign spin', 'Wicketkeepers'
-]
-
-# Foreign player categories
-FOREIGN_CATEGORIES = ['Foreign Bat', 'Foreign AR', 'Foreign Pace', 'Foreign spin']
-
-def is_foreign_player(category):
-    """Check if player category is foreign"""
-    return category in FOREIGN_CATEGORIES
-
 # Admin username
 ADMIN_USERNAME = 'mithesh'
 
+# Password checks run on a bounded worker pool so a login burst can't block Socket.IO handlers.
+# LOGIN_HASH_WORKERS=0 checks inline on the request thread
+PASSWORD_HASH_QUEUE = METRICS.gauge('password_hash_queue_depth', 'Password hashes queued or running')
+PASSWORD_HASH_SECONDS = METRICS.histogram('password_hash_seconds', 'Login password check latency, including queueing')
+LOGIN_REJECTED = METRICS.counter('login_rejected_total', 'Logins turned away before checking the password', ['reason'])
+LOGIN_HASH_WORKERS = int(os.environ.get('LOGIN_HASH_WORKERS', 2))
+password_pool = HashPool(LOGIN_HASH_WORKERS, max_pending=64,
+                         on_depth=lambda depth: PASSWORD_HASH_QUEUE.set(value=depth),
+                         executor=OSThreadPoolExecutor(LOGIN_HASH_WORKERS) if ASYNC_MODE and LOGIN_HASH_WORKERS else None)
+login_guard = LoginGuard(max_attempts=10, window=60)  # Per client address and username
+
 # Global variable to store raw player data (unshuffled)
 raw_player_data = None
-# Store shuffled splits per category to ensure no duplicates between sets
-category_shuffled_splits = {}
+player_catalog = None
+player_ratings = None
+wire_codec = None
+catalog_watcher = None
+catalog_version = 0  # Bumped by every applied reload of AUCTION.xlsx
 # Cache for internet-fetched player data
 player_info_cache = {}
 
+def record_source_fetch(source, result, size, seconds):
+    SOURCE_REQUESTS.inc(source, result)
+    SOURCE_BYTES.inc(source, amount=size)
+    SOURCE_SECONDS.observe(seconds, source)
+
+# Wikipedia summaries first, article scraping as a fallback, then ESPN Cricinfo
+player_sources = PlayerInfoSources(upstream=upstream_from_env('PLAYER_INFO'), on_fetch=record_source_fetch)
+
 def load_raw_data():
     """Load Excel file and store raw player data"""
-    global raw_player_data
+    global raw_player_data, player_catalog, player_ratings, wire_codec
     
     if raw_player_data is not None:
         return raw_player_data
     
-    df = pd.read_excel(EXCEL_FILE, sheet_name=SHEET_NAME)
-    data = {}
-    
-    for col in COLUMNS:
-        if col not in df.columns:
-            continue
-        
-        players = df[col].dropna().astype(str).tolist()
-        players = [p.strip() for p in players if p.strip() and p.strip().lower() != 'nan']
-        
-        data[col] = {
-            'players': players,
-            'total': len(players)
-        }
-    
+    global catalog_watcher
+    catalog_watcher = WorkbookWatcher(EXCEL_FILE)  # Before reading, so an edit made meanwhile is seen
+    data = read_player_data(EXCEL_FILE, SHEET_NAME)
+    player_catalog = Catalog(data, known_names=PLAYER_DETAILS)
+    report_name_matches(player_catalog)
+    player_ratings = PlayerRatings(PLAYER_DETAILS, player_catalog)
+    wire_codec = WireCodec(player_catalog)
     raw_player_data = data
     return data
 
-def get_shuffled_set(category, set_num):
+def report_name_matches(catalog):
+    """Print sheet names matched by similarity, and known players the sheet never names"""
+    for player, known, score in catalog.fuzzy_matches():
+        print(f"Player name '{player}' matched to '{known}' (similarity {score:.2f})")
+    unmatched = catalog.unmatched()
+    if unmatched:
+        print(f"{len(unmatched)} players with stats or a critical base price are not in {EXCEL_FILE}: "
+              f"{', '.join(unmatched)}")
+
+def stored_catalog(fingerprint):
+    """The catalog recorded under a fingerprint, or None if it never was"""
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT data FROM catalogs WHERE fingerprint = ?', (fingerprint,))
+    row = c.fetchone()
+    conn.close()
+    return Catalog(json.loads(row[0]), known_names=PLAYER_DETAILS) if row else None
+
+def from_saved_catalog(fingerprint, decode):
+    """decode(catalog) against the catalog a row was saved with, remapped onto the current one
+
+    Rows hold catalog indices, which point at other players once AUCTION.xlsx
+    changes, so they are never read against a different catalog. None if the
+    row's catalog is unknown (older rows have no fingerprint) or it doesn't decode.
+    """
+    try:
+        if fingerprint == player_catalog.fingerprint:
+            return decode(player_catalog)
+        old_catalog = stored_catalog(fingerprint) if fingerprint else None
+        if old_catalog is None:
+            return None
+        _, delta = diff_player_data(old_catalog.data, player_catalog.data)
+        mapping = index_map(old_catalog, player_catalog, {old: new for old, new, _ in delta['renamed']})
+        return decode(old_catalog).remap(player_catalog, mapping)
+    except ValueError:
+        return None
+
+def player_key(player_name):
+    """Name player stats and fetched info are keyed by (spelling variants resolved)"""
+    load_raw_data()
+    return player_catalog.key(player_name)
+
+def get_auction(auction_id=None):
+    """Resolve the auction for this request (query arg for HTTP, joined auction for sockets)"""
+    if auction_id is None and has_request_context():
+        auction_id = socket_auctions.get(getattr(request, 'sid', None)) or request.args.get('auction')
+    return auction_registry.get(auction_id or DEFAULT_AUCTION_ID)
+
+def get_auction_id():
+    """Auction id requested via the `auction` query arg (defaults to the main auction)"""
+    return auction_registry.validate_id(request.args.get('auction') or DEFAULT_AUCTION_ID)
+
+def new_seed():
+    return secrets.randbelow(2 ** 31)
+
+def save_schedule(auction_id, schedule):
+    """Record an auction's lot schedule so it survives restarts"""
+    conn = get_db()
+    # The catalog too: closed lots share the schedule's catalog, so every fingerprint saved is on record
+    conn.cursor().execute('INSERT OR IGNORE INTO catalogs (fingerprint, data) VALUES (?, ?)',
+                          (schedule.catalog.fingerprint, json.dumps(schedule.catalog.data)))
+    conn.cursor().execute('INSERT OR REPLACE INTO auction_schedules (auction_id, seed, lots, splits, catalog) '
+                          'VALUES (?, ?, ?, ?, ?)',
+                          (auction_id, schedule.seed, schedule.to_bytes(),
+                           json.dumps(schedule.splits) if schedule.splits else None, schedule.catalog.fingerprint))
+    conn.commit()
+    conn.close()
+
+def keep_lot_on_block(state, schedule):
+    """Point the active pool's position at the lot on the block in a remapped schedule"""
+    current = (state.get('current_player') or {}).get('name')
+    if current and state['active_pool']:
+        category, set_num = state['current_category'], state['current_set']
+        position = schedule.position(category, set_num, current)
+        if position is not None:
+            state['current_player_index'] = position
+            state['lots_remaining'] = schedule.remaining(category, set_num, position)
+
+def get_schedule(auction=None):
+    """Lot schedule for an auction: the recorded one, or a new one from a fresh seed"""
+    load_raw_data()
+    auction = auction or get_auction()
+    if auction.schedule is None:
+        conn = get_db()
+        c = conn.cursor()
+        c.execute('SELECT seed, lots, splits, catalog FROM auction_schedules WHERE auction_id = ?', (auction.auction_id,))
+        row = c.fetchone()
+        conn.close()
+        schedule = None
+        if row:
+            seed, lots, splits, fingerprint = row
+
+            def decode(catalog):
+                return LotSchedule.from_bytes(catalog, seed, lots, json.loads(splits or '{}'))
+            # Pools keep their order when AUCTION.xlsx changed since (see from_saved_catalog)
+            schedule = from_saved_catalog(fingerprint, decode)
+            if schedule is None and fingerprint is None:
+                # Saved before fingerprints: the catalog it was built on is unknown, so it is
+                # read as is if it still fits (and from now on saved with a fingerprint)
+                try:
+                    schedule = decode(player_catalog)
+                except ValueError:
+                    pass
+            if schedule is None:
+                print(f"Auction {auction.auction_id}: the recorded schedule's catalog is unknown, "
+                      f"so the lot order is rebuilt from its seed ({seed})")
+                schedule = LotSchedule.build(player_catalog, seed)
+            if fingerprint != player_catalog.fingerprint:
+                keep_lot_on_block(auction.state, schedule)
+                save_schedule(auction.auction_id, schedule)
+        if schedule is None:
+            schedule = LotSchedule.build(player_catalog, new_seed())
+            save_schedule(auction.auction_id, schedule)
+        auction.schedule = schedule
+    return auction.schedule
+
+def get_closed_lots(auction=None):
+    """Closed-lot archive for an auction: the recorded one, or rebuilt from auction_log (sales only)"""
+    load_raw_data()
+    auction = auction or get_auction()
+    if auction.closed_lots is None:
+        conn = get_db()
+        c = conn.cursor()
+        c.execute('SELECT lots, catalog FROM closed_lots WHERE auction_id = ?', (auction.auction_id,))
+        row = c.fetchone()
+        closed = from_saved_catalog(row[1], lambda catalog: ClosedLots(catalog, row[0])) if row else None
+        if closed is None:
+            closed = ClosedLots(player_catalog)
+            c.execute('SELECT player_name, sold_to_user_id, final_price, timestamp FROM auction_log '
+                      'WHERE auction_id = ? ORDER BY id', (auction.auction_id,))
+            for player_name, user_id, price, timestamp in c.fetchall():
+                if player_name in closed.player_ids:
+                    # CURRENT_TIMESTAMP is UTC; live closes are stamped in local time (the engine's clock)
+                    closed_at = datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+                    closed.close(player_name, ClosedLots.SOLD, user_id, price, 0, closed_at)
+        conn.close()
+        auction.closed_lots = closed
+    return auction.closed_lots
+
+def get_engine(auction=None):
+    """Auction engine bound to an auction's state, the app database and its Socket.IO room"""
+    load_raw_data()
+    auction = auction or get_auction()
+    return AuctionEngine(
+        player_catalog,
+        SQLiteStore(get_db, auction.auction_id),
+        broadcast=lambda event, data: send_event(event, data, room=auction.room_id),
+        state=auction.state,
+        schedule=get_schedule(auction),
+        throttle=get_bid_throttle(auction),
+        proxies=auction.proxies,
+        increment=app.config['BID_INCREMENT'],
+        closed=get_closed_lots(auction)
+    )
+
+def get_bid_throttle(auction):
+    """Per-bidder and per-lot bid rate limits for an auction (in memory only)"""
+    if not BID_THROTTLE:
+        return None
+    if auction.bid_throttle is None:
+        auction.bid_throttle = BidThrottle(on_throttle=BIDS_THROTTLED.inc)
+    return auction.bid_throttle
+
+def get_team_strength(auction=None):
+    """Team strength scores for an auction, rebuilt from the database on first use"""
+    load_raw_data()
+    auction = auction or get_auction()
+    if auction.team_strength is None:
+        conn = get_db()
+        c = conn.cursor()
+        c.execute('SELECT id, team_name FROM users WHERE LOWER(username) != ? ORDER BY id', (ADMIN_USERNAME.lower(),))
+        teams = c.fetchall()
+        c.execute('SELECT sold_to_user_id, player_name FROM auction_log WHERE auction_id = ?', (auction.auction_id,))
+        purchases = c.fetchall()
+        conn.close()
+        strength = TeamStrength(player_ratings)
+        strength.rebuild(teams, purchases)
+        auction.team_strength = strength
+    return auction.team_strength
+
+def get_shuffled_set(category, set_num, auction=None):
     """Get a shuffled set for a category, ensuring no duplicates between sets"""
-    if raw_player_data is None:
-        load_raw_data()
-    
-    if category not in raw_player_data:
-        return []
-    
-    # If this category hasn't been shuffled yet, shuffle once and store both sets
-    if category not in category_shuffled_splits:
-        players = raw_player_data[category]['players'].copy()
-        random.shuffle(players)  # Shuffle once per category
-        
-        n = len(players)
-        mid = (n + 1) // 2
-        
-        # Store both sets so they remain consistent
-        category_shuffled_splits[category] = {
-            'set1': players[:mid],
-            'set2': players[mid:]
-        }
-    
-    # Return the appropriate set (already shuffled and split)
-    return category_shuffled_splits[category][f'set{set_num}']
+    return get_schedule(auction).players(category, set_num)
+
+# AUCTION.xlsx is polled for changes and reloaded in place (CATALOG_WATCH=off disables it)
+CATALOG_WATCH = os.environ.get('CATALOG_WATCH', 'on') != 'off'
+CATALOG_WATCH_INTERVAL = 2.0  # Seconds between polls; a change is read once it has settled for a poll
+CATALOG_RELOADS = METRICS.counter('catalog_reloads_total', 'AUCTION.xlsx reloads', ['result'])
+catalog_watch = None
+
+def protected_players(auctions):
+    """Players a reload must not rename, move or remove: sold in any auction, or on the block"""
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT DISTINCT player_name FROM auction_log')
+    names = {row[0] for row in c.fetchall()}
+    conn.close()
+    names.update(auction.state['current_player']['name'] for auction in auctions if auction.state.get('current_player'))
+    return names
+
+def remap_stored(old_catalog, catalog, mapping, live_ids):
+    """Remapped (schedule rows, closed-lot rows) of auctions not in memory; rows that no longer decode are left alone"""
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT auction_id, seed, lots, splits, catalog FROM auction_schedules')
+    schedules = []
+    for auction_id, seed, lots, splits, fingerprint in c.fetchall():
+        if auction_id in live_ids or fingerprint not in (old_catalog.fingerprint, None):
+            continue  # Saved against another catalog: remapped from that one when loaded
+        try:
+            schedule = LotSchedule.from_bytes(old_catalog, seed, lots, json.loads(splits or '{}'))
+        except ValueError:
+            continue
+        schedules.append((auction_id, schedule.remap(catalog, mapping)))
+    c.execute('SELECT auction_id, lots, catalog FROM closed_lots')
+    closed = []
+    for auction_id, lots, fingerprint in c.fetchall():
+        if auction_id in live_ids or fingerprint != old_catalog.fingerprint:
+            continue  # Saved against another catalog: remapped from that one when loaded
+        try:
+            closed.append((auction_id, ClosedLots(old_catalog, lots).remap(catalog, mapping)))
+        except ValueError:
+            continue
+    conn.close()
+    return schedules, closed
+
+def reload_catalog():
+    """Re-read AUCTION.xlsx and apply its changes to every auction in place
+
+    Returns the delta (see catalog.diff_player_data), or None if nothing changed.
+    Everything is computed against a snapshot first; the swap itself does no
+    I/O, and is retried if a lot closed or an auction loaded in the meantime.
+    """
+    global raw_player_data, player_catalog, player_ratings, wire_codec, catalog_version
+    load_raw_data()
+    sheet = read_player_data(EXCEL_FILE, SHEET_NAME)
+    # Evicted auctions with a lot on the block come back into memory, where their pool position is kept right
+    for auction_id in auction_registry.stored_ids():
+        if (auction_registry.stored_state(auction_id) or {}).get('current_player'):
+            auction_registry.get(auction_id)
+    for attempt in range(3):
+        old_catalog = player_catalog
+        auctions = auction_registry.live_instances()
+        for auction in auctions:
+            get_schedule(auction)
+            get_closed_lots(auction)
+        snapshot = [(auction, auction.schedule, auction.closed_lots, len(auction.closed_lots),
+                     (auction.state.get('current_player') or {}).get('name')) for auction in auctions]
+        data, delta = diff_player_data(old_catalog.data, sheet, protected_players(auctions))
+        for name, category in delta['kept']:
+            print(f"Catalog reload: kept '{name}' in {category} (sold or on the block)")
+        if not any(delta[change] for change in ('added', 'removed', 'renamed', 'moved')):
+            return None
+        catalog = Catalog(data, known_names=PLAYER_DETAILS)
+        mapping = index_map(old_catalog, catalog, {old: new for old, new, _ in delta['renamed']})
+        remapped = [(schedule.remap(catalog, mapping), closed.remap(catalog, mapping))
+                    for _, schedule, closed, _, _ in snapshot]
+        live_ids = {auction.auction_id for auction in auctions}
+        stored_schedules, stored_closed = remap_stored(old_catalog, catalog, mapping, live_ids)
+        ratings = PlayerRatings(PLAYER_DETAILS, catalog)
+        codec = WireCodec(catalog, epoch=wire_codec.epoch)
+        codec.teams = dict(wire_codec.teams)
+
+        # No I/O from here until every auction points at the new catalog
+        unchanged = player_catalog is old_catalog and {a.auction_id for a in auction_registry.live_instances()} == live_ids
+        unchanged = unchanged and all(
+            auction.schedule is schedule and auction.closed_lots is closed and len(closed) == lots
+            and (auction.state.get('current_player') or {}).get('name') == current
+            for auction, schedule, closed, lots, current in snapshot)
+        if not unchanged:
+            continue
+        raw_player_data, player_catalog, player_ratings, wire_codec = data, catalog, ratings, codec
+        changed_states = set()  # Auctions whose pool position or closed-lot counters moved
+        for (auction, _, _, _, current), (schedule, closed) in zip(snapshot, remapped):
+            auction.schedule, auction.closed_lots = schedule, closed
+            auction.team_strength = None  # Ratings are rebuilt against the new catalog
+            state = auction.state
+            before = (state['current_player_index'], state['lots_remaining'], state.get('closed'))
+            if current:
+                keep_lot_on_block(state, schedule)
+            state['closed'] = closed.summary()
+            if (state['current_player_index'], state['lots_remaining'], state['closed']) != before:
+                changed_states.add(auction.auction_id)
+        catalog_version += 1
+        break
+    else:
+        raise RuntimeError('Auctions kept changing during the catalog reload')
+
+    for auction in auctions:
+        save_schedule(auction.auction_id, auction.schedule)
+        SQLiteStore(get_db, auction.auction_id).record_closed_lots(auction.closed_lots)
+    for auction_id, schedule in stored_schedules:
+        save_schedule(auction_id, schedule)
+    for auction_id, closed in stored_closed:
+        SQLiteStore(get_db, auction_id).record_closed_lots(closed)
+    response_cache.bump(('catalog',), *(('schedule', auction_id) for auction_id in
+                                        live_ids | {auction_id for auction_id, _ in stored_schedules}))
+
+    # Clients get what changed (and the new pool sizes of the categories it touched), not a reload
+    touched = {category for change in ('added', 'removed', 'renamed') for *_, category in delta[change]}
+    touched.update(category for change in delta['moved'] for category in change[1:])
+    socketio.emit('wire_dictionary', wire_codec.dictionary(), room=WIRE_ROOM)
+    for auction in auctions:
+        category_info = {category: {'set1_count': auction.schedule.size(category, 1),
+                                    'set2_count': auction.schedule.size(category, 2),
+                                    'total': auction.schedule.size(category, 1) + auction.schedule.size(category, 2)}
+                         for category in touched if category in catalog.category_slices}
+        send_event('catalog_delta', dict(delta, version=catalog_version, category_info=category_info),
+                   room=auction.room_id)
+        if auction.auction_id in changed_states:
+            send_event('auction_state', auction.state, room=auction.room_id)
+    CATALOG_RELOADS.inc('applied')
+    print(f"Catalog reloaded (version {catalog_version}): {len(delta['added'])} added, {len(delta['removed'])} removed, "
+          f"{len(delta['renamed'])} renamed, {len(delta['moved'])} moved, {len(delta['kept'])} kept")
+    return delta
+
+def watch_catalog():
+    """Background task: reload AUCTION.xlsx after it changes"""
+    while True:
+        socketio.sleep(CATALOG_WATCH_INTERVAL)
+        try:
+            if catalog_watcher and catalog_watcher.changed():
+                if reload_catalog() is None:
+                    CATALOG_RELOADS.inc('unchanged')
+        except Exception as e:
+            CATALOG_RELOADS.inc('failed')
+            ERRORS.inc('catalog_reload')
+            print(f"Error reloading {EXCEL_FILE}: {e}")
+
+def start_catalog_watch():
+    global catalog_watch
+    if CATALOG_WATCH and catalog_watch is None:
+        catalog_watch = socketio.start_background_task(watch_catalog)
 
 # Removed unused load_and_prepare_data() function
 
@@ -231,13 +723,35 @@ def login():
     username = data.get('username', '').strip()
     password = data.get('password', '')
     
-    conn = sqlite3.connect(app.config['DATABASE'])
+    guard_key = (request.remote_addr, username.lower())
+    retry_after = login_guard.check(guard_key)
+    if retry_after:
+        LOGIN_REJECTED.inc('rate_limited')
+        response = jsonify({'success': False, 'message': 'Too many login attempts, please wait a minute'})
+        response.headers['Retry-After'] = str(int(retry_after) + 1)
+        return response, 429
+    
+    conn = get_db()
     c = conn.cursor()
     c.execute('SELECT id, username, email, team_name, purse, password_hash FROM users WHERE username = ?', (username,))
     user_data = c.fetchone()
     conn.close()
     
-    if user_data and check_password_hash(user_data[5], password):
+    valid = False
+    if user_data:
+        started = time.perf_counter()
+        try:
+            valid = password_pool.verify(user_data[5], password)
+        except (HashPoolBusy, FuturesTimeoutError) as e:
+            # Queue full, or queued but not hashed in time: the pool is saturated either way
+            LOGIN_REJECTED.inc('busy' if isinstance(e, HashPoolBusy) else 'timeout')
+            response = jsonify({'success': False, 'message': 'Server is busy, please try again'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started)
+    
+    if valid:
+        login_guard.reset(guard_key)
         user = User(user_data[0], user_data[1], user_data[2], user_data[3], user_data[4])
         login_user(user, remember=True)
         return jsonify({'success': True, 'user': {
@@ -265,41 +779,210 @@ def user_info():
         'purse': current_user.purse
     })
 
+@app.before_request
+def start_request_timer():
+    """Track in-flight requests and start the latency timer"""
+    g.metrics_endpoint = request.endpoint or 'unknown'
+    g.metrics_started = time.perf_counter()
+    g.profile_token = profiler.begin(request.url_rule.rule if request.url_rule else request.path)
+    HTTP_IN_FLIGHT.inc(g.metrics_endpoint)
+
+@app.before_request
+def reject_malformed_auction_id():
+    """A malformed ?auction= is a 400 here, not a ValueError in whichever route resolves it"""
+    auction_id = request.args.get('auction')
+    if auction_id:
+        try:
+            auction_registry.validate_id(auction_id)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.teardown_request
+def stop_request_timer(exc):
+    """Record request latency (runs even when the view raised)"""
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        profiler.end(g.pop('profile_token'), path=request.path)
+        HTTP_SECONDS.observe(time.perf_counter() - started, g.metrics_endpoint)
+        HTTP_IN_FLIGHT.dec(g.metrics_endpoint)
+        if exc is not None:
+            ERRORS.inc(g.metrics_endpoint)
+
 @app.after_request
 def after_request(response):
     """Add headers to prevent 403 errors"""
+    HTTP_REQUESTS.inc(request.endpoint or 'unknown', str(response.status_code))
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     return response
 
-@app.route('/api/init', methods=['POST'])
+# Fingerprinted static assets (built by assets.py): cached forever, new content gets a new URL
+ASSET_MAX_AGE = 365 * 24 * 3600
+asset_manifest = AssetManifest(app.static_folder)
+
+def prepare_assets():
+    """Rebuild fingerprinted assets if a source file changed since the last build"""
+    if assets_stale(app.static_folder):
+        build_assets(app.static_folder)
+    asset_manifest.load()
+
+@app.context_processor
+def asset_helpers():
+    def asset_url(filename):
+        hashed = asset_manifest.hashed(filename)
+        if hashed is None:
+            return url_for('static', filename=filename)  # Not built yet: plain static file
+        return url_for('serve_asset', filename=hashed)
+    return {'asset_url': asset_url}
+
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Serve a fingerprinted asset, precompressed when the browser accepts it"""
+    if filename not in asset_manifest.fingerprinted:
+        abort(404)
+    served, encoding = asset_manifest.variant(filename, request.headers.get('Accept-Encoding'))
+    response = send_from_directory(asset_manifest.dist_dir, served,
+                                   mimetype=mimetypes.guess_type(filename)[0], max_age=ASSET_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    return response
+
+# Player headshots: fetched once, resized and served from a content-addressed disk cache
+app.config['IMAGE_CACHE'] = 'image_cache'
+IMAGE_PREFETCH_LOTS = 3
+image_cache = ImageCache(app.config['IMAGE_CACHE'], upstream=upstream_from_env('IMAGE'))
+
+def player_image_source(player_name):
+    """Upstream headshot URL for a player (stats database first, then Wikipedia), or None"""
+    player_lower = player_key(player_name)
+    details = PLAYER_DETAILS.get(player_lower) or {}
+    return details.get('image_url') or player_info_cache.get(player_lower, {}).get('wikipedia_image')
+
+def player_image_url(player_name):
+    """Local URL for a player's headshot: the cached file if fetched, else the fetching proxy"""
+    source = player_image_source(player_name)
+    if not source:
+        return None
+    cached = image_cache.cached(source)
+    if cached:
+        return url_for('serve_image', filename=cached)
+    return url_for('player_image', player_name=player_name)
+
+def prefetch_images(auction=None):
+    """Warm the image cache for the lot on the block and the next few in its pool"""
+    engine = get_engine(auction)
+    current = engine.state['current_player']
+    names = ([current['name']] if current else []) + engine.upcoming(IMAGE_PREFETCH_LOTS)
+    image_cache.prefetch([player_image_source(name) for name in names])
+
+@app.route('/api/player-image/<player_name>')
+def player_image(player_name):
+    """Fetch a player's headshot into the cache and redirect to the cached copy"""
+    source = player_image_source(player_name)
+    if not source:
+        abort(404)
+    if image_cache.cached(source):
+        CACHE_REQUESTS.inc('player_image', 'hit')
+    else:
+        CACHE_REQUESTS.inc('player_image', 'miss')
+    try:
+        filename = image_cache.get(source)
+    except ImageFetchError as e:
+        ERRORS.inc('player_image')
+        print(f"Error caching image for {player_name}: {e}")
+        return redirect(source)  # Let the browser try the original
+    return redirect(url_for('serve_image', filename=filename))
+
+@app.route('/images/<filename>')
+def serve_image(filename):
+    """Serve a cached headshot; names are content hashes, so they never change"""
+    if not image_cache.is_stored(filename):
+        abort(404)
+    response = send_from_directory(os.path.abspath(image_cache.cache_dir), filename, max_age=ASSET_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    return response
+
+# Conditional GET for read-mostly endpoints (see response_cache.py). Scopes:
+# ('catalog',), ('schedule', auction_id) on reseed, ('sales', auction_id, category) on a sale
+response_cache = ResponseCache()
+
+def cache_session():
+    """Who bytes saved by 304s are counted for"""
+    if current_user.is_authenticated:
+        return f'user:{current_user.id}'
+    return f'addr:{request.remote_addr}'
+
+def cached_json(key, scopes, build):
+    """JSON response for build() with a version-based ETag: 304 if the client has it, else the cached body"""
+    etag = response_cache.etag(key, scopes)
+    if etag in parse_if_none_match(request.headers.get('If-None-Match')):
+        size = response_cache.size(key, etag) or 0  # Unknown if the body was evicted: nothing counted
+        CACHE_REQUESTS.inc('http', 'not_modified')
+        CACHE_BYTES_SAVED.inc(request.endpoint, amount=size)
+        response = Response(status=304)
+        response.headers['X-Bytes-Saved'] = str(response_cache.record_saved(cache_session(), size))
+    else:
+        body, hit = response_cache.body(key, etag, lambda: app.json.dumps(build()).encode())
+        CACHE_REQUESTS.inc('http', 'hit' if hit else 'miss')
+        response = Response(body, mimetype='application/json')
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'  # Always revalidate, but with If-None-Match
+    return response
+
+@app.route('/api/init', methods=['GET', 'POST'])
 def init_auction():
-    """Initialize auction - resets shuffle state and returns categories"""
+    """Initialize auction - builds the lot schedule from the recorded seed and returns categories
+
+    GET is cached with an ETag. POST only reseeds (admin): {"reseed": true} or {"seed": <seed>}.
+    """
     try:
-        global category_shuffled_splits
-        # Reset shuffled splits for a fresh auction
-        category_shuffled_splits = {}
-        
-        raw_data = load_raw_data()
+        auction = get_auction()
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if not (data.get('reseed') or data.get('seed') is not None):
+                return jsonify({'success': False, 'error': 'POST is for reseeding; use GET to load the auction'}), 400
+            # Fresh auction with a new (or given) seed: admin only, never mid-pool
+            if not (current_user.is_authenticated and current_user.username.lower() == ADMIN_USERNAME.lower()):
+                return jsonify({'success': False, 'error': 'Only admin can reshuffle the auction'}), 403
+            if auction.state['status'] == 'active' and auction.state['active_pool']:
+                return jsonify({'success': False, 'error': 'Pause or complete the active pool first'}), 409
+            try:
+                seed = int(data['seed']) if data.get('seed') is not None else new_seed()
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'error': 'Seed must be an integer'}), 400
+            schedule = get_engine(auction).reschedule(seed)
+            save_schedule(auction.auction_id, schedule)
+            auction.schedule = schedule
+            response_cache.bump(('schedule', auction.auction_id))
         
-        # Return category info without pre-shuffled data
-        categories_info = {}
-        for col in COLUMNS:
-            if col in raw_data:
-                total = raw_data[col]['total']
-                mid = (total + 1) // 2
-                categories_info[col] = {
-                    'set1_count': mid,
-                    'set2_count': total - mid,
-                    'total': total
-                }
+        def build():
+            # Same recorded seed -> same schedule, so page reloads never reshuffle
+            schedule = get_schedule(auction)
+            # Return category info without pre-shuffled data
+            categories_info = {}
+            for col in COLUMNS:
+                if col in raw_player_data:
+                    set1_count = schedule.size(col, 1)
+                    set2_count = schedule.size(col, 2)
+                    categories_info[col] = {
+                        'set1_count': set1_count,
+                        'set2_count': set2_count,
+                        'total': set1_count + set2_count
+                    }
+            return {
+                'success': True,
+                'auction_id': auction.auction_id,
+                'seed': schedule.seed,
+                'categories': COLUMNS,
+                'category_info': categories_info
+            }
         
-        return jsonify({
-            'success': True,
-            'categories': COLUMNS,
-            'category_info': categories_info
-        })
+        if request.method == 'POST':
+            return jsonify(build())  # The new schedule, never a 304
+        return cached_json(('init', auction.auction_id), (('catalog',), ('schedule', auction.auction_id)), build)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -308,56 +991,41 @@ def init_auction():
 
 @app.route('/api/get-category-set/<category>/<set_num>')
 def get_category_set(category, set_num):
-    """Get a freshly shuffled set for a category"""
+    """Get a category set in scheduled lot order"""
     try:
         set_num = int(set_num)
         if set_num not in [1, 2]:
             return jsonify({'success': False, 'error': 'Set number must be 1 or 2'}), 400
+        auction = get_auction()
         
-        players = get_shuffled_set(category, set_num)
-        
-        # Add base price information for each player
-        players_with_prices = []
-        for player in players:
-            players_with_prices.append({
-                'name': player,
-                'base_price': get_player_base_price(player),
-                'is_critical': is_critical_player(player)
-            })
+        def build():
+            players = get_shuffled_set(category, set_num, auction)
+            closed = get_closed_lots(auction)
+            # Add base price information for each player
+            players_with_prices = []
+            for player in players:
+                players_with_prices.append({
+                    'name': player,
+                    'base_price': player_catalog.base_price(player),
+                    'is_critical': player_catalog.is_critical(player),
+                    'sold': closed.outcome(player) == 'sold'
+                })
+            return {
+                'success': True,
+                'category': category,
+                'set': set_num,
+                'players': players_with_prices,
+                'count': len(players_with_prices)
+            }
         
-        return jsonify({
-            'success': True,
-            'category': category,
-            'set': set_num,
-            'players': players_with_prices,
-            'count': len(players_with_prices)
-        })
+        scopes = (('catalog',), ('schedule', auction.auction_id), ('sales', auction.auction_id, category))
+        return cached_json(('category_set', auction.auction_id, category, set_num), scopes, build)
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
-# Critical players list (will have base price of 3 cr, others get 1 cr)
-CRITICAL_PLAYERS = {
-    'virat kohli', 'rohit sharma', 'shubman gill', 'suryakumar yadav',
-    'ruturaj gaikwad', 'yashasvi jaiswal', 'shreyas iyer', 'hardik pandya',
-    'ravindra jadeja', 'jasprit bumrah', 'mohammed shami', 'mohammed siraj',
-    'yuzvendra chahal', 'kuldeep yadav', 'ravichandran ashwin',
-    'ms dhoni', 'rishabh pant', 'kl rahul', 'david warner', 'quinton de kock',
-    'andre russell', 'glenn maxwell', 'ben stokes', 'mitchell starc',
-    'pat cummins', 'trent boult', 'rashid khan', 'sunil narine',
-    'jos buttler', 'heinrich klaasen', 'dinesh karthik', 'sanju samson'
-}
-
-def is_critical_player(player_name):
-    """Check if a player is a critical player"""
-    return player_name.lower().strip() in CRITICAL_PLAYERS
-
-def get_player_base_price(player_name):
-    """Get base price for a player (3 cr for critical, 1 cr for others)"""
-    return 3 if is_critical_player(player_name) else 1
-
 # Player details database with stats and images
 PLAYER_DETAILS = {
     'shubman gill': {
@@ -718,11 +1386,14 @@ PLAYER_DETAILS = {
 
 def fetch_player_info_from_internet(player_name):
     """Fetch player information from internet sources"""
-    player_lower = player_name.lower().strip()
+    player_lower = player_key(player_name)
     
     # Check cache first
     if player_lower in player_info_cache:
+        CACHE_REQUESTS.inc('player_info', 'hit')
         return player_info_cache[player_lower]
+    CACHE_REQUESTS.inc('player_info', 'miss')
+    fetch_started = time.perf_counter()
     
     info = {
         'source': 'internet',
@@ -730,95 +1401,38 @@ def fetch_player_info_from_internet(player_name):
     }
     
     try:
-        # Try Wikipedia first for general information
-        wiki_url = f"https://en.wikipedia.org/wiki/{quote(player_name.replace(' ', '_'))}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        wiki_response = requests.get(wiki_url, headers=headers, timeout=5)
-        
-        if wiki_response.status_code == 200:
-            soup = BeautifulSoup(wiki_response.content, 'html.parser')
-            
-            # Extract description from Wikipedia
-            paragraphs = soup.find_all('p')
-            description = None
-            for p in paragraphs[:3]:  # Check first 3 paragraphs
-                text = p.get_text().strip()
-                if len(text) > 100 and player_name.split()[0].lower() in text.lower():
-                    description = text[:500]  # Limit to 500 characters
-                    break
-            
-            if description:
-                info['description'] = description + "... (Source: Wikipedia)"
-            
-            # Try to find infobox with basic stats
-            infobox = soup.find('table', class_='infobox')
-            if infobox:
-                # Extract birth date, nationality, etc.
-                rows = infobox.find_all('tr')
-                for row in rows:
-                    th = row.find('th')
-                    td = row.find('td')
-                    if th and td:
-                        key = th.get_text().strip().lower()
-                        value = td.get_text().strip()
-                        
-                        if 'born' in key or 'date of birth' in key:
-                            info['birth_info'] = value
-                        if 'nationality' in key or 'country' in key:
-                            info['nationality'] = value
-                        if 'nickname' in key:
-                            info['nickname'] = value
-            
-            # Try to find image
-            img = soup.find('img', class_=lambda x: x and 'thumb' in x.lower())
-            if img and img.get('src'):
-                img_url = img['src']
-                if img_url.startswith('//'):
-                    img_url = 'https:' + img_url
-                elif img_url.startswith('/'):
-                    img_url = 'https://en.wikipedia.org' + img_url
-                info['wikipedia_image'] = img_url
-        
-        # Try ESPN Cricinfo for cricket-specific stats
-        try:
-            cricinfo_search_url = f"https://www.espncricinfo.com/search?q={quote(player_name)}"
-            cricinfo_response = requests.get(cricinfo_search_url, headers=headers, timeout=5)
-            
-            if cricinfo_response.status_code == 200:
-                cricinfo_soup = BeautifulSoup(cricinfo_response.content, 'html.parser')
-                # Look for player profile link
-                profile_link = cricinfo_soup.find('a', href=lambda x: x and '/players/' in x)
-                if profile_link:
-                    info['cricinfo_url'] = 'https://www.espncricinfo.com' + profile_link['href']
-                    info['description'] = info.get('description', '') + f' View detailed stats on ESPN Cricinfo.'
-        except:
-            pass
+        fields, used = player_sources.fetch(player_name)
+        info.update(fields)
+        if used:
+            info['sources'] = used
         
         # Cache the result
         player_info_cache[player_lower] = info
         
     except requests.exceptions.Timeout:
         info['error'] = 'Request timeout - internet connection may be slow'
+        ERRORS.inc('player_info_timeout')
         print(f"Timeout fetching info for {player_name}")
         player_info_cache[player_lower] = info
     except requests.exceptions.ConnectionError:
         info['error'] = 'Connection error - check internet connection'
+        ERRORS.inc('player_info_connection')
         print(f"Connection error fetching info for {player_name}")
         player_info_cache[player_lower] = info
     except Exception as e:
+        ERRORS.inc('player_info')
         print(f"Error fetching info for {player_name}: {str(e)}")
         info['error'] = str(e)
         player_info_cache[player_lower] = info
     
+    fetch_time = time.perf_counter() - fetch_started
+    FETCH_SECONDS.observe(fetch_time)
+    profiler.add_time('fetch', fetch_time)
     return info
 
-@app.route('/api/player-info/<player_name>')
-def get_player_info(player_name):
-    """Get detailed information about a player including stats and image"""
-    player_lower = player_name.lower().strip()
+def player_info_payload(player_name):
+    """Detailed information about a player including stats and image"""
+    player_lower = player_key(player_name)
     
     # Try to find player in database first
     player_info = PLAYER_DETAILS.get(player_lower)
@@ -844,11 +1458,11 @@ def get_player_info(player_name):
         except:
             pass
         
-        return jsonify({
+        return {
             'success': True,
             'name': player_name,
-            'info': player_info
-        })
+            'info': dict(player_info, image_url=player_image_url(player_name))
+        }
     else:
         # Player not in database, try to fetch from internet
         category = get_player_category(player_name)
@@ -863,17 +1477,19 @@ def get_player_info(player_name):
                 **internet_info
             }
             
+            if combined_info.get('wikipedia_image'):
+                combined_info['image_url'] = player_image_url(player_name)
             if 'description' not in combined_info:
                 combined_info['description'] = f'{player_name} is a professional cricket player. Statistics and detailed information may be available from cricket databases.'
             
-            return jsonify({
+            return {
                 'success': True,
                 'name': player_name,
                 'info': combined_info
-            })
+            }
         except Exception as e:
             # Fallback to basic info if internet fetch fails
-            return jsonify({
+            return {
                 'success': True,
                 'name': player_name,
                 'info': {
@@ -882,116 +1498,127 @@ def get_player_info(player_name):
                     'description': f'{player_name} is part of the IPL auction pool. Detailed statistics coming soon!',
                     'image_url': None
                 }
-            })
+            }
+
+@app.route('/api/player-info/<player_name>')
+def get_player_info(player_name):
+    """Get detailed information about a player including stats and image"""
+    # The headshot URL changes once the image is cached locally, so it is part of the key
+    key = ('player_info', player_name, player_image_url(player_name))
+    return cached_json(key, (('catalog',),), lambda: player_info_payload(player_name))
 
 def get_player_category(player_name):
     """Determine which category a player belongs to"""
-    raw_data = load_raw_data()
-    
-    for category, info in raw_data.items():
-        if player_name in info['players']:
-            return category
-    return 'Unknown'
+    load_raw_data()
+    return player_catalog.category_of(player_name)
 
 # WebSocket events for real-time bidding
 @socketio.on('connect')
+@instrument_event('connect')
 @login_required
 def handle_connect(auth):
     """User connects to auction room"""
-    join_room(auction_state['room_id'])
-    # Emit user connected event
-    emit('user_connected', {'username': current_user.username}, room=auction_state['room_id'])
+    try:
+        auction = auction_registry.get(request.args.get('auction') or DEFAULT_AUCTION_ID)
+    except ValueError:
+        return False  # Reject connections to malformed auction ids
+    start_outbound_pump()
+    start_presence_pump()
+    start_catalog_watch()
+    socket_auctions[request.sid] = auction.auction_id
+    auction.connections += 1
+    CONNECTED_CLIENTS.inc(auction.auction_id)
+    auction_state = auction.state
+    if request.args.get('encoding') == COMPACT_ENCODING:
+        # Send the lookup tables once; encoded events refer to players and teams by id
+        load_raw_data()
+        conn = get_db()
+        c = conn.cursor()
+        c.execute('SELECT id, username, team_name FROM users')
+        wire_codec.register_teams(c.fetchall())
+        conn.close()
+        compact_clients[request.sid] = auction_state['room_id']
+        compact_rooms[auction_state['room_id']] += 1
+        join_room(compact_room(auction_state['room_id']))
+        join_room(WIRE_ROOM)
+        emit('wire_dictionary', wire_codec.dictionary())
+    else:
+        join_room(auction_state['room_id'])
+    # The room hears about it in the next presence digest; the joiner gets the full list now
+    presence.join(request.sid, auction.auction_id, current_user.id, current_user.username, current_user.team_name)
+    users = [user['username'] for user in presence.online(auction.auction_id)]
+    send_event('presence', {'online': len(users), 'joined': [], 'left': [], 'users': users})
     # Send current auction state
-    emit('auction_state', auction_state)
+    send_event('auction_state', auction_state)
+    send_event('team_strength', get_team_strength(auction).leaderboard())
 
 @socketio.on('get_auction_state')
+@instrument_event('get_auction_state')
 @login_required
 def handle_get_auction_state():
     """Handle request for current auction state (for auto-refresh)"""
-    emit('auction_state', auction_state)
+    send_event('auction_state', get_auction().state)
 
 @socketio.on('disconnect')
+@instrument_event('disconnect')
 def handle_disconnect():
     """User disconnects"""
+    auction_id = socket_auctions.pop(request.sid, None)
+    if auction_id is None:
+        return
+    outbound.remove(request.sid)
+    presence.leave(request.sid)
+    OUTBOUND_DEPTH.remove(auction_id, request.sid, 'transport')
+    OUTBOUND_DEPTH.remove(auction_id, request.sid, 'coalesced')
+    auction = auction_registry.get(auction_id)
+    auction.connections = max(0, auction.connections - 1)
+    CONNECTED_CLIENTS.dec(auction_id)
+    auction_state = auction.state
+    room = compact_clients.pop(request.sid, None)
+    if room is not None:
+        compact_rooms[room] -= 1
+        if compact_rooms[room] <= 0:
+            del compact_rooms[room]
+        leave_room(compact_room(room))
+        leave_room(WIRE_ROOM)
     if current_user.is_authenticated:
         leave_room(auction_state['room_id'])
-        emit('user_disconnected', {'username': current_user.username}, room=auction_state['room_id'])
 
 @socketio.on('place_bid')
+@instrument_event('place_bid')
 def handle_bid(data):
     """Handle player bid"""
     player_name = data.get('player_name')
     amount = float(data.get('amount', 0))
     
-    if not player_name or amount <= 0:
-        emit('bid_error', {'message': 'Invalid bid'})
-        return
-    
     # Get user info from session
-    user_id = getattr(current_user, 'id', None) if current_user.is_authenticated else None
-    if not user_id:
-        emit('bid_error', {'message': 'Please log in to place bids'})
-        return
-    
-    # Check if user has enough purse
-    conn = sqlite3.connect(app.config['DATABASE'])
-    c = conn.cursor()
-    c.execute('SELECT purse FROM users WHERE id = ?', (user_id,))
-    user_purse = c.fetchone()[0]
-    
-    # Calculate total spent
-    c.execute('SELECT COALESCE(SUM(final_price), 0) FROM auction_log WHERE sold_to_user_id = ?', (user_id,))
-    total_spent = c.fetchone()[0] or 0
-    
-    available_purse = user_purse - total_spent
-    
-    if amount > available_purse:
-        conn.close()
-        emit('bid_error', {'message': f'Insufficient funds! Available: {available_purse:.2f} Cr'})
-        return
-    
-    # Check if bid is higher than current highest
-    current_bids = auction_state['bids'].get(player_name, [])
-    highest_bid = max([b['amount'] for b in current_bids], default=0)
-    
-    if amount <= highest_bid:
-        conn.close()
-        emit('bid_error', {'message': f'Bid must be higher than {highest_bid} Cr'})
-        return
+    bidder = None
+    if current_user.is_authenticated:
+        bidder = Bidder(current_user.id, current_user.username, current_user.team_name)
     
-    # Get user info from session/request (simplified - in production use proper auth)
-    user_id = getattr(current_user, 'id', None) if current_user.is_authenticated else None
-    if not user_id:
-        emit('bid_error', {'message': 'Please log in to place bids'})
+    try:
+        get_engine().place_bid(bidder, player_name, amount)
+    except AuctionError as e:
+        emit(e.event, {'message': e.message})
+
+@socketio.on('set_max_bid')
+@instrument_event('set_max_bid')
+def handle_set_max_bid(data):
+    """Register a private maximum bid; the server bids for the team up to it"""
+    player_name = data.get('player_name')
+    max_amount = float(data.get('max_amount', 0))
+    bidder = None
+    if current_user.is_authenticated:
+        bidder = Bidder(current_user.id, current_user.username, current_user.team_name)
+    try:
+        result = get_engine().set_proxy(bidder, player_name, max_amount)
+    except AuctionError as e:
+        emit(e.event, {'message': e.message})
         return
-    
-    # Record bid
-    bid_entry = {
-        'user_id': user_id,
-        'username': current_user.username,
-        'team_name': current_user.team_name,
-        'amount': amount,
-        'timestamp': datetime.now().isoformat()
-    }
-    
-    if player_name not in auction_state['bids']:
-        auction_state['bids'][player_name] = []
-    auction_state['bids'][player_name].append(bid_entry)
-    
-    # Save to database
-    c.execute('INSERT INTO bids (user_id, player_name, amount) VALUES (?, ?, ?)',
-             (user_id, player_name, amount))
-    conn.commit()
-    conn.close()
-    
-    # Broadcast bid to all users
-    emit('new_bid', {
-        'player_name': player_name,
-        'bid': bid_entry,
-        'highest_bid': amount
-    }, room=auction_state['room_id'], include_self=True)
+    emit('max_bid_set', result)
 
 @socketio.on('sell_player')
+@instrument_event('sell_player')
 def handle_sell(data):
     """Sell player to highest bidder (admin/auctioneer function)"""
     # Check if user is admin
@@ -1001,7 +1628,7 @@ def handle_sell(data):
         return
     
     # Verify admin status
-    conn = sqlite3.connect(app.config['DATABASE'])
+    conn = get_db()
     c = conn.cursor()
     c.execute('SELECT username FROM users WHERE id = ?', (user_id,))
     user_data = c.fetchone()
@@ -1011,186 +1638,41 @@ def handle_sell(data):
         emit('sell_error', {'message': 'Only admin can sell players'})
         return
     
-    player_name = data.get('player_name')
-    if not player_name or player_name not in auction_state['bids']:
-        emit('sell_error', {'message': 'No bids for this player'})
-        return
-    
-    bids = auction_state['bids'][player_name]
-    if not bids:
-        emit('sell_error', {'message': 'No bids found'})
+    auction = get_auction()
+    try:
+        sale = get_engine(auction).sell(data.get('player_name'))
+    except AuctionError as e:
+        emit(e.event, {'message': e.message})
         return
-    
-    # Find highest bidder
-    highest_bid = max(bids, key=lambda x: x['amount'])
-    winner_id = highest_bid['user_id']
-    final_price = highest_bid['amount']
-    
-    # Update database
-    conn = sqlite3.connect(app.config['DATABASE'])
-    c = conn.cursor()
-    
-    # Get player info
-    base_price = get_player_base_price(player_name)
-    category = get_player_category(player_name)
-    
-    # Get current purse before deduction
-    c.execute('SELECT username, team_name, purse FROM users WHERE id = ?', (winner_id,))
-    winner_info = c.fetchone()
-    
-    # Deduct from winner's purse
-    c.execute('UPDATE users SET purse = purse - ? WHERE id = ?', (final_price, winner_id))
-    
-    # Log sale
-    c.execute('''INSERT INTO auction_log (player_name, category, base_price, sold_to_user_id, final_price)
-                 VALUES (?, ?, ?, ?, ?)''', (player_name, category, base_price, winner_id, final_price))
-    
-    # Add to winner's team
-    c.execute('''INSERT OR REPLACE INTO teams (user_id, player_name, player_category, purchase_price)
-                 VALUES (?, ?, ?, ?)''', (winner_id, player_name, category, final_price))
-    
-    # Mark winning bid
-    c.execute('UPDATE bids SET is_winning = 1 WHERE user_id = ? AND player_name = ? AND amount = ?',
-             (winner_id, player_name, final_price))
-    
-    # Calculate remaining purse
-    remaining_purse = winner_info[2] - final_price
-    
-    conn.commit()
-    conn.close()
-    
-    # Update auction state
-    auction_state['sold_players'][player_name] = {
-        'user_id': winner_id,
-        'team_name': winner_info[1],
-        'amount': final_price
-    }
-    
-    # Clear bids for this player
-    if player_name in auction_state['bids']:
-        del auction_state['bids'][player_name]
-    
-    # Clear current player and move to next player automatically
-    # Check if there are more players in the current set
-    if auction_state['status'] == 'active' and auction_state['current_category'] and auction_state['current_set']:
-        # Get the players for current set
-        players_with_prices = []
-        raw_data = load_raw_data()
-        category_data = raw_data.get(auction_state['current_category'], {})
-        set_players = get_shuffled_set(auction_state['current_category'], auction_state['current_set'])
-        
-        for pname in set_players:
-            base_price = get_player_base_price(pname)
-            players_with_prices.append({
-                'name': pname,
-                'base_price': base_price
-            })
-        
-        # Find current player index
-        current_index = auction_state.get('current_player_index', 0)
-        next_index = current_index + 1
-        
-        if next_index < len(players_with_prices):
-            # Move to next player
-            auction_state['current_player'] = players_with_prices[next_index]
-            auction_state['current_player_index'] = next_index
-            # Initialize bids for new player
-            auction_state['bids'][players_with_prices[next_index]['name']] = []
-        else:
-            # No more players in this set
-            auction_state['current_player'] = None
-            auction_state['current_player_index'] = 0
-            auction_state['status'] = 'waiting'
-            auction_state['active_pool'] = None
-    
-    # Broadcast sale
-    socketio.emit('player_sold', {
-        'player_name': player_name,
-        'buyer': winner_info[0],
-        'team_name': winner_info[1],
-        'price': final_price,
-        'remaining_purse': remaining_purse
-    }, room=auction_state['room_id'])
-    
-    # Broadcast updated auction state (with next player)
-    socketio.emit('auction_state', auction_state, room=auction_state['room_id'])
+
+    response_cache.bump(('sales', auction.auction_id, player_catalog.category_of(sale['player_name'])))
+    # Rescore the buying team and push the updated leaderboard
+    strength = get_team_strength(auction)
+    strength.add_sale(sale['user_id'], sale['team_name'], sale['player_name'])
+    send_event('team_strength', strength.leaderboard(), room=auction.room_id)
+    prefetch_images(auction)
 
 @socketio.on('start_auction')
+@instrument_event('start_auction')
 def handle_start_auction(data):
     """Start/pause/resume auction"""
-    action = data.get('action', 'start')
-    
-    # Prevent starting new pool if one is already active
-    if action == 'start' and auction_state['status'] == 'active' and auction_state['active_pool']:
-        socketio.emit('auction_error', {
-            'message': f'Pool "{auction_state["current_category"]} - Set {auction_state["current_set"]}" is already in progress. Please complete or pause it first.'
-        }, room=auction_state['room_id'])
-        return
-    
-    auction_state['status'] = 'active' if action == 'start' else action
-    
-    if action == 'start' and data.get('category') and data.get('set'):
-        category = data['category']
-        set_num = int(data['set'])
-        players = get_shuffled_set(category, set_num)
-        
-        players_with_prices = []
-        for player in players:
-            players_with_prices.append({
-                'name': player,
-                'base_price': get_player_base_price(player),
-                'is_critical': is_critical_player(player)
-            })
-        
-        auction_state['current_category'] = category
-        auction_state['current_set'] = set_num
-        auction_state['active_pool'] = f"{category}_{set_num}"
-        auction_state['current_player_index'] = 0
-        auction_state['current_player'] = players_with_prices[0] if players_with_prices else None
-        auction_state['start_time'] = datetime.now().isoformat()
-        
-        # Broadcast pool start announcement
-        socketio.emit('pool_started', {
-            'category': category,
-            'set': set_num,
-            'message': f'Auction started: {category} - Set {set_num}'
-        }, room=auction_state['room_id'])
-    
-    socketio.emit('auction_state', auction_state, room=auction_state['room_id'])
+    get_engine().start_auction(data.get('action', 'start'), data.get('category'), data.get('set'))
+    prefetch_images()
 
 @socketio.on('next_player')
+@instrument_event('next_player')
 def handle_next_player():
     """Move to next player"""
-    if auction_state['status'] != 'active':
-        return
-    
-    category = auction_state['current_category']
-    set_num = auction_state['current_set']
-    if not category or not set_num:
-        return
-    
-    players = get_shuffled_set(category, set_num)
-    players_with_prices = []
-    for player in players:
-        players_with_prices.append({
-            'name': player,
-            'base_price': get_player_base_price(player),
-            'is_critical': is_critical_player(player)
-        })
-    
-    next_index = auction_state['current_player_index'] + 1
-    if next_index < len(players_with_prices):
-        auction_state['current_player_index'] = next_index
-        auction_state['current_player'] = players_with_prices[next_index]
-        auction_state['bids'][players_with_prices[next_index]['name']] = []
-        socketio.emit('auction_state', auction_state, room=auction_state['room_id'])
+    get_engine().next_player()
+    prefetch_images()
 
 # API routes for team management
 @app.route('/api/my-team')
 @login_required
 def my_team():
     """Get user's purchased players"""
-    conn = sqlite3.connect(app.config['DATABASE'])
+    auction_id = get_auction_id()
+    conn = get_db()
     c = conn.cursor()
     
     # Check if is_captain column exists, if not add it
@@ -1209,11 +1691,12 @@ def my_team():
                  COALESCE((SELECT al.final_price FROM auction_log al 
                            WHERE al.player_name = t.player_name 
                            AND al.sold_to_user_id = t.user_id 
+                           AND al.auction_id = t.auction_id
                            ORDER BY al.timestamp DESC LIMIT 1), t.purchase_price) as final_price,
                  COALESCE(t.is_captain, 0) as is_captain
                  FROM teams t
-                 WHERE t.user_id = ? 
-                 ORDER BY COALESCE(t.position, 999), t.player_name''', (current_user.id,))
+                 WHERE t.user_id = ? AND t.auction_id = ?
+                 ORDER BY COALESCE(t.position, 999), t.player_name''', (current_user.id, auction_id))
     players = []
     for row in c.fetchall():
         category = row[1] or 'Unknown'
@@ -1234,16 +1717,156 @@ def my_team():
     # Get current purse
     c.execute('SELECT purse FROM users WHERE id = ?', (current_user.id,))
     purse = c.fetchone()[0]
-    c.execute('SELECT COALESCE(SUM(final_price), 0) FROM auction_log WHERE sold_to_user_id = ?', (current_user.id,))
+    c.execute('SELECT COALESCE(SUM(final_price), 0) FROM auction_log WHERE sold_to_user_id = ? AND auction_id = ?',
+             (current_user.id, auction_id))
     spent = c.fetchone()[0] or 0
     
     conn.close()
+    load_raw_data()
     return jsonify({
         'players': players,
         'purse_remaining': purse - spent,
-        'total_spent': spent
+        'total_spent': spent,
+        'suggested_xi': best_xi(players, player_ratings)
     })
 
+@app.route('/api/closed-lots')
+@login_required
+def closed_lots():
+    """Lots that have left the block: ?outcome=sold|unsold, team=<user id>, category, offset, limit (max 500)"""
+    outcome = request.args.get('outcome')
+    if outcome not in (None, 'sold', 'unsold'):
+        return jsonify({'success': False, 'error': 'outcome must be sold or unsold'}), 400
+    try:
+        user_id = int(request.args['team']) if request.args.get('team') else None
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(500, max(1, int(request.args.get('limit', 100))))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'team, offset and limit must be integers'}), 400
+    auction = get_auction(get_auction_id())
+    closed = get_closed_lots(auction)
+    lots, total = closed.query(outcome, user_id, request.args.get('category'), offset, limit)
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT id, team_name FROM users')
+    team_names = dict(c.fetchall())
+    conn.close()
+    for lot in lots:
+        lot['team_name'] = team_names.get(lot['user_id'])
+    return jsonify({
+        'success': True,
+        'auction_id': auction.auction_id,
+        'summary': auction.state.get('closed') or closed.summary(),
+        'total': total,
+        'lots': lots
+    })
+
+HISTORY_ROWS = METRICS.counter('history_rows_total', 'Rows served by the history API', ['kind', 'mode'])
+HISTORY_POLL_INTERVAL = 1.0  # Seconds between looks for new rows while streaming
+HISTORY_MAX_STREAM = 300  # Longest a stream stays open (seconds); dashboards reconnect with their last cursor
+
+def history_filters(kind):
+    """query_history() keyword arguments from the request; ValueError names the bad parameter"""
+    args = request.args
+    filters = {}
+    try:
+        if args.get('team'):
+            filters['team'] = int(args['team'])
+        for name in ('min_price', 'max_price'):
+            if args.get(name):
+                filters[name] = float(args[name])
+        filters['limit'] = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('team and limit must be integers, min_price and max_price numbers') from None
+    try:
+        for name, key in (('from', 'start'), ('to', 'end')):
+            if args.get(name):
+                filters[key] = parse_time(args[name])
+    except ValueError:
+        raise ValueError('from and to must be ISO 8601 times') from None
+    category, player = args.get('category'), args.get('player')
+    if category and kind == 'bids':
+        # Bids don't record a category: it stands for the players in it
+        load_raw_data()
+        filters['players'] = [name for name in player_catalog.players(category) if not player or name == player]
+    elif category:
+        filters['category'] = category
+    if player and 'players' not in filters:
+        filters['players'] = [player]
+    for name in ('before', 'after'):
+        if args.get(name):
+            filters[name] = args[name]
+    return filters
+
+def history_rows(kind, rows):
+    """Add team names (and bid categories) to history rows"""
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT id, team_name FROM users')
+    team_names = dict(c.fetchall())
+    conn.close()
+    for row in rows:
+        row['team_name'] = team_names.get(row['user_id'])
+        if kind == 'bids':
+            row['category'] = player_catalog.category_of(row['player_name'])
+    return rows
+
+@app.route('/api/history/<kind>')
+@login_required
+def history(kind):
+    """Sales or bids of an auction, newest first: ?team=<user id>, category, player, min_price, max_price,
+    from, to (ISO 8601), limit (max 500), before=<cursor> for the next page.
+
+    after=<cursor> returns rows newer than the cursor, oldest first. stream=1 tails them as
+    newline-delimited JSON (one row per line) for up to `timeout` seconds, from `after` or from now.
+    """
+    if kind not in HISTORY_TABLES:
+        return jsonify({'success': False, 'error': 'history is sales or bids'}), 404
+    try:
+        filters = history_filters(kind)
+        timeout = min(HISTORY_MAX_STREAM, max(0.0, float(request.args.get('timeout', 30))))
+        auction_id = get_auction_id()
+        load_raw_data()
+        conn = get_db()
+        try:
+            if request.args.get('stream'):
+                filters['limit'] = MAX_LIMIT
+                if 'after' not in filters:
+                    # From now: start after the newest row, whatever the filters
+                    newest, _ = query_history(conn, kind, auction_id, limit=1)
+                    filters['after'] = newest[0]['cursor'] if newest else encode_cursor('', 0)
+            rows, cursor = query_history(conn, kind, auction_id, **filters)
+        finally:
+            conn.close()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if not request.args.get('stream'):
+        HISTORY_ROWS.inc(kind, 'tail' if 'after' in filters else 'page', amount=len(rows))
+        return jsonify({'success': True, 'auction_id': auction_id, 'kind': kind,
+                        'rows': history_rows(kind, rows), 'next_cursor': cursor})
+    
+    def generate(rows, cursor):
+        # Each look for new rows is an index seek from the last cursor, on its own short connection
+        deadline = time.monotonic() + timeout
+        while True:
+            HISTORY_ROWS.inc(kind, 'stream', amount=len(rows))
+            for row in history_rows(kind, rows):
+                yield json.dumps(row) + '\n'
+            if time.monotonic() >= deadline:
+                return
+            if len(rows) < MAX_LIMIT:
+                socketio.sleep(HISTORY_POLL_INTERVAL)
+            filters['after'] = cursor
+            conn = get_db()
+            try:
+                rows, cursor = query_history(conn, kind, auction_id, **filters)
+            finally:
+                conn.close()
+    
+    return Response(generate(rows, cursor), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/update-playing-11', methods=['POST'])
 @login_required
 def update_playing_11():
@@ -1251,29 +1874,190 @@ def update_playing_11():
     data = request.get_json()
     players_order = data.get('players', [])  # List of {name, position}
     captain_name = data.get('captain')  # Optional captain name
+    auction_id = get_auction_id()
     
-    conn = sqlite3.connect(app.config['DATABASE'])
+    conn = get_db()
     c = conn.cursor()
+    c.execute('SELECT player_name, player_category FROM teams WHERE user_id = ? AND auction_id = ?',
+             (current_user.id, auction_id))
+    roster = [{'name': row[0], 'category': row[1]} for row in c.fetchall()]
+
+    if data.get('optimize'):
+        # Let the server pick the XI, batting order and captain
+        load_raw_data()
+        suggestion = best_xi(roster, player_ratings)
+        players_order = [{'name': p['name'], 'position': p['position']} for p in suggestion['players']]
+        captain_name = suggestion['captain']
+    else:
+        # Enforce the overseas cap on the players placed in the XI
+        categories = {p['name']: p['category'] for p in roster}
+        selected = [{'name': item.get('name'), 'category': categories.get(item.get('name'))}
+                    for item in players_order
+                    if item.get('name') in categories and item.get('position') is not None and 1 <= item['position'] <= 11]
+        errors = check_xi(selected)
+        if errors:
+            conn.close()
+            return jsonify({'success': False, 'error': '; '.join(errors)}), 400
     
     # Clear existing positions and captain flags
-    c.execute('UPDATE teams SET position = NULL, is_captain = 0 WHERE user_id = ?', (current_user.id,))
+    c.execute('UPDATE teams SET position = NULL, is_captain = 0 WHERE user_id = ? AND auction_id = ?',
+             (current_user.id, auction_id))
     
     # Update positions
     for item in players_order:
         player_name = item.get('name')
         position = item.get('position')
         if player_name and position is not None:
-            is_captain = 1 if (captain_name == player_name or position == 1) else 0
-            c.execute('UPDATE teams SET position = ?, is_captain = ? WHERE user_id = ? AND player_name = ?',
-                     (position, is_captain, current_user.id, player_name))
+            is_captain = 1 if (captain_name == player_name or (position == 1 and not data.get('optimize'))) else 0
+            c.execute('UPDATE teams SET position = ?, is_captain = ? WHERE user_id = ? AND player_name = ? AND auction_id = ?',
+                     (position, is_captain, current_user.id, player_name, auction_id))
     
     conn.commit()
     conn.close()
-    return jsonify({'success': True})
+    return jsonify({'success': True, 'captain': captain_name, 'players': players_order})
+
+@app.route('/api/metrics')
+def metrics_endpoint():
+    """Prometheus-compatible metrics (local scrapers or the admin only)"""
+    is_local = request.remote_addr in ('127.0.0.1', '::1')
+    is_admin = current_user.is_authenticated and current_user.username.lower() == ADMIN_USERNAME.lower()
+    if not (is_local or is_admin):
+        return jsonify({'error': 'Forbidden'}), 403
+    return Response(METRICS.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/api/export')
+@login_required
+def export_data():
+    """Stream a database export to the admin: ?format=xlsx (default), csv (zip of all tables) or csv&table=<name>"""
+    if current_user.username.lower() != ADMIN_USERNAME.lower():
+        return jsonify({'error': 'Only admin can export data'}), 403
+    export_format = request.args.get('format', 'xlsx')
+    table = request.args.get('table')
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    database = app.config['DATABASE']
+    
+    if export_format == 'csv' and table:
+        try:
+            chunks = iter_csv(database, table)
+            first = next(chunks)  # Validate the table before committing to a 200
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        def generate():
+            yield first
+            yield from chunks
+        return Response(generate(), mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename={table}-{stamp}.csv'})
+    
+    if export_format == 'csv':
+        return Response(iter_csv_zip(database), mimetype='application/zip',
+                        headers={'Content-Disposition': f'attachment; filename=auction-{stamp}.zip'})
+    
+    if export_format != 'xlsx':
+        return jsonify({'error': 'format must be xlsx or csv'}), 400
+    
+    # The write-only workbook spools rows to disk; stream the finished file back in chunks
+    spool = tempfile.TemporaryFile()
+    export_xlsx(database, spool)
+    size = spool.tell()
+    spool.seek(0)
+    def generate():
+        with spool:
+            while True:
+                data = spool.read(64 * 1024)
+                if not data:
+                    break
+                yield data
+    return Response(generate(), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                    headers={'Content-Disposition': f'attachment; filename=auction-{stamp}.xlsx',
+                             'Content-Length': str(size)})
+
+@app.route('/api/profiler', methods=['GET', 'POST'])
+@login_required
+def profiler_settings():
+    """View or change profiling at runtime (admin only): {sample_rate, slow_threshold_ms}"""
+    if current_user.username.lower() != ADMIN_USERNAME.lower():
+        return jsonify({'error': 'Only admin can configure profiling'}), 403
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        try:
+            profiler.configure(data.get('sample_rate'), data.get('slow_threshold_ms'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'sample_rate and slow_threshold_ms must be numbers'}), 400
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        limit = None
+    if limit is None or limit < 1:
+        return jsonify({'success': False, 'error': 'limit must be a positive integer'}), 400
+    return jsonify({
+        'success': True,
+        'settings': profiler.settings(),
+        'slow_events': profiler.recent_slow_events(limit)
+    })
+
+@app.route('/api/cache-stats')
+@login_required
+def cache_stats():
+    """Bytes 304 Not Modified responses saved per session (the admin sees every session)"""
+    saved = response_cache.saved_by_session()
+    if current_user.username.lower() != ADMIN_USERNAME.lower():
+        own_session = cache_session()
+        saved = {own_session: saved.get(own_session, 0)}
+    return jsonify({'success': True, 'bytes_saved': saved, 'total': sum(saved.values())})
+
+@app.route('/api/reload-catalog', methods=['POST'])
+@login_required
+def reload_catalog_endpoint():
+    """Re-read AUCTION.xlsx now instead of waiting for the watcher (admin only); returns what changed"""
+    if current_user.username.lower() != ADMIN_USERNAME.lower():
+        return jsonify({'success': False, 'error': 'Only admin can reload the player catalog'}), 403
+    try:
+        delta = reload_catalog()
+    except Exception as e:
+        CATALOG_RELOADS.inc('failed')
+        ERRORS.inc('catalog_reload')
+        return jsonify({'success': False, 'error': str(e)}), 500
+    if delta is None:
+        CATALOG_RELOADS.inc('unchanged')
+    return jsonify({'success': True, 'changed': delta is not None, 'version': catalog_version, 'delta': delta})
+
+@app.route('/api/online')
+@login_required
+def online_users():
+    """Who is connected to an auction right now (from memory)"""
+    auction_id = get_auction_id()
+    users = presence.online(auction_id)
+    return jsonify({'success': True, 'auction_id': auction_id, 'online': len(users), 'users': users})
+
+@app.route('/api/auctions')
+@login_required
+def list_auctions():
+    """List auction instances hosted by this process"""
+    live = []
+    for auction in auction_registry.live_instances():
+        live.append({
+            'auction_id': auction.auction_id,
+            'status': auction.state['status'],
+            'active_pool': auction.state['active_pool'],
+            'connections': auction.connections,
+            'online': presence.count(auction.auction_id)
+        })
+    return jsonify({
+        'live': live,
+        'evicted': auction_registry.stored_ids()
+    })
+
+def shutdown():
+    """Graceful shutdown: write live auctions to disk and stop the worker pools"""
+    flushed = auction_registry.flush()
+    image_cache.shutdown()
+    password_pool.shutdown()
+    return flushed
 
 if __name__ == '__main__':
     # Initialize database
     init_db()
+    prepare_assets()
     
     # Load player data
     try:
@@ -1292,6 +2076,7 @@ if __name__ == '__main__':
         print(f"\n🌐 For global access:")
         print(f"   Deploy to PythonAnywhere.com (recommended for Flask)")
         print(f"   See PYTHONANYWHERE_DEPLOY.md for instructions")
+        print("\n⚙️  Development server (debug, reloader). In production run: python server.py")
         print("="*60 + "\n")
         PORT = 8080
         # Allow PORT from environment for cloud hosting
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Static asset build - content-hashed, pre-compressed CSS/JS
+
+`python assets.py` copies every .css/.js file in static/ to
+static/dist/<name>.<hash>.<ext> together with .gz (and .br, when the
+optional `brotli` package is installed) variants, and writes
+static/dist/manifest.json mapping source names to fingerprinted ones.
+The app serves those files with immutable Cache-Control headers, so a
+browser that has loaded a version once never asks for it again; editing
+a source file changes its hash and therefore its URL.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+STATIC_DIR = 'static'
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+ASSET_EXTENSIONS = ('.css', '.js')
+HASH_LENGTH = 12
+
+# Encodings in order of preference: (Content-Encoding, file suffix)
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def _write(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def source_files(static_dir=STATIC_DIR):
+    return sorted(name for name in os.listdir(static_dir)
+                  if name.endswith(ASSET_EXTENSIONS) and os.path.isfile(os.path.join(static_dir, name)))
+
+
+def build(static_dir=STATIC_DIR):
+    """Fingerprint and compress every asset; returns {source: {'file', 'bytes', 'gzip', 'br'}}"""
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    os.makedirs(dist_dir, exist_ok=True)
+    manifest, report = {}, {}
+    for name in source_files(static_dir):
+        with open(os.path.join(static_dir, name), 'rb') as f:
+            data = f.read()
+        stem, ext = os.path.splitext(name)
+        hashed = f'{stem}.{fingerprint(data)}{ext}'
+        path = os.path.join(dist_dir, hashed)
+        if not os.path.exists(path):
+            _write(path, data)
+            # mtime=0 keeps the .gz byte-identical across builds
+            _write(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write(path + '.br', brotli.compress(data, quality=11))
+        manifest[name] = hashed
+        report[name] = {
+            'file': hashed,
+            'bytes': len(data),
+            'gzip': os.path.getsize(path + '.gz'),
+            'br': os.path.getsize(path + '.br') if os.path.exists(path + '.br') else None
+        }
+
+    # Drop outdated builds
+    keep = set(manifest.values())
+    for entry in os.listdir(dist_dir):
+        base = entry[:-3] if entry.endswith(('.gz', '.br')) else entry
+        if entry != MANIFEST and base not in keep:
+            os.remove(os.path.join(dist_dir, entry))
+
+    _write(os.path.join(dist_dir, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return report
+
+
+def is_stale(static_dir=STATIC_DIR):
+    """True if the manifest is missing or older than any source asset"""
+    manifest_path = os.path.join(static_dir, DIST_DIR, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return True
+    built = os.path.getmtime(manifest_path)
+    return any(os.path.getmtime(os.path.join(static_dir, name)) > built for name in source_files(static_dir))
+
+
+class AssetManifest:
+    """Maps source asset names to fingerprinted files and picks precompressed variants"""
+
+    def __init__(self, static_dir=STATIC_DIR):
+        self.static_dir = static_dir
+        self.dist_dir = os.path.join(static_dir, DIST_DIR)
+        self.files = {}
+        self.fingerprinted = set()
+        self.load()
+
+    def load(self):
+        path = os.path.join(self.dist_dir, MANIFEST)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f)
+        except (OSError, ValueError):
+            self.files = {}
+        self.fingerprinted = set(self.files.values())
+        return self.files
+
+    def hashed(self, name):
+        """Fingerprinted file name for a source asset, or None if it was not built"""
+        return self.files.get(name)
+
+    def variant(self, hashed, accept_encoding):
+        """(file name, Content-Encoding or None) to serve for a fingerprinted asset"""
+        accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.exists(os.path.join(self.dist_dir, hashed + suffix)):
+                return hashed + suffix, encoding
+        return hashed, None
+
+
+def main():
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR
+    report = build(static_dir)
+    if brotli is None:
+        print('brotli not installed: writing gzip variants only (pip install brotli)')
+    for name, info in report.items():
+        br = f", br {info['br']:,}" if info['br'] is not None else ''
+        print(f"✓ {name} -> {DIST_DIR}/{info['file']} ({info['bytes']:,} bytes, gzip {info['gzip']:,}{br})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: how many concurrent auctions one server process sustains
+
+Runs N independent auctions side by side (in-process Socket.IO test clients,
+temp database), drives bid/sell rounds in every one of them and reports
+throughput, sell latency and memory per live auction, before and after
+idle eviction to disk.
+
+Usage:
+    python benchmarks/bench_auction_rooms.py --auctions 10,50,100 --teams 4 --lots 5
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # AUCTION.xlsx is resolved relative to the project root
+
+import sqlite3
+from werkzeug.security import generate_password_hash
+
+import app as auction_app
+from app import app, socketio, init_db, load_raw_data, ADMIN_USERNAME
+
+CATEGORY = 'Indian Bat'
+
+
+def setup_database(tmp_dir, n_teams):
+    """Fresh database with the admin and n synthetic teams"""
+    app.config['DATABASE'] = os.path.join(tmp_dir, 'bench.db')
+    auction_app.auction_registry.storage_dir = os.path.join(tmp_dir, 'rooms')
+    init_db()
+    conn = sqlite3.connect(app.config['DATABASE'])
+    c = conn.cursor()
+    usernames = [ADMIN_USERNAME] + [f'team{i}' for i in range(n_teams)]
+    for username in usernames:
+        # Cheap hash: the benchmark measures the bid path, not login
+        password_hash = generate_password_hash(username, method='pbkdf2:sha256:1000')
+        c.execute('''INSERT OR IGNORE INTO users (username, email, password_hash, team_name, purse)
+                     VALUES (?, ?, ?, ?, ?)''',
+                  (username, f'{username}@bench.local', password_hash, f'{username} XI', 100000.0))
+    conn.commit()
+    conn.close()
+    return usernames
+
+
+def connect(username, auction_id):
+    """Log in over HTTP and open a Socket.IO test client joined to an auction"""
+    http = app.test_client()
+    res = http.post('/login', json={'username': username, 'password': username})
+    assert res.status_code == 200, f'login failed for {username}'
+    return socketio.test_client(app, flask_test_client=http, query_string=f'auction={auction_id}')
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(n_auctions, usernames, n_lots, bids_per_lot):
+    """Run n concurrent auctions and return a result row"""
+    admin, teams = usernames[0], usernames[1:]
+    auction_ids = [f'bench{n_auctions}_{i}' for i in range(n_auctions)]
+
+    gc.collect()
+    tracemalloc.start()
+    base_mem = tracemalloc.get_traced_memory()[0]
+
+    rooms = {}
+    for auction_id in auction_ids:
+        rooms[auction_id] = (connect(admin, auction_id), [connect(t, auction_id) for t in teams])
+        rooms[auction_id][0].emit('start_auction', {'action': 'start', 'category': CATEGORY, 'set': 1})
+
+    sell_latencies = []
+    events = 0
+    started = time.perf_counter()
+    for _ in range(n_lots):
+        # Interleave the auctions lot by lot, as a busy server would see them
+        for auction_id, (admin_client, team_clients) in rooms.items():
+            state = auction_app.auction_registry.get(auction_id).state
+            player = state['current_player']
+            if not player:
+                continue
+            amount = player['base_price']
+            for i in range(bids_per_lot):
+                amount += 0.25
+                team_clients[i % len(team_clients)].emit('place_bid', {
+                    'player_name': player['name'], 'amount': amount
+                })
+                events += 1
+            t0 = time.perf_counter()
+            admin_client.emit('sell_player', {'player_name': player['name']})
+            sell_latencies.append(time.perf_counter() - t0)
+            events += 1
+            # Drain queued broadcasts so the clients don't accumulate them
+            admin_client.get_received()
+            for client in team_clients:
+                client.get_received()
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    live_mem = tracemalloc.get_traced_memory()[0] - base_mem
+
+    for admin_client, team_clients in rooms.values():
+        admin_client.disconnect()
+        for client in team_clients:
+            client.disconnect()
+    rooms.clear()
+
+    # Evict every idle benchmark auction to disk and measure what is left
+    registry = auction_app.auction_registry
+    timeout = registry.idle_timeout
+    registry.idle_timeout = 0
+    evicted = registry.evict_idle()
+    registry.idle_timeout = timeout
+    gc.collect()
+    evicted_mem = tracemalloc.get_traced_memory()[0] - base_mem
+    tracemalloc.stop()
+
+    return {
+        'auctions': n_auctions,
+        'events_per_sec': events / elapsed if elapsed else 0.0,
+        'sell_p50_ms': percentile(sell_latencies, 50) * 1000,
+        'sell_p95_ms': percentile(sell_latencies, 95) * 1000,
+        'kb_per_live_auction': live_mem / n_auctions / 1024,
+        'evicted': len(evicted),
+        'kb_after_eviction': evicted_mem / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--auctions', default='10,50,100', help='comma-separated concurrent auction counts')
+    parser.add_argument('--teams', type=int, default=4, help='teams bidding in each auction')
+    parser.add_argument('--lots', type=int, default=5, help='lots sold per auction')
+    parser.add_argument('--bids', type=int, default=6, help='bids per lot')
+    args = parser.parse_args()
+
+    load_raw_data()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        usernames = setup_database(tmp_dir, args.teams)
+        print(f"{'auctions':>8} {'events/s':>10} {'sell p50':>9} {'sell p95':>9} "
+              f"{'KB/auction':>11} {'evicted':>8} {'KB after':>9}")
+        for n in [int(x) for x in args.auctions.split(',')]:
+            r = run(n, usernames, args.lots, args.bids)
+            print(f"{r['auctions']:>8} {r['events_per_sec']:>10.0f} {r['sell_p50_ms']:>7.2f}ms "
+                  f"{r['sell_p95_ms']:>7.2f}ms {r['kb_per_live_auction']:>11.1f} {r['evicted']:>8} "
+                  f"{r['kb_after_eviction']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
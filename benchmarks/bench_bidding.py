@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Load generator and latency benchmark for the Socket.IO bidding path
+
+Starts the app in a subprocess against a temp database, logs in N synthetic
+teams over HTTP, connects one real Socket.IO client per team and drives
+configurable bid storms at `place_bid`. Reports accepted bids/sec,
+p50/p95/p99 bid-to-`new_bid` latency, broadcast fan-out time (first to last
+client receiving the same `new_bid`) and server CPU/memory.
+
+Results are written as JSON (keyed by git commit) so runs can be compared:
+    python benchmarks/bench_bidding.py --teams 10 --lots 5 --bids 20
+    python benchmarks/bench_bidding.py --compare benchmarks/results/bidding-<commit>.json
+    python benchmarks/bench_bidding.py --server-mode gevent   # production server.py instead of the dev server
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+import socketio
+from werkzeug.security import generate_password_hash
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+ADMIN_USERNAME = 'mithesh'
+CATEGORY = 'Indian Bat'
+INCREMENT = 0.25
+
+
+def serve(db_path, port):
+    """Server mode: run the app against the given database (used by the subprocess)"""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import app as auction_app
+    auction_app.app.config['DATABASE'] = db_path
+    auction_app.init_db()
+    auction_app.load_raw_data()
+    auction_app.socketio.run(auction_app.app, host='127.0.0.1', port=port,
+                             allow_unsafe_werkzeug=True, log_output=False)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def create_users(db_path, n_teams):
+    """Pre-register the admin and n synthetic teams"""
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute('''CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        team_name TEXT,
+        purse REAL DEFAULT 100.0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    usernames = [ADMIN_USERNAME] + [f'team{i}' for i in range(n_teams)]
+    for username in usernames:
+        password_hash = generate_password_hash(username, method='pbkdf2:sha256:1000')
+        c.execute('INSERT INTO users (username, email, password_hash, team_name, purse) VALUES (?, ?, ?, ?, ?)',
+                  (username, f'{username}@bench.local', password_hash, f'{username} XI', 1000000.0))
+    conn.commit()
+    conn.close()
+    return usernames
+
+
+def process_stats(pid):
+    """CPU seconds and RSS (MB) of a process, read from /proc (Linux only)"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        with open(f'/proc/{pid}/status') as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+        return cpu, rss_kb / 1024
+    except (OSError, StopIteration):
+        return None, None
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class BenchClient:
+    """One logged-in team with a real Socket.IO connection"""
+
+    def __init__(self, base_url, username, transports, recorder):
+        self.username = username
+        self.recorder = recorder
+        self.pending = {}  # amount -> send time
+        self.lock = threading.Lock()
+        self.state = None
+        self.state_event = threading.Event()
+        self.sold_event = threading.Event()
+
+        http = requests.Session()
+        res = http.post(f'{base_url}/login', json={'username': username, 'password': username})
+        res.raise_for_status()
+        cookie = '; '.join(f'{k}={v}' for k, v in http.cookies.items())
+
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on('new_bid', self.on_new_bid)
+        self.sio.on('auction_state', self.on_auction_state)
+        self.sio.on('player_sold', lambda data: self.sold_event.set())
+        self.sio.connect(base_url, headers={'Cookie': cookie}, transports=transports)
+
+    def on_auction_state(self, state):
+        self.state = state
+        self.state_event.set()
+
+    def on_new_bid(self, data):
+        now = time.perf_counter()
+        bid = data['bid']
+        self.recorder.broadcast_received(data['player_name'], bid['amount'], now)
+        if bid['username'] == self.username:
+            with self.lock:
+                sent = self.pending.pop(bid['amount'], None)
+            if sent is not None:
+                self.recorder.accepted(now - sent)
+
+    def bid(self, player_name, amount):
+        with self.lock:
+            self.pending[amount] = time.perf_counter()
+        self.sio.emit('place_bid', {'player_name': player_name, 'amount': amount})
+
+
+class Recorder:
+    """Thread-safe collection of latency and fan-out samples"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.fanout = {}  # (player, amount) -> [first, last]
+
+    def accepted(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+
+    def broadcast_received(self, player_name, amount, when):
+        with self.lock:
+            window = self.fanout.setdefault((player_name, amount), [when, when])
+            window[0] = min(window[0], when)
+            window[1] = max(window[1], when)
+
+
+def bid_storm(clients, player_name, base_price, bids_per_team, offset):
+    """Every team fires its bids concurrently; amounts interleave so most are strictly increasing"""
+    n = len(clients)
+
+    def fire(i, client):
+        for k in range(bids_per_team):
+            amount = base_price + offset + (k * n + i + 1) * INCREMENT
+            client.bid(player_name, amount)
+
+    threads = [threading.Thread(target=fire, args=(i, c)) for i, c in enumerate(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return n * bids_per_team
+
+
+def run(args):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    transports = args.transports.split(',')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        usernames = create_users(db_path, args.teams)
+        if args.server_mode:
+            command = [sys.executable, os.path.join(ROOT, 'server.py'), '--mode', args.server_mode,
+                       '--host', '127.0.0.1', '--port', str(port), '--database', db_path]
+        else:
+            command = [sys.executable, os.path.abspath(__file__), '--serve', db_path, '--port', str(port)]
+        # Measure the raw bid path: storms would otherwise mostly hit the bid rate limiter
+        storage = os.path.join(tmp_dir, 'auction_rooms')
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                  env=dict(os.environ, BID_THROTTLE='off', AUCTION_STORAGE=storage))
+        try:
+            deadline = time.time() + 60
+            while True:
+                try:
+                    requests.get(f'{base_url}/', timeout=1)
+                    break
+                except requests.ConnectionError:
+                    if time.time() > deadline or server.poll() is not None:
+                        raise RuntimeError('server did not start')
+                    time.sleep(0.2)
+
+            recorder = Recorder()
+            admin = BenchClient(base_url, usernames[0], transports, recorder)
+            teams = [BenchClient(base_url, u, transports, recorder) for u in usernames[1:]]
+            cpu_start, _ = process_stats(server.pid)
+
+            admin.state_event.clear()
+            admin.sio.emit('start_auction', {'action': 'start', 'category': CATEGORY, 'set': 1})
+            admin.state_event.wait(10)
+
+            sent = 0
+            rss_peak = 0.0
+            started = time.perf_counter()
+            for lot in range(args.lots):
+                player = admin.state and admin.state.get('current_player')
+                if not player:
+                    break
+                sent += bid_storm(teams, player['name'], player['base_price'], args.bids, lot * 1000)
+                time.sleep(args.settle)  # let the last broadcasts land before selling
+                admin.sold_event.clear()
+                admin.state_event.clear()
+                admin.sio.emit('sell_player', {'player_name': player['name']})
+                admin.sold_event.wait(10)
+                admin.state_event.wait(10)
+                rss_peak = max(rss_peak, process_stats(server.pid)[1] or 0.0)
+            elapsed = time.perf_counter() - started
+            cpu_end, _ = process_stats(server.pid)
+
+            for client in [admin] + teams:
+                client.sio.disconnect()
+        finally:
+            server.terminate()
+            server.wait(10)
+        # server.py flushes live auctions on SIGTERM; the dev server just dies
+        flushed = sorted(os.listdir(storage)) if os.path.isdir(storage) else []
+
+    fanout = [last - first for first, last in recorder.fanout.values()]
+    return {
+        'bids_sent': sent,
+        'bids_accepted': len(recorder.latencies),
+        'accepted_bids_per_sec': len(recorder.latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': {p: percentile(recorder.latencies, int(p[1:])) * 1000 for p in ('p50', 'p95', 'p99')},
+        'fanout_ms': {p: percentile(fanout, int(p[1:])) * 1000 for p in ('p50', 'p95', 'p99')},
+        'server_cpu_seconds': (cpu_end - cpu_start) if cpu_start is not None and cpu_end is not None else None,
+        'server_rss_peak_mb': rss_peak or None,
+        'elapsed_seconds': elapsed,
+        'flushed_on_shutdown': flushed,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_report(report, baseline=None):
+    r = report['results']
+    print(f"commit {report['commit']}  teams={report['config']['teams']} lots={report['config']['lots']} "
+          f"bids/team/lot={report['config']['bids']} transports={report['config']['transports']} "
+          f"server={report['config'].get('server', 'dev')}")
+    rows = [
+        ('accepted bids/sec', r['accepted_bids_per_sec']),
+        ('bid->new_bid p50 ms', r['latency_ms']['p50']),
+        ('bid->new_bid p95 ms', r['latency_ms']['p95']),
+        ('bid->new_bid p99 ms', r['latency_ms']['p99']),
+        ('fan-out p50 ms', r['fanout_ms']['p50']),
+        ('fan-out p95 ms', r['fanout_ms']['p95']),
+        ('server cpu s', r['server_cpu_seconds']),
+        ('server rss peak MB', r['server_rss_peak_mb']),
+    ]
+    base = {}
+    if baseline:
+        b = baseline['results']
+        base = dict(zip([name for name, _ in rows], [
+            b['accepted_bids_per_sec'], b['latency_ms']['p50'], b['latency_ms']['p95'], b['latency_ms']['p99'],
+            b['fanout_ms']['p50'], b['fanout_ms']['p95'], b['server_cpu_seconds'], b['server_rss_peak_mb'],
+        ]))
+    for name, value in rows:
+        line = f'  {name:<22} {value:>10.2f}' if value is not None else f'  {name:<22} {"n/a":>10}'
+        if base.get(name) and value is not None:
+            line += f'   ({(value - base[name]) / base[name] * 100:+.1f}% vs {baseline["commit"]})'
+        print(line)
+    if 'flushed_on_shutdown' in r:
+        print(f"  flushed on SIGTERM     {', '.join(r['flushed_on_shutdown']) or 'nothing'}")
+    print(f"  accepted {r['bids_accepted']} of {r['bids_sent']} bids sent")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=10, help='synthetic teams bidding concurrently')
+    parser.add_argument('--lots', type=int, default=5, help='lots to auction')
+    parser.add_argument('--bids', type=int, default=20, help='bids per team per lot')
+    parser.add_argument('--settle', type=float, default=0.5, help='seconds to wait after a storm before selling')
+    parser.add_argument('--transports', default='polling', help='Socket.IO client transports, e.g. polling,websocket')
+    parser.add_argument('--server-mode', choices=('gevent', 'threading'),
+                        help='run server.py in this mode instead of the development server')
+    parser.add_argument('--output', help='result JSON path (default: benchmarks/results/bidding-<commit>.json)')
+    parser.add_argument('--compare', help='previous result JSON to compare against')
+    parser.add_argument('--serve', metavar='DB', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    commit = git_commit()
+    report = {
+        'benchmark': 'bidding',
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(),
+        'config': {'teams': args.teams, 'lots': args.lots, 'bids': args.bids, 'transports': args.transports,
+                   'server': args.server_mode or 'dev'},
+        'results': run(args),
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f'bidding-{commit}.json')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f'\nSaved results to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Catalog reload benchmark - editing AUCTION.xlsx mid-auction
+
+Plays the first lots of a pool in-process (Socket.IO test clients, temp
+database, a copy of AUCTION.xlsx), then edits the copy the way an organiser
+would between lots: fixes a spelling in set 2, adds players, drops a player
+still to come in set 1, moves a player to another category and tries to
+drop a player that was already sold. Checks that the watcher notices the
+edit, then reloads through /api/reload-catalog and verifies that:
+
+- the sold player is kept, and the closed-lot counters are unchanged
+- the lot on the block keeps its place; the pool resumes where it was
+- survivors keep their pool and order, added players join the end of set 2
+- the renamed player keeps its slot under the new name
+
+Reports the reload time and the bytes broadcast to each client (the
+catalog_delta event, and the refreshed wire dictionary for compact
+clients) against a full refetch of /api/init, every pool list and the
+wire dictionary.
+
+Usage:
+    python benchmarks/bench_catalog_reload.py --lots 3
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+os.environ.setdefault('CATALOG_WATCH', 'off')  # The benchmark polls the watcher itself
+
+import openpyxl
+
+from bench_auction_rooms import CATEGORY, app, auction_app, connect, setup_database
+
+MOVE_FROM, MOVE_TO, ADD_TO = 'Indian AR', 'Indian Pace', 'Foreign AR'
+
+
+def edit_workbook(path, edit):
+    """Apply edit({column header: [players]}) to the first sheet of a workbook"""
+    workbook = openpyxl.load_workbook(path)
+    sheet = workbook.worksheets[0]
+    columns = {}
+    for column in sheet.iter_cols(min_row=1):
+        if column[0].value:
+            columns[column[0].value] = [cell.value for cell in column[1:] if cell.value]
+    edit(columns)
+    rows = max(len(players) for players in columns.values())
+    for col, column in enumerate(sheet.iter_cols(min_row=1, max_row=rows + 1), start=1):
+        header = column[0].value
+        if header in columns:
+            players = columns[header]
+            for row in range(rows):
+                sheet.cell(row=row + 2, column=col, value=players[row] if row < len(players) else None)
+    workbook.save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # Same-second edits on coarse clocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lots', type=int, default=3, help='lots sold before the edit')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench-catalog-reload-')
+    workbook = os.path.join(tmp_dir, 'AUCTION.xlsx')
+    shutil.copy(os.path.join(ROOT, 'AUCTION.xlsx'), workbook)
+    auction_app.EXCEL_FILE = workbook
+    usernames = setup_database(tmp_dir, 2)
+    auction_app.load_raw_data()
+    admin_http = app.test_client()
+    assert admin_http.post('/login', json={'username': usernames[0], 'password': usernames[0]}).status_code == 200
+    admin = connect(usernames[0], 'main')
+    teams = [connect(username, 'main') for username in usernames[1:]]
+
+    admin.emit('start_auction', {'action': 'start', 'category': CATEGORY, 'set': 1})
+    auction = auction_app.get_auction('main')
+    state = auction.state
+    sold = []
+    for lot in range(args.lots):
+        player = state['current_player']
+        teams[lot % len(teams)].emit('place_bid', {'player_name': player['name'], 'amount': player['base_price']})
+        admin.emit('sell_player', {'player_name': player['name']})
+        sold.append(player['name'])
+    current = state['current_player']['name']
+    schedule = auction.schedule
+    set1, set2 = schedule.players(CATEGORY, 1), schedule.players(CATEGORY, 2)
+    index, remaining, closed = state['current_player_index'], state['lots_remaining'], dict(state['closed'])
+    assert set1[index] == current
+
+    dropped = set1[-1]  # Still to come in set 1
+    typo = set2[len(set2) // 2]
+    fixed = typo + typo[-1]
+    moved = auction_app.player_catalog.players(MOVE_FROM)[0]
+    added = ['Bench Player One', 'Bench Player Two']
+
+    def edit(columns):
+        column = columns[CATEGORY]
+        column.remove(dropped)
+        column.remove(sold[0])  # Sold already: must be kept
+        column[column.index(typo)] = fixed
+        column.extend(added)
+        columns[ADD_TO].append('Bench Player Three')
+        columns[MOVE_FROM].remove(moved)
+        columns[MOVE_TO].append(moved)
+
+    before = {'init': len(admin_http.get('/api/init').data)}
+    before['pools'] = sum(len(admin_http.get(f'/api/get-category-set/{category}/{set_num}').data)
+                          for category in auction_app.raw_player_data for set_num in (1, 2))
+    before['wire'] = len(json.dumps(auction_app.wire_codec.dictionary()))
+    for sock in [admin] + teams:
+        sock.get_received()
+
+    edit_workbook(workbook, edit)
+    watcher = auction_app.catalog_watcher
+    assert watcher.changed() is False, 'a change is only read once it has settled for a poll'
+    assert watcher.changed() is True
+    pushed = []  # (event, room, bytes) broadcast by the reload
+    emit = auction_app.socketio.emit
+    def record(event, data, room=None, **kwargs):
+        pushed.append((event, room, len(json.dumps(data, separators=(',', ':')))))
+        return emit(event, data, room=room, **kwargs)
+    auction_app.socketio.emit = record
+    started = time.perf_counter()
+    res = admin_http.post('/api/reload-catalog')
+    elapsed = time.perf_counter() - started
+    auction_app.socketio.emit = emit
+    assert res.status_code == 200, res.get_json()
+    body = res.get_json()
+    delta = body['delta']
+    assert body['changed'] and admin_http.post('/api/reload-catalog').get_json()['changed'] is False
+
+    assert [sold[0], CATEGORY] in delta['kept'] and [dropped, CATEGORY] in delta['removed']
+    assert [typo, fixed, CATEGORY] in delta['renamed'] and [moved, MOVE_FROM, MOVE_TO] in delta['moved']
+    assert len(delta['added']) == 3
+    schedule = auction.schedule
+    new_set1, new_set2 = schedule.players(CATEGORY, 1), schedule.players(CATEGORY, 2)
+    assert new_set1 == [player for player in set1 if player != dropped], 'set 1 keeps its order'
+    assert new_set2[:len(set2)] == [fixed if player == typo else player for player in set2]
+    assert sorted(new_set2[len(set2):]) == sorted(added), 'added players join the end of set 2'
+    assert state['current_player']['name'] == current and new_set1[state['current_player_index']] == current
+    assert state['current_player_index'] == index and state['lots_remaining'] == remaining - 1
+    assert state['closed'] == closed, 'closed-lot counters are unchanged'
+    assert all(auction_app.player_catalog.category_of(player) == CATEGORY for player in sold)
+    assert moved in schedule.players(MOVE_TO, 2)
+
+    # The lot on the block and the rest of the pool still sell
+    teams[0].emit('place_bid', {'player_name': current, 'amount': state['current_player']['base_price']})
+    admin.emit('sell_player', {'player_name': current})
+    assert state['current_player']['name'] == new_set1[index + 1]
+
+    full = sum(before.values())
+    print(f'{args.lots} lots of {CATEGORY} set 1 sold, then AUCTION.xlsx edited: '
+          f"{len(delta['added'])} added, {len(delta['removed'])} removed, {len(delta['renamed'])} renamed, "
+          f"{len(delta['moved'])} moved, {len(delta['kept'])} kept (sold)")
+    print(f'  reload (read, diff, remap, persist, broadcast): {elapsed * 1000:.0f} ms, catalog version {body["version"]}')
+    print(f'  lot on the block {current!r} stays at position {index}, {state["lots_remaining"]} lots left after it')
+    room = auction.room_id
+    json_client = sum(size for _, to, size in pushed if to == room)
+    dictionary = sum(size for event, _, size in pushed if event == 'wire_dictionary')
+    print(f'  pushed per client: {json_client:,} bytes '
+          f'({", ".join(event for event, to, _ in pushed if to == room)}), '
+          f'compact clients also get the new wire dictionary ({dictionary:,} bytes)')
+    print(f'  a full refetch: {full:,} bytes (/api/init {before["init"]:,}, every pool list {before["pools"]:,}, '
+          f'wire dictionary {before["wire"]:,})')
+    for sock in [admin] + teams:
+        sock.disconnect()
+
+
+if __name__ == '__main__':
+    main()
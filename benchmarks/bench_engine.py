@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Headless engine benchmark and rule fuzzer - no server, no database
+
+Runs complete mega-auctions (every category, both sets) against the real
+catalog from AUCTION.xlsx on a virtual clock with an in-memory store, and
+reports how long a full auction takes. With --fuzz, drives random actions
+at the engine and checks invariants after every step. With --abuse, one
+client floods place_bid while the others bid normally, and checks that the
+bid throttle keeps `new_bid` broadcasts within the token-bucket bounds.
+With --proxy, the same bidding wars are fought by hand (one bid per
+increment) and with maximum bids, comparing bids recorded, broadcasts and
+round trips, and checking both end with the same winner and price.
+With --memory, runs one long auction over a synthetic catalog of that many
+lots and reports how the live state, its broadcast size and the closed-lot
+archive grow.
+
+Usage:
+    python benchmarks/bench_engine.py --runs 20 --teams 10
+    python benchmarks/bench_engine.py --fuzz 5000 --seed 7
+    python benchmarks/bench_engine.py --abuse 60 --abusers 8
+    python benchmarks/bench_engine.py --proxy 200 --teams 10
+    python benchmarks/bench_engine.py --memory 600 --teams 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import COLUMNS, EXCEL_FILE, Catalog, read_player_data
+from engine import AuctionEngine, AuctionError, Bidder, MemoryStore, VirtualClock
+from throttle import BidThrottle
+
+INCREMENT = 0.25
+
+
+def make_engine(catalog, n_teams, seed, purse=100.0, throttle=None):
+    teams = {i + 1: (f'team{i}', f'Team {i}') for i in range(n_teams)}
+    events = []
+    engine = AuctionEngine(catalog, MemoryStore(teams, purse),
+                           broadcast=lambda event, data: events.append(event),
+                           clock=VirtualClock(), rng=random.Random(seed), throttle=throttle)
+    bidders = [Bidder(user_id, username, team_name) for user_id, (username, team_name) in teams.items()]
+    return engine, bidders, events
+
+
+def run_mega_auction(catalog, n_teams, seed):
+    """Every pool, every lot: a short bidding war then a sale. Returns (lots, bids)"""
+    engine, bidders, _ = make_engine(catalog, n_teams, seed)
+    rng = random.Random(seed)
+    lots = bids = 0
+    for set_num in (1, 2):
+        for category in COLUMNS:
+            engine.start_auction('start', category, set_num)
+            while engine.state['current_player']:
+                player = engine.state['current_player']
+                price = player['base_price']
+                for _ in range(rng.randint(1, 8)):
+                    bidder = rng.choice(bidders)
+                    try:
+                        engine.place_bid(bidder, player['name'], price)
+                        bids += 1
+                        price += INCREMENT
+                    except AuctionError:
+                        pass  # out of purse
+                    engine.clock.advance(2)
+                lots += 1
+                try:
+                    engine.sell(player['name'])
+                except AuctionError:
+                    # Nobody could afford it: pass the lot (pause if it was the last one)
+                    if not engine.next_player():
+                        engine.start_auction('paused')
+                        break
+    return lots, bids
+
+
+def check_invariants(engine, store):
+    sold = {lot['player_name'] for lot in engine.closed.query('sold', limit=len(engine.closed))[0]}
+    for user_id in store.teams:
+        assert store.available_purse(user_id) >= -1e-9, f'team {user_id} overspent'
+        assert abs(sum(p for _, _, p in store.purchases[user_id]) - store.spent[user_id]) < 1e-9
+    purchased = [name for items in store.purchases.values() for name, _, _ in items]
+    assert len(purchased) == len(set(purchased)), 'player sold twice'
+    assert set(purchased) == sold, 'closed lots out of sync with store'
+    assert engine.state['closed']['sold'] == len(sold), 'sold counter out of sync with closed lots'
+    current = engine.state['current_player']
+    assert set(engine.state['bids']) <= ({current['name']} if current else set()), 'bids kept for a closed lot'
+    for name, bids in engine.state['bids'].items():
+        amounts = [b['amount'] for b in bids]
+        assert amounts == sorted(amounts) and len(set(amounts)) == len(amounts), f'non-increasing bids on {name}'
+    if engine.state['status'] == 'active' and engine.state['current_player']:
+        assert engine.state['active_pool'], 'active lot without a pool'
+
+
+def fuzz(catalog, steps, n_teams, seed):
+    """Random start/bid/sell/next/pause actions with invariant checks after each"""
+    engine, bidders, _ = make_engine(catalog, n_teams, seed, purse=20.0)
+    rng = random.Random(seed)
+    names = [p for c in COLUMNS for p in catalog.players(c)]
+    rejected = 0
+    for _ in range(steps):
+        action = rng.random()
+        current = engine.state['current_player']
+        target = current['name'] if current and rng.random() < 0.9 else rng.choice(names)
+        try:
+            if action < 0.05:
+                engine.start_auction('start', rng.choice(COLUMNS), rng.choice((1, 2)))
+            elif action < 0.07:
+                engine.start_auction(rng.choice(('paused', 'start')))
+            elif action < 0.72:
+                amount = round(rng.uniform(-1, 12) * 4) / 4
+                engine.place_bid(rng.choice(bidders + [None]), target, amount)
+            elif action < 0.78:
+                engine.set_proxy(rng.choice(bidders), target, round(rng.uniform(0, 15) * 4) / 4)
+            elif action < 0.9:
+                engine.sell(target)
+            else:
+                engine.next_player()
+        except AuctionError:
+            rejected += 1
+        check_invariants(engine, engine.store)
+    return rejected
+
+
+def abuse(catalog, seconds, n_teams, n_abusers, seed, throttle=None):
+    """n_abusers bidders each fire 100 bids/sec at a lot while the rest bid every few seconds
+
+    Returns (new_bid broadcasts, most bids accepted from one abuser, honest bids sent, honest bids accepted)
+    """
+    engine, bidders, events = make_engine(catalog, n_teams, seed, purse=1e6, throttle=throttle)
+    rng = random.Random(seed)
+    engine.start_auction('start', COLUMNS[0], 1)
+    player = engine.state['current_player']['name']
+    abusers, honest = bidders[:n_abusers], bidders[n_abusers:]
+    abuser_accepted = dict.fromkeys(abusers, 0)
+    honest_sent = honest_accepted = 0
+    tick = 0.01
+    for _ in range(int(seconds / tick)):
+        wave = list(abusers)
+        if honest and rng.random() < len(honest) * tick / 3:  # each honest team bids about every 3 seconds
+            wave.append(rng.choice(honest))
+            honest_sent += 1
+        for bidder in wave:
+            try:
+                engine.place_bid(bidder, player, engine.highest_bid(player) + INCREMENT)
+                if bidder in abuser_accepted:
+                    abuser_accepted[bidder] += 1
+                else:
+                    honest_accepted += 1
+            except AuctionError:
+                pass
+        engine.clock.advance(tick)
+    return events.count('new_bid'), max(abuser_accepted.values()), honest_sent, honest_accepted
+
+
+def bidding_wars(catalog, lots, n_teams, seed, proxy):
+    """Each team values each lot privately and bids up to it, by hand or with one maximum bid
+
+    Returns (round trips, bids recorded, new_bid broadcasts, [(winner, price)] per lot).
+    """
+    engine, bidders, events = make_engine(catalog, n_teams, seed, purse=1e6)
+    rng, value_rng = random.Random(seed), random.Random(seed)  # Same values in both modes
+    requests = 0
+    results = []
+    pools = [(category, set_num) for set_num in (1, 2) for category in COLUMNS]
+    while len(results) < lots and (engine.state['current_player'] or pools):
+        if not engine.state['current_player']:
+            engine.start_auction('start', *pools.pop(0))
+            continue
+        player = engine.state['current_player']
+        values = {b: player['base_price'] + INCREMENT * value_rng.randint(0, 60) for b in bidders}
+        if proxy:
+            for bidder in rng.sample(bidders, len(bidders)):
+                requests += 1
+                try:
+                    engine.set_proxy(bidder, player['name'], values[bidder])
+                except AuctionError:
+                    pass  # Already outbid beyond this team's value
+        else:
+            # Whoever is not leading and still values the lot at the next increment bids it
+            while True:
+                leader = engine.leader(player['name'])
+                price = leader['amount'] + INCREMENT if leader else player['base_price']
+                willing = [b for b in bidders if values[b] >= price and not (leader and leader['user_id'] == b.user_id)]
+                if not willing:
+                    break
+                requests += 1
+                engine.place_bid(rng.choice(willing), player['name'], price)
+        sale = engine.sell(player['name'])
+        results.append((sale['user_id'], sale['price'], sorted(values.values())[-2:]))
+    return requests, engine.store.bid_count, events.count('new_bid'), results
+
+
+def deep_size(obj):
+    """Bytes held by a JSON-like structure (dicts, lists, scalars)"""
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_size(k) + deep_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(deep_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def memory_growth(lots, n_teams, seed, every=100):
+    """One auction over a synthetic catalog of `lots` players; [(lots closed, state KB, broadcast bytes, archive bytes)]"""
+    per_category, extra = divmod(lots, len(COLUMNS))
+    catalog = Catalog({category: {'players': [f'{category} {i}' for i in range(per_category + (c < extra))]}
+                       for c, category in enumerate(COLUMNS)})
+    teams = {i + 1: (f'team{i}', f'Team {i}') for i in range(n_teams)}
+    bidders = [Bidder(user_id, username, team_name) for user_id, (username, team_name) in teams.items()]
+    engine = AuctionEngine(catalog, MemoryStore(teams, 10000.0), clock=VirtualClock(), rng=random.Random(seed))
+    rng = random.Random(seed)
+    samples = []
+    closed = 0
+    for set_num in (1, 2):
+        for category in COLUMNS:
+            engine.start_auction('start', category, set_num)
+            while engine.state['current_player']:
+                player = engine.state['current_player']
+                price = player['base_price']
+                for _ in range(rng.randint(1, 8)):
+                    engine.place_bid(rng.choice(bidders), player['name'], price)
+                    price += INCREMENT
+                    engine.clock.advance(2)
+                closed += 1
+                if rng.random() < 0.8:
+                    engine.sell(player['name'])
+                elif not engine.next_player():
+                    engine.start_auction('paused')
+                    engine.start_auction('start', category, 3 - set_num)  # Switch away from the last lot
+                    engine.start_auction('paused')
+                    break
+                if closed % every == 0 or closed == lots:
+                    samples.append((closed, deep_size(engine.state) / 1024, len(json.dumps(engine.state)),
+                                    len(engine.closed.to_bytes())))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20, help='full mega-auctions to run')
+    parser.add_argument('--teams', type=int, default=10, help='bidding teams')
+    parser.add_argument('--fuzz', type=int, default=0, help='fuzz steps instead of the benchmark')
+    parser.add_argument('--abuse', type=int, default=0, help='seconds of bid flooding instead of the benchmark')
+    parser.add_argument('--abusers', type=int, default=1, help='flooding clients in --abuse mode')
+    parser.add_argument('--proxy', type=int, default=0, help='lots of by-hand vs maximum-bid wars instead of the benchmark')
+    parser.add_argument('--memory', type=int, default=0, help='lots in one long auction, measuring state growth')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    catalog = Catalog(read_player_data(EXCEL_FILE))
+
+    if args.fuzz:
+        started = time.perf_counter()
+        rejected = fuzz(catalog, args.fuzz, args.teams, args.seed)
+        print(f'fuzz: {args.fuzz} steps, {rejected} rejected actions, invariants held '
+              f'({time.perf_counter() - started:.2f}s)')
+        return
+
+    if args.abuse:
+        print(f'{args.abuse}s on one lot: {args.abusers} client(s) sending 100 bids/sec each, '
+              f'{args.teams - args.abusers} teams bidding every ~3s')
+        for label, throttle in (('unthrottled', None), ('throttled', BidThrottle())):
+            broadcasts, abuser, sent, accepted = abuse(catalog, args.abuse, args.teams, args.abusers, args.seed, throttle)
+            print(f'  {label:<12} new_bid broadcasts {broadcasts:>6} ({broadcasts / args.abuse:.1f}/s), '
+                  f'top abuser accepted {abuser:>5}, honest accepted {accepted}/{sent}')
+        limit = throttle.lot_burst + throttle.lot_rate * args.abuse
+        assert broadcasts <= limit, f'{broadcasts} broadcasts exceed the lot bound {limit}'
+        assert abuser <= throttle.user_burst + throttle.user_rate * args.abuse, 'abuser exceeded the bidder bound'
+        print(f'  bounded: <= {limit:.0f} broadcasts per lot, throttled {throttle.throttled}')
+        return
+
+    if args.memory:
+        print(f'{args.memory} lots, {args.teams} teams, 1-8 bids per lot, 80% sold')
+        print(f"  {'closed':>6}  {'live state KB':>13}  {'auction_state bytes':>19}  {'archive bytes':>13}")
+        for closed, state_kb, state_bytes, archive_bytes in memory_growth(args.memory, args.teams, args.seed):
+            print(f'  {closed:>6}  {state_kb:>13.1f}  {state_bytes:>19}  {archive_bytes:>13}')
+        return
+
+    if args.proxy:
+        print(f'{args.proxy} lots, {args.teams} teams each valuing a lot at base price + 0-15 Cr')
+        outcomes = {}
+        for label, proxy in (('by hand', False), ('max bids', True)):
+            started = time.perf_counter()
+            requests, rows, broadcasts, results = bidding_wars(catalog, args.proxy, args.teams, args.seed, proxy)
+            outcomes[label] = results
+            print(f'  {label:<9} round trips {requests:>6} ({requests / len(results):.1f}/lot), bids recorded {rows:>6}, '
+                  f'new_bid broadcasts {broadcasts:>6} ({time.perf_counter() - started:.2f}s)')
+        for (_, hand_price, _), (_, proxy_price, (second, top)) in zip(outcomes['by hand'], outcomes['max bids']):
+            # English auction: the top value wins at about the runner-up's value (one increment over it at most)
+            assert second <= proxy_price <= min(top, second + INCREMENT), (proxy_price, second, top)
+            assert abs(hand_price - proxy_price) <= INCREMENT, (hand_price, proxy_price)
+        print(f"  all {len(outcomes['max bids'])} lots: max-bid price within one increment of the runner-up's value "
+              f"and of the hand-fought price")
+        return
+
+    timings = []
+    for run in range(args.runs):
+        started = time.perf_counter()
+        lots, bids = run_mega_auction(catalog, args.teams, args.seed + run)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(f'{args.runs} mega-auctions, {lots} lots / {bids} bids each (last run), {args.teams} teams')
+    print(f'  per auction: median {timings[len(timings) // 2] * 1000:.2f} ms, '
+          f'min {timings[0] * 1000:.2f} ms, max {timings[-1] * 1000:.2f} ms')
+    print(f'  throughput: {args.runs / sum(timings):.1f} auctions/sec')
+
+
+if __name__ == '__main__':
+    main()
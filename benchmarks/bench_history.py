@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+History API benchmark - keyset pages and tailing vs scanning the tables
+
+Fills a temp database with --bids bids and one sale per lot across
+--auctions auctions (players from AUCTION.xlsx, a bid every few hundred
+milliseconds), then times, for one auction:
+
+- the only way to get history before: SELECT * over bids and auction_log,
+  filtered in Python
+- the first and the last page with keyset cursors, against the last page
+  with LIMIT/OFFSET
+- each filter (team, category, player, price range, time window), with the
+  history indexes and without them, and the query plan SQLite picks
+
+Then opens /api/history/bids?stream=1 (NDJSON) in a thread, inserts bids
+while it is open and checks that exactly the new rows of that auction
+arrive, in order, and that paging the whole history with cursors returns
+every row once.
+
+Usage:
+    python benchmarks/bench_history.py --bids 200000 --auctions 10
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bench_auction_rooms import CATEGORY, app, auction_app, setup_database
+from history import HISTORY_INDEXES, query_history
+
+AUCTION = 'bench0'
+
+
+def fill(database, users, players, n_bids, n_auctions, seed):
+    """Bids in rounds of rising amounts per lot; the last bid of each lot is a sale"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(database)
+    start = datetime(2026, 3, 1, 18, 0, 0)
+    bids, sales = [], []
+    lots = {auction: list(players) for auction in (f'bench{i}' for i in range(n_auctions))}
+    for lot_list in lots.values():
+        rng.shuffle(lot_list)
+    clock, lot = start, 0
+    while len(bids) < n_bids:
+        for auction, lot_list in lots.items():
+            name, category = lot_list[lot % len(lot_list)]
+            amount = 1.0
+            for _ in range(rng.randint(2, 12)):
+                clock += timedelta(milliseconds=rng.randint(50, 800))
+                amount += 0.25
+                user = rng.choice(users)
+                bids.append((user, name, amount, clock.strftime('%Y-%m-%d %H:%M:%S'), auction))
+            sales.append((name, category, 1.0, user, amount, clock.strftime('%Y-%m-%d %H:%M:%S'), auction))
+        lot += 1
+    conn.executemany('INSERT INTO bids (user_id, player_name, amount, timestamp, auction_id) VALUES (?, ?, ?, ?, ?)',
+                     bids[:n_bids])
+    conn.executemany('INSERT INTO auction_log (player_name, category, base_price, sold_to_user_id, final_price, '
+                     'timestamp, auction_id) VALUES (?, ?, ?, ?, ?, ?, ?)', sales)
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+    return start, clock
+
+
+def timed(fn, repeat=5):
+    """(result, best ms of `repeat` runs)"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, best * 1000
+
+
+def scan_everything(conn, auction_id, keep):
+    """The old way: every row of both tables, filtered in Python"""
+    bids = [row for row in conn.execute('SELECT * FROM bids').fetchall() if row[6] == auction_id and keep(row)]
+    sales = [row for row in conn.execute('SELECT * FROM auction_log').fetchall() if row[7] == auction_id]
+    return bids, sales
+
+
+def plan(conn, sql, params):
+    return '; '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bids', type=int, default=200000, help='bids in the database')
+    parser.add_argument('--auctions', type=int, default=10, help='auctions they are spread over')
+    parser.add_argument('--teams', type=int, default=8)
+    parser.add_argument('--limit', type=int, default=50, help='rows per page')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench-history-')
+    usernames = setup_database(tmp_dir, args.teams)
+    database = app.config['DATABASE']
+    auction_app.load_raw_data()
+    catalog = auction_app.player_catalog
+    players = [(name, catalog.category_of(name)) for name in catalog.names]
+    conn = sqlite3.connect(database)
+    users = [row[0] for row in conn.execute('SELECT id FROM users WHERE username != ?', (usernames[0],))]
+    started, ended = fill(database, users, players, args.bids, args.auctions, args.seed)
+    total = conn.execute('SELECT COUNT(*) FROM bids WHERE auction_id = ?', (AUCTION,)).fetchone()[0]
+    print(f'{args.bids:,} bids and {conn.execute("SELECT COUNT(*) FROM auction_log").fetchone()[0]:,} sales '
+          f'over {args.auctions} auctions; {AUCTION} has {total:,} bids')
+
+    window = ((started + (ended - started) / 2).strftime('%Y-%m-%d %H:%M:%S'),
+              (started + (ended - started) / 2 + timedelta(minutes=10)).strftime('%Y-%m-%d %H:%M:%S'))
+    category_players = catalog.players(CATEGORY)
+    filters = [
+        ('newest page', {}, lambda row: True),
+        ('team', {'team': users[0]}, lambda row: row[1] == users[0]),
+        ('category', {'players': category_players}, lambda row: row[2] in category_players),
+        ('player', {'players': [category_players[0]]}, lambda row: row[2] == category_players[0]),
+        ('price >= 3 Cr', {'min_price': 3.0}, lambda row: row[3] >= 3.0),
+        ('10 min window', {'start': window[0], 'end': window[1]}, lambda row: window[0] <= row[4] <= window[1]),
+        ('team + window', {'team': users[0], 'start': window[0], 'end': window[1]},
+         lambda row: row[1] == users[0] and window[0] <= row[4] <= window[1]),
+    ]
+
+    _, scan_ms = timed(lambda: scan_everything(conn, AUCTION, lambda row: True), repeat=2)
+    print(f'\n  SELECT * over bids and auction_log, filtered in Python: {scan_ms:.0f} ms')
+
+    # The last page: follow cursors to it, and fetch the same page by OFFSET
+    cursor, pages = None, 0
+    while True:
+        rows, next_cursor = query_history(conn, 'bids', AUCTION, before=cursor, limit=args.limit)
+        if next_cursor is None:
+            break
+        cursor, pages = next_cursor, pages + 1
+    _, first_ms = timed(lambda: query_history(conn, 'bids', AUCTION, limit=args.limit))
+    deep, deep_ms = timed(lambda: query_history(conn, 'bids', AUCTION, before=cursor, limit=args.limit))
+    offset = pages * args.limit
+    by_offset, offset_ms = timed(lambda: conn.execute(
+        'SELECT id FROM bids WHERE auction_id = ? ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?',
+        (AUCTION, args.limit, offset)).fetchall())
+    assert [row['id'] for row in deep[0]] == [row[0] for row in by_offset], 'cursor and OFFSET pages differ'
+    print(f'  page 1: {first_ms:.2f} ms; page {pages + 1} by cursor {deep_ms:.2f} ms, by OFFSET {offset_ms:.2f} ms')
+
+    print(f"\n  {'filter':<15} {'rows/page':>9} {'indexed':>9} {'no index':>9}  plan")
+    results = {}
+    for label, kwargs, _ in filters:
+        results[label] = timed(lambda: query_history(conn, 'bids', AUCTION, limit=args.limit, **kwargs))
+    for statement in HISTORY_INDEXES:
+        conn.execute('DROP INDEX ' + statement.split(' IF NOT EXISTS ')[1].split()[0])
+    for label, kwargs, keep in filters:
+        (rows, _), indexed_ms = results[label]
+        _, unindexed_ms = timed(lambda: query_history(conn, 'bids', AUCTION, limit=args.limit, **kwargs), repeat=2)
+        expected = sorted(scan_everything(conn, AUCTION, keep)[0], key=lambda row: (row[4], row[0]), reverse=True)
+        assert [row['id'] for row in rows] == [row[0] for row in expected[:args.limit]], label
+        results[label] = (rows, indexed_ms, unindexed_ms)
+    for statement in HISTORY_INDEXES:
+        conn.execute(statement)
+    conn.execute('ANALYZE')
+    explain = sqlite3.connect(database)
+    for label, kwargs, _ in filters:
+        rows, indexed_ms, unindexed_ms = results[label]
+        sql_plan = []
+        explain.set_trace_callback(sql_plan.append)
+        query_history(explain, 'bids', AUCTION, limit=args.limit, **kwargs)
+        explain.set_trace_callback(None)
+        sql = sql_plan[-1]
+        print(f'  {label:<15} {len(rows):>9} {indexed_ms:>7.2f}ms {unindexed_ms:>7.1f}ms  '
+              f'{plan(conn, sql, ())}')
+
+    # Paging everything with cursors returns every row once
+    seen, cursor = [], None
+    while True:
+        rows, cursor = query_history(conn, 'sales', AUCTION, before=cursor, limit=args.limit)
+        seen += [row['id'] for row in rows]
+        if cursor is None:
+            break
+    sales = [row[0] for row in conn.execute('SELECT id FROM auction_log WHERE auction_id = ?', (AUCTION,))]
+    assert sorted(seen) == sorted(sales) and len(seen) == len(set(seen))
+    print(f'\n  paged all {len(seen)} sales of {AUCTION} with cursors: each row once')
+
+    # Tail over HTTP while bids arrive
+    client = app.test_client()
+    assert client.post('/login', json={'username': usernames[1], 'password': usernames[1]}).status_code == 200
+    page = client.get(f'/api/history/bids?auction={AUCTION}&limit=5').get_json()
+    assert page['success'] and len(page['rows']) == 5, page
+    received = []
+    def tail():
+        res = client.get(f'/api/history/bids?auction={AUCTION}&stream=1&timeout=3', buffered=False)
+        for line in res.response:
+            received.append(json.loads(line))
+        res.close()
+    tailer = threading.Thread(target=tail)
+    tailer.start()
+    time.sleep(0.5)
+    inserted = []
+    for i in range(20):
+        auction_id = AUCTION if i % 2 else 'bench1'
+        cur = conn.execute('INSERT INTO bids (user_id, player_name, amount, auction_id) VALUES (?, ?, ?, ?)',
+                           (users[i % len(users)], category_players[0], 20.0 + i, auction_id))
+        conn.commit()
+        if auction_id == AUCTION:
+            inserted.append(cur.lastrowid)
+        time.sleep(0.1)
+    tailer.join()
+    assert [row['id'] for row in received] == inserted, (received, inserted)
+    print(f'  stream=1 tail: {len(received)} of {len(inserted)} new {AUCTION} bids received in order, '
+          f'no other rows ({auction_app.HISTORY_POLL_INTERVAL:g} s polls, index seek from the last cursor)')
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Conditional GET benchmark - bytes the ETag/304 layer saves over an auction session
+
+Plays one pool in-process (Socket.IO test clients, temp database). The admin
+browser refetches /api/init on every auction_state (as auction.js does) and
+the pool list per lot. Every team loads the page (/api/init) and opens the
+player card of each lot, then reloads the page and reopens them all. Each
+browser keeps the last ETag per URL and revalidates with If-None-Match, like
+a browser cache on `Cache-Control: no-cache`. Reports, per endpoint, the
+requests, 304s and bytes sent against the full bodies they stand for. Checks
+that a sale changes the pool list and a reseed changes /api/init.
+
+Player cards fall back to the built-in stats when the internet is out of reach.
+
+Usage:
+    python benchmarks/bench_http_cache.py --teams 8 --lots 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bench_auction_rooms import CATEGORY, app, auction_app, connect, setup_database
+
+
+class Browser:
+    """Test client that revalidates with the last ETag per URL and counts bytes"""
+
+    def __init__(self, username, stats):
+        self.http = app.test_client()
+        assert self.http.post('/login', json={'username': username, 'password': username}).status_code == 200
+        self.cache = {}  # url -> (etag, body)
+        self.stats = stats
+
+    def get(self, endpoint, url):
+        headers = {'If-None-Match': self.cache[url][0]} if url in self.cache else {}
+        res = self.http.get(url, headers=headers)
+        stats = self.stats[endpoint]
+        stats['requests'] += 1
+        stats['sent'] += len(res.data)
+        if res.status_code == 304:
+            stats['not_modified'] += 1
+            body = self.cache[url][1]
+        else:
+            assert res.status_code == 200, (url, res.status_code)
+            body = res.data
+            self.cache[url] = (res.headers['ETag'], body)
+        stats['full'] += len(body)
+        return res.status_code, res.get_json(silent=True) if res.status_code == 200 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=8, help='team browsers opening each player card')
+    parser.add_argument('--lots', type=int, default=20, help='lots sold (at most the pool size)')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench-http-cache-')
+    usernames = setup_database(tmp_dir, args.teams)
+    auction_app.load_raw_data()
+    stats = defaultdict(lambda: defaultdict(int))
+    admin = Browser(usernames[0], stats)
+    teams = [Browser(username, stats) for username in usernames[1:]]
+    admin_socket = connect(usernames[0], 'main')
+    team_sockets = [connect(username, 'main') for username in usernames[1:]]  # Take turns (bid rate limits)
+    pool_url = f'/api/get-category-set/{CATEGORY}/1'
+
+    for browser in [admin] + teams:
+        browser.get('init', '/api/init')
+    admin.get('get-category-set', pool_url)
+    admin_socket.emit('start_auction', {'action': 'start', 'category': CATEGORY, 'set': 1})
+    state = auction_app.get_auction('main').state
+    lots = 0
+    players = []
+    while state['current_player'] and lots < args.lots:
+        player = state['current_player']['name']
+        players.append(player)
+        admin.get('init', '/api/init')  # auction_state -> the admin grid refreshes
+        for browser in teams:
+            browser.get('player-info', f'/api/player-info/{player}')
+        team_sockets[lots % len(team_sockets)].emit('place_bid', {'player_name': player, 'amount': state['current_player']['base_price']})
+        admin_socket.emit('sell_player', {'player_name': player})
+        status, pool = admin.get('get-category-set', pool_url)
+        assert status == 200, 'a sale must change the pool list'
+        assert any(p['name'] == player and p['sold'] for p in pool['players'])
+        lots += 1
+
+    for browser in teams:  # Page reload: the grid and every card seen so far
+        assert browser.get('init', '/api/init')[0] == 304
+        for player in players:
+            browser.get('player-info', f'/api/player-info/{player}')
+    status, _ = admin.get('init', '/api/init')
+    assert status == 304
+    admin_socket.emit('start_auction', {'action': 'paused'})
+    assert admin.http.post('/api/init', json={'reseed': True}).status_code == 200
+    status, _ = admin.get('init', '/api/init')
+    assert status == 200, 'a reseed must change /api/init'
+
+    print(f'{lots} lots of {CATEGORY} set 1, {args.teams} team browsers + admin, revalidating with If-None-Match')
+    print(f"  {'endpoint':<17} {'requests':>8} {'304s':>6} {'bytes sent':>11} {'full bodies':>12} {'saved':>6}")
+    total_sent = total_full = 0
+    for endpoint, s in stats.items():
+        total_sent += s['sent']
+        total_full += s['full']
+        print(f"  {endpoint:<17} {s['requests']:>8} {s['not_modified']:>6} {s['sent']:>11,} {s['full']:>12,} "
+              f"{1 - s['sent'] / s['full']:>6.0%}")
+    print(f"  {'total':<17} {'':>8} {'':>6} {total_sent:>11,} {total_full:>12,} {1 - total_sent / total_full:>6.0%}")
+    saved = admin.http.get('/api/cache-stats').get_json()['bytes_saved']
+    print('  per session (X-Bytes-Saved / /api/cache-stats): '
+          + ', '.join(f'{session} {size:,}' for session, size in sorted(saved.items())[:4]) + ', ...')
+    for sock in [admin_socket] + team_sockets:
+        sock.disconnect()
+
+
+if __name__ == '__main__':
+    main()
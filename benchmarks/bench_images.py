@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Player image cache benchmark - against a local HTTP stand-in, no internet
+
+Starts a stand-in image server on localhost and points the app's image
+cache at it (IMAGE_UPSTREAM). Then every client in a room asks for the
+headshot of every player with an image, the way browsers do when a lot
+comes up. Reports how many upstream fetches and bytes that costs compared
+to each client downloading the original. It also reports proxy and warm
+cache latency, and checks that starting a pool prefetches the next lots.
+
+Usage:
+    python benchmarks/bench_images.py --clients 10 --image-kb 60
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+
+class StandIn(ThreadingHTTPServer):
+    """Serves a fixed-size fake image for any path and counts requests"""
+    daemon_threads = True
+
+    def __init__(self, image_bytes, delay):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.image = random.Random(0).randbytes(image_bytes)
+        self.delay = delay
+        self.requests = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.delay)  # Simulated upstream round trip
+        # Vary the body per path so every player gets distinct content
+        body = self.path.encode('utf-8') + server.image
+        with server.lock:
+            server.requests += 1
+            server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/webp')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=10, help='browsers asking for each headshot')
+    parser.add_argument('--image-kb', type=int, default=60, help='size of each upstream image')
+    parser.add_argument('--delay-ms', type=float, default=50, help='simulated upstream latency')
+    args = parser.parse_args()
+
+    stand_in = StandIn(args.image_kb * 1024, args.delay_ms / 1000)
+    threading.Thread(target=stand_in.serve_forever, daemon=True).start()
+    os.environ['IMAGE_UPSTREAM'] = stand_in.url
+    tmp_dir = tempfile.mkdtemp(prefix='bench-images-')
+    os.chdir(ROOT)
+
+    import app as auction_app
+    import images
+    from bench_auction_rooms import connect, setup_database
+    auction_app.image_cache = images.ImageCache(os.path.join(tmp_dir, 'images'), upstream=stand_in.url)
+    app = auction_app.app
+
+    players = [name for name, details in auction_app.PLAYER_DETAILS.items() if details.get('image_url')]
+    http = app.test_client()
+    proxy_latencies, cached_latencies, served = [], [], 0
+    for player in players:
+        for client in range(args.clients):
+            started = time.perf_counter()
+            res = http.get(f'/api/player-image/{player}')
+            assert res.status_code == 302, res.status_code
+            image = http.get(res.headers['Location'])
+            elapsed = time.perf_counter() - started
+            assert image.status_code == 200 and 'immutable' in image.headers['Cache-Control']
+            served += len(image.data)
+            (proxy_latencies if client == 0 else cached_latencies).append(elapsed)
+
+    direct_bytes = stand_in.bytes_sent * args.clients
+    print(f'{len(players)} players with headshots, {args.clients} clients each, '
+          f'{args.image_kb} KB images, {args.delay_ms:.0f} ms upstream latency')
+    print(f'  upstream fetches: {stand_in.requests} (direct: {len(players) * args.clients})')
+    print(f'  upstream bytes:   {stand_in.bytes_sent:,} (direct: {direct_bytes:,})')
+    print(f'  bytes to clients: {served:,}')
+    print(f'  stored bytes:     {auction_app.image_cache.stats["stored_bytes"]:,}'
+          + ('' if images.Image is not None else ' (Pillow not installed: originals kept)'))
+    print(f'  first request p50: {percentile(proxy_latencies, 50) * 1000:.1f} ms, '
+          f'cached p50: {percentile(cached_latencies, 50) * 1000:.2f} ms')
+    print('  (browsers then serve repeat views from their own cache: immutable, max-age 1 year)')
+
+    # Prefetch: starting a pool warms the lot on the block and the next few, before anyone asks
+    auction_app.image_cache = images.ImageCache(os.path.join(tmp_dir, 'prefetch'), upstream=stand_in.url)
+    usernames = setup_database(tmp_dir, 1)
+    auction_app.load_raw_data()
+    catalog = auction_app.player_catalog
+    category = max(catalog.data, key=lambda c: sum(bool(auction_app.player_image_source(p)) for p in catalog.players(c)))
+    admin = connect(usernames[0], 'images')
+    admin.emit('start_auction', {'action': 'start', 'category': category, 'set': 1})
+    engine = auction_app.get_engine(auction_app.auction_registry.get('images'))
+    window = [engine.state['current_player']['name']] + engine.upcoming(auction_app.IMAGE_PREFETCH_LOTS)
+    sources = [source for source in map(auction_app.player_image_source, window) if source]
+    started = time.perf_counter()
+    while time.perf_counter() - started < 5 and not all(map(auction_app.image_cache.cached, sources)):
+        time.sleep(0.01)
+    cached = sum(bool(auction_app.image_cache.cached(source)) for source in sources)
+    print(f'  prefetch on pool start ({category} set 1): {cached}/{len(sources)} headshots of the next '
+          f'{len(window)} lots cached in {(time.perf_counter() - started) * 1000:.0f} ms')
+    admin.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Login burst benchmark - Socket.IO responsiveness while every team logs in at once
+
+Starts the app in a subprocess against a temp database of teams with real
+(default scrypt) password hashes. One connected client keeps polling
+`get_auction_state` as the auction page does. Then N logins are fired at
+/login at the same moment. Reports the poll round-trip before and during
+the burst, login latency, status codes and server memory growth.
+
+Runs once with password checks inline on the request threads
+(LOGIN_HASH_WORKERS=0, the old behaviour) and once on the worker pool:
+    python benchmarks/bench_login.py --logins 50 --workers 0,2
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import requests
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_bidding import ADMIN_USERNAME, free_port, percentile, process_stats, serve
+from passwords import HashPool
+
+POLL_INTERVAL = 0.05
+
+
+def create_users(db_path, n_teams):
+    """Admin plus n teams, each with a default-strength hash of its username"""
+    os.chdir(ROOT)
+    import app as auction_app
+    auction_app.app.config['DATABASE'] = db_path
+    auction_app.init_db()
+    usernames = [ADMIN_USERNAME] + [f'team{i}' for i in range(n_teams)]
+    pool = HashPool()
+    hashes = pool.hash_many(usernames)
+    pool.shutdown()
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO users (username, email, password_hash, team_name, purse) VALUES (?, ?, ?, ?, ?)',
+                     [(u, f'{u}@bench.local', h, f'{u} XI', 100.0) for u, h in zip(usernames, hashes)])
+    conn.commit()
+    conn.close()
+    return usernames
+
+
+class Poller:
+    """Logged-in client that round-trips get_auction_state continuously"""
+
+    def __init__(self, base_url, username):
+        http = requests.Session()
+        http.post(f'{base_url}/login', json={'username': username, 'password': username}).raise_for_status()
+        self.received = threading.Event()
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on('auction_state', lambda state: self.received.set())
+        cookie = '; '.join(f'{k}={v}' for k, v in http.cookies.items())
+        self.sio.connect(base_url, headers={'Cookie': cookie})
+        self.samples = []  # (sent time, round trip)
+        self.running = True
+        self.dropped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            self.received.clear()
+            sent = time.perf_counter()
+            try:
+                self.sio.emit('get_auction_state')
+            except socketio.exceptions.SocketIOError:
+                self.dropped = True  # Server too busy to answer the transport: connection lost
+                break
+            if self.received.wait(10):
+                self.samples.append((sent, time.perf_counter() - sent))
+            time.sleep(POLL_INTERVAL)
+
+    def between(self, start, end):
+        return [rtt for sent, rtt in self.samples if start <= sent < end]
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        if not self.dropped:
+            self.sio.disconnect()
+
+
+def burst(base_url, usernames):
+    """Log every user in at once; returns [(status, seconds)]"""
+    results = [None] * len(usernames)
+    barrier = threading.Barrier(len(usernames))
+
+    def login(i, username):
+        barrier.wait()
+        started = time.perf_counter()
+        res = requests.post(f'{base_url}/login', json={'username': username, 'password': username}, timeout=120)
+        results[i] = (res.status_code, time.perf_counter() - started)
+
+    threads = [threading.Thread(target=login, args=(i, u)) for i, u in enumerate(usernames)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run(db_path, usernames, workers):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, LOGIN_HASH_WORKERS=str(workers))
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', db_path, '--port', str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                requests.get(f'{base_url}/', timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError('server did not start')
+                time.sleep(0.2)
+
+        poller = Poller(base_url, usernames[0])
+        time.sleep(1)
+        idle_end = time.perf_counter()
+        rss_before = process_stats(server.pid)[1] or 0.0
+        results = burst(base_url, usernames[1:])
+        burst_end = time.perf_counter()
+        rss_after = process_stats(server.pid)[1] or 0.0
+        poller.stop()
+        idle = poller.between(0, idle_end)
+        during = poller.between(idle_end, burst_end)
+    finally:
+        server.terminate()
+        server.wait(10)
+
+    ok = [seconds for status, seconds in results if status == 200]
+    return {
+        'workers': workers,
+        'idle_p50_ms': percentile(idle, 50) * 1000,
+        'burst_p50_ms': percentile(during, 50) * 1000,
+        'burst_max_ms': max(during, default=0.0) * 1000,
+        'polls_during_burst': len(during),
+        'burst_seconds': burst_end - idle_end,
+        'login_p50_ms': percentile(ok, 50) * 1000,
+        'login_p95_ms': percentile(ok, 95) * 1000,
+        'statuses': dict(Counter(status for status, _ in results)),
+        'rss_growth_mb': rss_after - rss_before,
+        'dropped': poller.dropped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=50, help='simultaneous logins')
+    parser.add_argument('--workers', default='0,2', help='LOGIN_HASH_WORKERS settings to compare (0 = inline)')
+    parser.add_argument('--serve', metavar='DB', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        usernames = create_users(db_path, args.logins)
+        print(f'{args.logins} simultaneous logins, scrypt hashes, get_auction_state polled every '
+              f'{POLL_INTERVAL * 1000:.0f} ms by one connected client')
+        print(f"{'workers':>8}{'idle p50':>10}{'burst p50':>11}{'burst max':>11}{'polls':>7}"
+              f"{'login p50':>11}{'login p95':>11}{'burst s':>9}{'rss +MB':>9}  statuses")
+        for workers in [int(w) for w in args.workers.split(',')]:
+            r = run(db_path, usernames, workers)
+            print(f"{r['workers'] or 'inline':>8}{r['idle_p50_ms']:>8.1f}ms{r['burst_p50_ms']:>9.1f}ms"
+                  f"{r['burst_max_ms']:>9.1f}ms{r['polls_during_burst']:>7}{r['login_p50_ms']:>9.0f}ms"
+                  f"{r['login_p95_ms']:>9.0f}ms{r['burst_seconds']:>9.2f}{r['rss_growth_mb']:>9.1f}  {r['statuses']}"
+                  + ('  (poller disconnected)' if r['dropped'] else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Player name resolution benchmark - spelling variants of known players
+
+Builds the catalog from AUCTION.xlsx (the name index is built and every
+sheet row resolved at load), then types each known player (critical players
+and players with stats) in a handful of ways: initials with dots, missing or
+doubled letters, swapped vowels, two surname letters transposed ("Kholi"),
+odd spacing and case. Reports how many variants the old exact
+`lower().strip()` lookup finds compared to the index.
+It also reports sheet rows that resolve to a known player other than
+themselves (false positives), plus the build and per-lookup times.
+
+Usage:
+    python benchmarks/bench_names.py --lookups 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from catalog import CRITICAL_PLAYERS, EXCEL_FILE, Catalog, read_player_data
+from names import NameIndex, normalize
+
+VOWEL_SWAPS = (('ee', 'i'), ('a', 'e'), ('u', 'oo'), ('o', 'u'))
+
+
+def variants(name):
+    """Plausible ways a sheet might spell a known (lowercase) name"""
+    words = name.split()
+    out = {name.title(), f'  {name.upper()} '}
+    if len(words[0]) <= 3:
+        out.add('. '.join(words[0].upper()) + '. ' + ' '.join(w.title() for w in words[1:]))  # "M. S. Dhoni"
+    for i in range(1, len(name) - 1):
+        if name[i] == name[i + 1] and name[i].isalpha():
+            out.add((name[:i] + name[i + 1:]).title())  # Doubled letter dropped
+            break
+    last = words[-1]
+    out.add(' '.join(words[:-1] + [last + last[-1]]).title())  # Last letter doubled
+    if len(last) > 3 and last[1] != last[2]:
+        out.add(' '.join(words[:-1] + [last[0] + last[2] + last[1] + last[3:]]).title())  # "Kholi"
+    for old, new in VOWEL_SWAPS:
+        if old in words[0][1:]:
+            out.add(' '.join([words[0][0] + words[0][1:].replace(old, new, 1)] + words[1:]).title())
+            break
+    out.discard(name)
+    return sorted(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lookups', type=int, default=200000, help='timed lookups of a resolved name')
+    args = parser.parse_args()
+
+    import app  # PLAYER_DETAILS
+    data = read_player_data(EXCEL_FILE)
+    started = time.perf_counter()
+    catalog = Catalog(data, known_names=app.PLAYER_DETAILS)
+    build = time.perf_counter() - started
+    known = sorted({normalize(name) for name in CRITICAL_PLAYERS} | set(app.PLAYER_DETAILS))
+
+    exact_hits = index_hits = wrong = total = 0
+    misses = []
+    for name in known:
+        for variant in variants(name):
+            total += 1
+            exact_hits += variant.lower().strip() == name
+            resolved = NameIndex(known).resolve(variant)  # Fresh index: no memoized answers
+            index_hits += resolved == name
+            if resolved not in (None, name):
+                wrong += 1
+                misses.append(f'{variant!r} -> {resolved!r}')
+            elif resolved is None:
+                misses.append(f'{variant!r} -> unmatched')
+
+    false_positives = [(player, known_name) for player, (known_name, how, _) in catalog.name_matches.items()
+                       if how == 'fuzzy' and normalize(player) != known_name]
+    print(f'{len(catalog.names)} sheet rows, {len(known)} known players, index built and sheet resolved in '
+          f'{build * 1000:.1f} ms')
+    print(f'  {total} spelling variants: exact lookup finds {exact_hits} ({exact_hits / total:.0%}), '
+          f'name index {index_hits} ({index_hits / total:.0%}), {wrong} resolved to the wrong player')
+    for miss in misses[:8]:
+        print(f'    missed: {miss}')
+    print(f'  sheet rows fuzzy-matched: {len(false_positives)} {false_positives[:5]}')
+    print(f'  known players not in the sheet: {", ".join(catalog.unmatched()) or "none"}')
+
+    index = catalog.name_index
+    for label, name in (('resolved sheet name', catalog.names[0]), ('variant (memoized)', 'M.S. Dhoni')):
+        index.resolve(name)
+        started = time.perf_counter()
+        for _ in range(args.lookups):
+            catalog.key(name)
+        print(f'  key() of a {label}: {(time.perf_counter() - started) / args.lookups * 1e6:.2f} us')
+    started = time.perf_counter()
+    cold = [f'Unknown Player {i}' for i in range(2000)]
+    for name in cold:
+        index.match(name)
+    print(f'  first lookup of an unknown name (trigram search): '
+          f'{(time.perf_counter() - started) / len(cold) * 1e6:.1f} us')
+
+
+if __name__ == '__main__':
+    main()
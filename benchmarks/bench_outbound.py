@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Slow-spectator benchmark - what a stalled connection gets sent after a bidding war
+
+Starts the app in a subprocess (bid throttle off) with a few bidding teams
+on real Socket.IO clients, plus spectators speaking raw Engine.IO
+long-polling. The spectators stop polling (a phone in a tunnel) while the
+teams fire a bid storm, then resume. Reports how many packets and bytes
+each spectator is sent to catch up, the server-side queue depth while
+stalled, and whether it ends up showing the real highest bid.
+
+Runs with the per-connection outbound queues off (every broadcast queued in
+full) and on (coalesced, snapshot resync):
+    python benchmarks/bench_outbound.py --teams 5 --bids 100 --spectators 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_bidding import CATEGORY, INCREMENT, BenchClient, Recorder, bid_storm, create_users, free_port, process_stats, serve
+
+RECORD_SEPARATOR = '\x1e'  # Between packets in an Engine.IO v4 polling payload
+ROUND = 10  # Bids per team per storm round (a polling client batches at most 16 emits per request)
+
+
+class StalledSpectator:
+    """Logged-in long-polling client that can stop collecting its packets
+
+    A poll is never abandoned (the server would write the next packets into
+    it and they'd be lost): stalling just means not sending the next one.
+    """
+
+    def __init__(self, base_url, username):
+        self.http = requests.Session()
+        self.http.post(f'{base_url}/login', json={'username': username, 'password': username}).raise_for_status()
+        self.url = f'{base_url}/socket.io/?EIO=4&transport=polling'
+        handshake = json.loads(self.http.get(self.url, timeout=5).text[1:])
+        self.url += f"&sid={handshake['sid']}"
+        self.http.post(self.url, data='40', timeout=5).raise_for_status()  # Join the default namespace
+        self.lock = threading.Lock()
+        self.packets = self.bytes = 0
+        self.highest = None
+        self.polling = threading.Event()
+        self.polling.set()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        while True:
+            self.polling.wait()
+            try:
+                body = self.http.get(self.url, timeout=60).text
+            except requests.RequestException:
+                return
+            for packet in body.split(RECORD_SEPARATOR):
+                if packet == '2':
+                    self.http.post(self.url, data='3', timeout=5)  # Answer pings so we stay connected
+                self.received(packet)
+
+    def received(self, packet):
+        highest = None
+        if packet.startswith('42'):
+            event, data = json.loads(packet[2:])
+            if event == 'new_bid':
+                highest = data['bid']['amount']  # Bids can arrive out of order: keep the highest
+            elif event == 'auction_state' and data.get('current_player'):
+                bids = data['bids'].get(data['current_player']['name']) or []
+                highest = max((bid['amount'] for bid in bids), default=None)
+        with self.lock:
+            self.packets += 1
+            self.bytes += len(packet.encode())
+            if highest is not None:
+                self.highest = max(highest, self.highest or 0)
+
+    def stall(self):
+        """Stop polling (the poll in flight still completes) and reset the counters"""
+        self.polling.clear()
+        with self.lock:
+            self.packets = self.bytes = 0
+
+    def resume(self, expected, timeout=15):
+        """Poll again until the highest bid is `expected`; returns (packets, bytes, highest bid seen)"""
+        self.polling.set()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self.lock:
+                if self.highest == expected:
+                    break
+            time.sleep(0.05)
+        time.sleep(0.5)  # Anything still on its way
+        with self.lock:
+            return self.packets, self.bytes, self.highest
+
+
+def outbound_metrics(base_url):
+    """socketio_outbound_* lines from /api/metrics"""
+    text = requests.get(f'{base_url}/api/metrics', timeout=5).text
+    return [line for line in text.splitlines() if line.startswith('socketio_outbound')]
+
+
+def run(db_path, usernames, n_teams, n_spectators, bids, stall, queues):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, BID_THROTTLE='off', OUTBOUND_QUEUES='on' if queues else 'off')
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', db_path, '--port', str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                requests.get(f'{base_url}/', timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError('server did not start')
+                time.sleep(0.2)
+
+        recorder = Recorder()
+        admin = BenchClient(base_url, usernames[0], ['polling'], recorder)
+        teams = [BenchClient(base_url, u, ['polling'], recorder) for u in usernames[1:n_teams + 1]]
+        spectators = [StalledSpectator(base_url, u) for u in usernames[n_teams + 1:n_teams + 1 + n_spectators]]
+        admin.state_event.clear()
+        admin.sio.emit('start_auction', {'action': 'start', 'category': CATEGORY, 'set': 1})
+        admin.state_event.wait(10)
+        time.sleep(0.5)
+        player = admin.state['current_player']
+        for spectator in spectators:
+            spectator.stall()
+        rss_before = process_stats(server.pid)[1] or 0.0
+        started = time.perf_counter()
+        sent = 0
+        for offset in range(0, bids, ROUND):
+            sent += bid_storm(teams, player['name'], player['base_price'], min(ROUND, bids - offset),
+                              offset * len(teams) * INCREMENT)
+            time.sleep(0.05)
+        time.sleep(stall)
+        stalled = time.perf_counter() - started
+        rss_stalled = process_stats(server.pid)[1] or 0.0
+        depths = {}  # queue -> deepest connection while stalled
+        for line in outbound_metrics(base_url):
+            if 'queue_depth' in line:
+                queue = line.split('queue="')[1].split('"')[0]
+                depths[queue] = max(depths.get(queue, 0), float(line.rsplit(' ', 1)[1]))
+
+        admin.state_event.clear()
+        admin.sio.emit('get_auction_state')
+        admin.state_event.wait(10)
+        bids_on_lot = admin.state['bids'].get(player['name']) or []
+        highest = max(bid['amount'] for bid in bids_on_lot)
+
+        caught_up = [spectator.resume(highest) for spectator in spectators]
+        totals = [line for line in outbound_metrics(base_url) if '_total' in line]
+        for client in [admin] + teams:
+            client.sio.disconnect()
+    finally:
+        server.terminate()
+        server.wait(10)
+
+    return {
+        'queues': queues,
+        'bids_sent': sent,
+        'bids_accepted': len(bids_on_lot),
+        'stalled_seconds': stalled,
+        'packets': [count for count, _, _ in caught_up],
+        'kb': [size / 1024 for _, size, _ in caught_up],
+        'up_to_date': all(seen == highest for _, _, seen in caught_up),
+        'rss_growth_mb': rss_stalled - rss_before,
+        'depths': depths,
+        'totals': totals,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=5, help='bidding teams')
+    parser.add_argument('--bids', type=int, default=100, help='bids per team in the storm')
+    parser.add_argument('--spectators', type=int, default=3, help='stalled long-polling spectators')
+    parser.add_argument('--stall', type=float, default=1.0, help='seconds spectators stay stalled after the storm')
+    parser.add_argument('--serve', metavar='DB', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        usernames = create_users(db_path, args.teams + args.spectators)
+        print(f'{args.teams} teams x {args.bids} bids on one lot while {args.spectators} spectator(s) stop polling')
+        for queues in (False, True):
+            r = run(db_path, usernames, args.teams, args.spectators, args.bids, args.stall, queues)
+            print(f"\noutbound queues {'on' if queues else 'off'}: {r['bids_accepted']} of {r['bids_sent']} bids "
+                  f"accepted, spectators stalled {r['stalled_seconds']:.1f}s, server RSS +{r['rss_growth_mb']:.1f} MB")
+            print(f"  to catch up each spectator got {', '.join(str(n) for n in r['packets'])} packets "
+                  f"({', '.join(f'{kb:.1f}' for kb in r['kb'])} KB); "
+                  f"shows the highest bid: {'yes' if r['up_to_date'] else 'NO'}")
+            if r['depths']:
+                print(f"  deepest queues while stalled: {r['depths'].get('transport', 0):.0f} transport packets, "
+                      f"{r['depths'].get('coalesced', 0):.0f} coalesced messages")
+            for line in r['totals']:
+                print(f'  {line}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Player info benchmark - Wikipedia summaries vs article scraping, no internet
+
+Starts a local HTTP stand-in that serves the recorded responses in
+benchmarks/fixtures/player_info: REST summaries (<Title>.summary.json),
+articles (<Title>.html) and an ESPN Cricinfo search page. Articles are
+recorded trimmed and padded back to --page-kb, the size of a real player
+article; every response is delayed by --delay-ms plus its size at --kbps.
+Mohammed Siraj has no summary (404) and Rahul Sharma's is a disambiguation,
+so both take the article fallback.
+
+Fetches every fixture player's card with the summary-first sources and with
+article scraping only (the old path), reporting per source requests, bytes
+and latency, and the card fields each path found. Then points the app at
+the stand-in (PLAYER_INFO_UPSTREAM) and checks the per-source metrics.
+
+Usage:
+    python benchmarks/bench_player_info.py --page-kb 400 --kbps 2000
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from player_sources import DEFAULT_GROUPS, CricinfoSearch, PlayerInfoSources, WikipediaPage
+
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures', 'player_info')
+FIELDS = ('description', 'wikipedia_image', 'birth_info', 'nationality', 'cricinfo_url')
+# Filler standing in for the trimmed career sections, statistics tables and references
+FILLER = ('<li id="cite_note-{0}"><span class="reference-text"><cite class="citation news cs1">'
+          '<a rel="nofollow" class="external text" href="https://www.espncricinfo.com/story/{0}">'
+          'Match report {0}</a>. <i>ESPNcricinfo</i>. Retrieved 12 October 2026.</cite></span></li>\n')
+
+
+def fixture(name):
+    try:
+        with open(os.path.join(FIXTURES, name), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def pad(page, size):
+    """Article with the trimmed sections stood in for by references, to about `size` bytes"""
+    filler, n = [], 0
+    while len(page) + sum(map(len, filler)) < size:
+        filler.append(FILLER.format(n).encode())
+        n += 1
+    return page.replace(b'</main>', b'<ol class="references">\n' + b''.join(filler) + b'</ol>\n</main>', 1)
+
+
+class StandIn(ThreadingHTTPServer):
+    """Serves the recorded Wikipedia and Cricinfo responses and counts requests"""
+    daemon_threads = True
+
+    def __init__(self, page_bytes, delay, bytes_per_second):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.page_bytes = page_bytes
+        self.delay = delay
+        self.bytes_per_second = bytes_per_second
+        self.requests = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def route(self):
+        """(status, content type, body) for the request path"""
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        if path.startswith('/api/rest_v1/page/summary/'):
+            body = fixture(path.rsplit('/', 1)[1] + '.summary.json')
+            if body is None:
+                return 404, 'application/problem+json', json.dumps(
+                    {'type': 'https://mediawiki.org/wiki/HyperSwitch/errors/not_found', 'title': 'Not found.',
+                     'method': 'get', 'uri': path}).encode()
+            return 200, 'application/json; charset=utf-8', body
+        if path.startswith('/wiki/'):
+            body = fixture(path[len('/wiki/'):] + '.html')
+            if body is None:
+                return 404, 'text/html; charset=UTF-8', b'<!DOCTYPE html><title>Not found</title>'
+            return 200, 'text/html; charset=UTF-8', pad(body, self.server.page_bytes)
+        if path == '/search':
+            query = parse_qs(parts.query).get('q', [''])[0].lower()
+            results = ''.join(
+                f'<li><a href="/players/{title.lower().replace("_", "-")}-{n}">{title.replace("_", " ")}</a></li>\n'
+                for n, title in enumerate(players()) if title.replace('_', ' ').lower() == query)
+            return 200, 'text/html; charset=utf-8', fixture('cricinfo_search.html').replace(b'{results}', results.encode())
+        return 404, 'text/plain', b'not found'
+
+    def do_GET(self):
+        server = self.server
+        status, content_type, body = self.route()
+        time.sleep(server.delay + len(body) / server.bytes_per_second)  # Round trip + transfer time
+        with server.lock:
+            server.requests += 1
+            server.bytes_sent += len(body)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def players():
+    return sorted(os.path.basename(path)[:-len('.html')] for path in glob.glob(os.path.join(FIXTURES, '*.html'))
+                  if not os.path.basename(path).startswith('cricinfo'))
+
+
+def run(stand_in, groups):
+    """Fetch every fixture player with fresh sources; (cards, per-source stats, seconds per card)"""
+    sources = PlayerInfoSources(groups, upstream=stand_in.url)
+    cards, latencies = {}, []
+    for title in players():
+        started = time.perf_counter()
+        cards[title] = sources.fetch(title.replace('_', ' '))
+        latencies.append(time.perf_counter() - started)
+    return cards, sources.stats, latencies
+
+
+def report(label, cards, stats, latencies):
+    total = sum(s['bytes'] for s in stats.values())
+    print(f'\n{label}: {total:,} bytes, {sum(latencies) / len(latencies) * 1000:.0f} ms per card '
+          f'(max {max(latencies) * 1000:.0f} ms)')
+    print(f"  {'source':<18} {'requests':>8} {'found':>6} {'bytes':>10} {'ms/request':>11}")
+    for name, s in stats.items():
+        per_request = s['seconds'] / s['requests'] * 1000 if s['requests'] else 0.0
+        print(f"  {name:<18} {s['requests']:>8} {s['found']:>6} {s['bytes']:>10,} {per_request:>11.0f}")
+    for title, (info, used) in cards.items():
+        print(f"  {title:<16} via {', '.join(used) or 'nothing':<36} "
+              f"{' '.join(field for field in FIELDS if info.get(field))}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-kb', type=int, default=400, help='size a recorded article is padded back to')
+    parser.add_argument('--delay-ms', type=float, default=80, help='simulated upstream round trip')
+    parser.add_argument('--kbps', type=float, default=2000, help='simulated download speed (KB/s)')
+    args = parser.parse_args()
+
+    stand_in = StandIn(args.page_kb * 1024, args.delay_ms / 1000, args.kbps * 1024)
+    threading.Thread(target=stand_in.serve_forever, daemon=True).start()
+    print(f'{len(players())} recorded players, articles padded to {args.page_kb} KB, '
+          f'{args.delay_ms:.0f} ms round trips at {args.kbps:.0f} KB/s')
+
+    page_cards, page_stats, page_latencies = run(stand_in, ((WikipediaPage,), (CricinfoSearch,)))
+    page_bytes = report('article scraping only (old path)', page_cards, page_stats, page_latencies)
+    cards, stats, latencies = run(stand_in, DEFAULT_GROUPS)
+    summary_bytes = report('summary first, article fallback', cards, stats, latencies)
+    for title, (info, _) in cards.items():
+        assert bool(info.get('description')) == bool(page_cards[title][0].get('description')), title
+        assert bool(info.get('wikipedia_image')) == bool(page_cards[title][0].get('wikipedia_image')), title
+    print(f'\n  bytes: {summary_bytes / page_bytes:.1%} of the old path, '
+          f'latency: {sum(latencies) / sum(page_latencies):.1%}')
+
+    # The app's fetch path against the stand-in, with its per-source metrics
+    os.environ['PLAYER_INFO_UPSTREAM'] = stand_in.url
+    os.chdir(ROOT)
+    import app as auction_app
+    for title in players():
+        info = auction_app.fetch_player_info_from_internet(title.replace('_', ' '))
+        assert 'error' not in info, info
+    print('\napp metrics:')
+    for line in auction_app.METRICS.render().splitlines():
+        if line.startswith(('player_info_source_bytes_total', 'player_info_source_requests_total')):
+            print(f'  {line}')
+
+
+if __name__ == '__main__':
+    main()
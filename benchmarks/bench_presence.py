@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Presence benchmark - what a venue Wi-Fi blip costs in presence messages
+
+Starts the app in a subprocess, connects N logged-in teams over real
+Socket.IO long-polling, then drops every connection and reconnects them all
+at once (in parallel, as after a Wi-Fi blip). Counts the presence messages
+(`presence` digests, or per-connection `user_connected` / `user_disconnected`
+on older servers) every client receives during the storm, and checks the
+final who's-online answer from /api/online.
+
+Usage:
+    python benchmarks/bench_presence.py --teams 30 --blips 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_bidding import create_users, free_port, serve
+
+PRESENCE_EVENTS = ('presence', 'user_connected', 'user_disconnected')
+
+
+class PresenceCounter:
+    """Thread-safe count of presence messages and their payload size"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.messages = self.bytes = 0
+
+    def received(self, data):
+        with self.lock:
+            self.messages += 1
+            self.bytes += len(str(data))
+
+    def reset(self):
+        with self.lock:
+            counts = self.messages, self.bytes
+            self.messages = self.bytes = 0
+            return counts
+
+
+def login(base_url, username):
+    http = requests.Session()
+    http.post(f'{base_url}/login', json={'username': username, 'password': username}).raise_for_status()
+    return http
+
+
+def connect(base_url, http, counter):
+    """Open a polling Socket.IO connection with a logged-in session, counting presence messages"""
+    sio = socketio.Client(reconnection=False)
+    for event in PRESENCE_EVENTS:
+        sio.on(event, counter.received)
+    sio.connect(base_url, headers={'Cookie': '; '.join(f'{k}={v}' for k, v in http.cookies.items())},
+                transports=['polling'])
+    return sio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=30, help='connected teams')
+    parser.add_argument('--blips', type=int, default=3, help='disconnect/reconnect storms')
+    parser.add_argument('--serve', metavar='DB', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        usernames = create_users(db_path, args.teams)[1:]
+        port = free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        env = dict(os.environ, AUCTION_STORAGE=os.path.join(tmp_dir, 'auction_rooms'))
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', db_path, '--port', str(port)],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        try:
+            deadline = time.time() + 60
+            while True:
+                try:
+                    requests.get(f'{base_url}/', timeout=1)
+                    break
+                except requests.ConnectionError:
+                    if time.time() > deadline or server.poll() is not None:
+                        raise RuntimeError('server did not start')
+                    time.sleep(0.2)
+
+            counter = PresenceCounter()
+            with ThreadPoolExecutor(args.teams) as pool:
+                sessions = list(pool.map(lambda u: login(base_url, u), usernames))
+                clients = list(pool.map(lambda http: connect(base_url, http, counter), sessions))
+                time.sleep(1)
+                counter.reset()
+                print(f'{args.teams} teams connected; each blip drops and reconnects all of them at once')
+                for blip in range(args.blips):
+                    started = time.perf_counter()
+                    for sio in clients:
+                        sio.disconnect()
+                    clients = list(pool.map(lambda http: connect(base_url, http, counter), sessions))
+                    elapsed = time.perf_counter() - started
+                    time.sleep(1)  # Last digest
+                    messages, size = counter.reset()
+                    print(f'  blip {blip + 1}: reconnected in {elapsed:.2f}s, {messages} presence messages '
+                          f'({messages / args.teams:.1f} per client, {size / 1024:.1f} KB)')
+            online = sessions[0].get(f'{base_url}/api/online', timeout=5)
+            if online.ok:
+                print(f"  /api/online: {online.json()['online']} of {args.teams} teams online")
+            for sio in clients:
+                sio.disconnect()
+        finally:
+            server.terminate()
+            server.wait(10)
+
+
+if __name__ == '__main__':
+    main()
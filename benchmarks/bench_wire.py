@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Wire encoding benchmark - JSON objects vs the compact positional encoding
+
+Records every new_bid / player_sold / auction_state payload of a full
+mega-auction (plus the auction_state each client polls for once a second)
+and compares, per event type, the serialized size and encode time of the
+default JSON payloads against WireCodec's compact arrays.
+
+Usage:
+    python benchmarks/bench_wire.py --teams 10 --seed 0
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import COLUMNS, EXCEL_FILE, Catalog, read_player_data
+from engine import AuctionEngine, AuctionError, Bidder, MemoryStore, VirtualClock
+from wire import ENCODED_EVENTS, WireCodec
+
+INCREMENT = 0.25
+POLL_SECONDS = 1
+
+
+def record_mega_auction(catalog, n_teams, seed):
+    """Every encoded event of a full auction, as (event, payload) copies"""
+    teams = {i + 1: (f'team{i}', f'Team {i}') for i in range(n_teams)}
+    events = []
+
+    def broadcast(event, data):
+        if event in ENCODED_EVENTS:
+            # Copy: the engine keeps mutating its state after broadcasting it
+            events.append((event, json.loads(json.dumps(data))))
+
+    engine = AuctionEngine(catalog, MemoryStore(teams, 100.0), broadcast=broadcast,
+                           clock=VirtualClock(), rng=random.Random(seed))
+    bidders = [Bidder(user_id, username, team_name) for user_id, (username, team_name) in teams.items()]
+    rng = random.Random(seed)
+    for set_num in (1, 2):
+        for category in COLUMNS:
+            engine.start_auction('start', category, set_num)
+            while engine.state['current_player']:
+                player = engine.state['current_player']
+                price = player['base_price']
+                for _ in range(rng.randint(1, 8)):
+                    try:
+                        engine.place_bid(rng.choice(bidders), player['name'], price)
+                        price += INCREMENT
+                    except AuctionError:
+                        pass
+                    for _ in range(2 // POLL_SECONDS):
+                        engine.clock.advance(POLL_SECONDS)
+                        broadcast('auction_state', engine.state)
+                try:
+                    engine.sell(player['name'])
+                except AuctionError:
+                    if not engine.next_player():
+                        engine.start_auction('paused')
+                        break
+    return events
+
+
+def measure(events, encode):
+    """{event: [count, bytes, seconds]} for an encoder returning the serialized payload"""
+    totals = defaultdict(lambda: [0, 0, 0.0])
+    for event, data in events:
+        started = time.perf_counter()
+        payload = encode(event, data)
+        elapsed = time.perf_counter() - started
+        entry = totals[event]
+        entry[0] += 1
+        entry[1] += len(payload)
+        entry[2] += elapsed
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=10, help='bidding teams')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    catalog = Catalog(read_player_data(EXCEL_FILE))
+    events = record_mega_auction(catalog, args.teams, args.seed)
+    codec = WireCodec(catalog)
+
+    plain = measure(events, lambda event, data: json.dumps(data).encode('utf-8'))
+    compact = measure(events, lambda event, data: json.dumps(codec.encode(event, data)[0],
+                                                            separators=(',', ':')).encode('utf-8'))
+    dictionary = len(json.dumps(codec.dictionary(), separators=(',', ':')).encode('utf-8'))
+
+    print(f'{len(events):,} encoded events from one mega-auction, {args.teams} teams')
+    print(f"{'event':<15}{'count':>8}{'json bytes':>14}{'compact':>12}{'ratio':>8}{'json µs':>10}{'compact µs':>12}")
+    for event in ENCODED_EVENTS + ('total',):
+        if event == 'total':
+            count = sum(v[0] for v in plain.values())
+            a = [count, sum(v[1] for v in plain.values()), sum(v[2] for v in plain.values())]
+            b = [count, sum(v[1] for v in compact.values()), sum(v[2] for v in compact.values())]
+        else:
+            a, b = plain[event], compact[event]
+        if not a[0]:
+            continue
+        print(f'{event:<15}{a[0]:>8,}{a[1]:>14,}{b[1]:>12,}{b[1] / a[1]:>8.2f}'
+              f'{a[2] / a[0] * 1e6:>10.1f}{b[2] / b[0] * 1e6:>12.1f}')
+    print(f'wire_dictionary (once per compact connection): {dictionary:,} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Player catalog - categories, base-price rules and loading from AUCTION.xlsx
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from names import NameIndex, normalize, similarity
+
+# Configuration
+EXCEL_FILE = 'AUCTION.xlsx'  # Make sure this matches your Excel file name
+SHEET_NAME = 0
+COLUMNS = [
+    'Indian Bat', 'Foreign Bat', 'Indian AR', 'Foreign AR',
+    'Indian Pace', 'Foreign Pace', 'Indian spin', 'Foreign spin', 'Wicketkeepers'
+]
+
+# Foreign player categories
+FOREIGN_CATEGORIES = ['Foreign Bat', 'Foreign AR', 'Foreign Pace', 'Foreign spin']
+
+def is_foreign_player(category):
+    """Check if player category is foreign"""
+    return category in FOREIGN_CATEGORIES
+
+# Critical players list (will have base price of 3 cr, others get 1 cr)
+CRITICAL_PLAYERS = {
+    'virat kohli', 'rohit sharma', 'shubman gill', 'suryakumar yadav',
+    'ruturaj gaikwad', 'yashasvi jaiswal', 'shreyas iyer', 'hardik pandya',
+    'ravindra jadeja', 'jasprit bumrah', 'mohammed shami', 'mohammed siraj',
+    'yuzvendra chahal', 'kuldeep yadav', 'ravichandran ashwin',
+    'ms dhoni', 'rishabh pant', 'kl rahul', 'david warner', 'quinton de kock',
+    'andre russell', 'glenn maxwell', 'ben stokes', 'mitchell starc',
+    'pat cummins', 'trent boult', 'rashid khan', 'sunil narine',
+    'jos buttler', 'heinrich klaasen', 'dinesh karthik', 'sanju samson'
+}
+
+def is_critical_player(player_name):
+    """Check if a player is a critical player"""
+    return player_name.lower().strip() in CRITICAL_PLAYERS
+
+CRITICAL_BASE_PRICE = 3
+BASE_PRICE = 1
+
+def get_player_base_price(player_name):
+    """Get base price for a player (3 cr for critical, 1 cr for others)"""
+    return CRITICAL_BASE_PRICE if is_critical_player(player_name) else BASE_PRICE
+
+def read_player_data(excel_file=EXCEL_FILE, sheet_name=SHEET_NAME):
+    """Read the Excel file into {category: {'players': [...], 'total': n}}"""
+    df = pd.read_excel(excel_file, sheet_name=sheet_name)
+    data = {}
+
+    for col in COLUMNS:
+        if col not in df.columns:
+            continue
+
+        players = df[col].dropna().astype(str).tolist()
+        players = [p.strip() for p in players if p.strip() and p.strip().lower() != 'nan']
+
+        data[col] = {
+            'players': players,
+            'total': len(players)
+        }
+
+    return data
+
+# Two spellings in the same category at least this similar are a rename, not a removal and an addition
+RENAME_SCORE = 0.5
+
+def diff_player_data(old, new, protected=()):
+    """Changes between two sheets (as returned by read_player_data), sparing protected players
+
+    Returns (data, delta): the data to load and the changes it makes. A
+    removed and an added player in the same category with similar names
+    are a rename. Players in `protected` (sold, or on the block) keep their
+    name and category whatever the new sheet says; the changes refused for
+    them are listed under 'kept'.
+
+        {'added': [[name, category]], 'removed': [[name, category]],
+         'renamed': [[old name, new name, category]], 'moved': [[name, from, to]],
+         'kept': [[name, category]]}
+    """
+    old_category, new_category = {}, {}
+    for sheet, categories in ((old, old_category), (new, new_category)):
+        for category, info in sheet.items():
+            for player in info['players']:
+                categories.setdefault(player, category)
+    removed = [player for player in old_category if player not in new_category]
+    added = [player for player in new_category if player not in old_category]
+    moved = [player for player in old_category
+             if player in new_category and new_category[player] != old_category[player]]
+
+    pairs = sorted(((similarity(normalize(gone), normalize(player)), gone, player)
+                    for gone in removed for player in added if old_category[gone] == new_category[player]),
+                   reverse=True)
+    renamed = {}
+    for score, gone, player in pairs:
+        if score < RENAME_SCORE:
+            break
+        if gone not in renamed and player not in renamed.values():
+            renamed[gone] = player
+    removed = [player for player in removed if player not in renamed]
+    added = [player for player in added if player not in renamed.values()]
+
+    players = {category: list(info['players']) for category, info in new.items()}
+    kept = []
+    for player in removed:
+        if player in protected:
+            players.setdefault(old_category[player], []).append(player)
+            kept.append([player, old_category[player]])
+    for gone, player in renamed.items():
+        if gone in protected:
+            column = players[new_category[player]]
+            column[column.index(player)] = gone
+            kept.append([gone, old_category[gone]])
+    for player in moved:
+        if player in protected:
+            players[new_category[player]].remove(player)
+            players.setdefault(old_category[player], []).append(player)
+            kept.append([player, old_category[player]])
+
+    data = {category: {'players': column, 'total': len(column)} for category, column in players.items()}
+    delta = {
+        'added': [[player, new_category[player]] for player in added],
+        'removed': [[player, old_category[player]] for player in removed if player not in protected],
+        'renamed': [[gone, player, new_category[player]] for gone, player in renamed.items() if gone not in protected],
+        'moved': [[player, old_category[player], new_category[player]] for player in moved if player not in protected],
+        'kept': kept
+    }
+    return data, delta
+
+def index_map(old, new, renamed=None):
+    """{index in old catalog: index in new catalog} for every player in both (renamed: {old name: new name})"""
+    renamed = renamed or {}
+    positions = {}  # (category, name) and name -> new indices, in sheet order
+    for i, name in enumerate(new.names):
+        positions.setdefault((new.category_of_index(i), name), []).append(i)
+        positions.setdefault(name, []).append(i)
+    mapping, taken = {}, set()
+    for i, name in enumerate(old.names):
+        name = renamed.get(name, name)
+        # Same category first (the same name can appear in two columns), then wherever the player moved
+        for candidates in (positions.get((old.category_of_index(i), name), ()), positions.get(name, ())):
+            free = [j for j in candidates if j not in taken]
+            if free:
+                mapping[i] = free[0]
+                taken.add(free[0])
+                break
+    return mapping
+
+def catalog_fingerprint(data):
+    """Short hash of each category's players in order: what catalog indices refer to"""
+    players = [[category, info['players']] for category, info in data.items()]
+    return hashlib.sha256(json.dumps(players).encode('utf-8')).hexdigest()[:16]
+
+class WorkbookWatcher:
+    """Polls a file's modification time and size; changed() is True once per change that has settled"""
+
+    def __init__(self, path):
+        self.path = path
+        self.seen = self._signature()
+        self.pending = None
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self):
+        """True if the file differs from the last accepted version and looked the same on the previous poll"""
+        signature = self._signature()
+        if signature is None or signature == self.seen:
+            self.pending = None
+            return False
+        if signature != self.pending:
+            self.pending = signature  # Possibly still being written: look again next poll
+            return False
+        self.seen, self.pending = signature, None
+        return True
+
+class Catalog:
+    """Read-only view over player data with O(1) category lookup
+
+    Sheet spellings are resolved once against the critical players and
+    `known_names` (players with stats), so lookups keyed by name go through
+    key() instead of exact lowercase equality.
+    """
+
+    def __init__(self, data, known_names=()):
+        self.data = data
+        self.fingerprint = catalog_fingerprint(data)  # Stored with index-encoded rows (schedules, closed lots)
+        self._category_of = {}
+        # Every player has a stable integer index: categories in order, players in sheet order
+        self.names = []
+        self.category_slices = {}
+        for category, info in data.items():
+            start = len(self.names)
+            self.names.extend(info['players'])
+            self.category_slices[category] = (start, len(self.names))
+            for player in info['players']:
+                self._category_of.setdefault(player, category)
+        self.critical = {normalize(player) for player in CRITICAL_PLAYERS}
+        self.name_index = NameIndex(self.critical | set(known_names))
+        self.name_matches = self.name_index.resolve_all(self.names)
+        self._keys = {player: known or normalize(player) for player, (known, _, _) in self.name_matches.items()}
+
+    def players(self, category):
+        info = self.data.get(category)
+        return info['players'] if info else []
+
+    def category_of(self, player_name):
+        return self._category_of.get(player_name, 'Unknown')
+
+    def category_of_index(self, index):
+        for category, (start, end) in self.category_slices.items():
+            if start <= index < end:
+                return category
+        return None
+
+    def key(self, player_name):
+        """Known name a player resolves to, else the normalized name"""
+        return self._keys.get(player_name) or self.name_index.resolve(player_name) or normalize(player_name)
+
+    def base_price(self, player_name):
+        return CRITICAL_BASE_PRICE if self.is_critical(player_name) else BASE_PRICE
+
+    def is_critical(self, player_name):
+        return self.name_index.resolve(player_name) in self.critical
+
+    def fuzzy_matches(self):
+        """[(sheet name, known name, score)] resolved by similarity rather than spelling"""
+        return [(player, known, score) for player, (known, how, score) in self.name_matches.items() if how == 'fuzzy']
+
+    def unmatched(self):
+        """Known names (critical players, players with stats) no sheet row resolves to"""
+        matched = {known for known, _, _ in self.name_matches.values()}
+        return [name for name in self.name_index.names if name not in matched]
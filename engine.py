@@ -0,0 +1,755 @@
+"""
+Headless auction engine - the auction rules without Flask, Socket.IO or SQLite
+
+The engine owns the rules for starting pools, bidding, selling and advancing
+lots. Persistence and broadcasting are pluggable:
+
+    store      - available_purse(user_id), record_bid(...), record_sale(...)
+    broadcast  - callable(event, data) delivering an event to every participant
+    clock      - now() -> datetime (VirtualClock for simulations)
+    schedule   - LotSchedule: the order of every lot, fixed by one seed
+    proxies    - private maximum bids on the current lot (never broadcast)
+    closed     - ClosedLots: every lot that has left the block, packed 17 bytes each
+
+The state dict only ever holds the lot on the block and summary counters:
+a lot is archived into `closed` (and store.record_closed_lots(closed) is
+called to persist it) as soon as it is sold, passed or switched away from.
+
+Rule violations raise AuctionError carrying the event name the client expects
+(bid_error, sell_error). The Flask handlers in app.py are thin adapters over it.
+"""
+import random
+import sqlite3
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Who is bidding (taken from the logged-in user by the adapter)
+Bidder = namedtuple('Bidder', ['user_id', 'username', 'team_name'])
+
+BID_INCREMENT = 0.25  # Cr between successive proxy bids
+
+
+class AuctionError(Exception):
+    """A rejected action; `event` is the error event to send back to the caller"""
+
+    def __init__(self, event, message):
+        super().__init__(message)
+        self.event = event
+        self.message = message
+
+
+def new_summary():
+    return {'sold': 0, 'unsold': 0, 'spent': 0.0}
+
+
+def new_state():
+    """Empty auction state"""
+    return {
+        'status': 'waiting',  # waiting, active, paused, completed
+        'current_player': None,
+        'current_player_index': 0,
+        'current_category': None,
+        'current_set': None,
+        'active_pool': None,  # Track which pool is active (format: "category_set")
+        'bids': {},  # {player_name: [{'user_id': X, 'amount': Y, 'timestamp': Z}]} - the lot on the block only
+        'closed': new_summary(),  # Counters over the archived lots (ClosedLots holds the lots themselves)
+        'lots_remaining': 0,  # Lots after the current one in the active pool
+        'start_time': None
+    }
+
+
+class SystemClock:
+    def now(self):
+        return datetime.now()
+
+
+class VirtualClock:
+    """Deterministic clock for simulations: only moves when advanced"""
+
+    def __init__(self, start=None):
+        self._now = start or datetime(2025, 1, 1)
+
+    def now(self):
+        return self._now
+
+    def advance(self, seconds):
+        self._now += timedelta(seconds=seconds)
+
+
+class MemoryStore:
+    """In-memory persistence: per-team purse and purchases"""
+
+    def __init__(self, teams, purse=100.0):
+        # teams: {user_id: (username, team_name)}
+        self.teams = dict(teams)
+        self.purse = {user_id: purse for user_id in self.teams}
+        self.spent = {user_id: 0.0 for user_id in self.teams}
+        self.purchases = {user_id: [] for user_id in self.teams}
+        self.bid_count = 0
+
+    def available_purse(self, user_id):
+        return self.purse[user_id] - self.spent[user_id]
+
+    def record_bid(self, user_id, player_name, amount, proxy_steps=0):
+        self.bid_count += 1
+
+    def record_closed_lots(self, closed):
+        pass
+
+    def record_sale(self, player_name, category, base_price, winner_id, price):
+        self.spent[winner_id] += price
+        self.purchases[winner_id].append((player_name, category, price))
+        username, team_name = self.teams[winner_id]
+        return username, team_name, self.available_purse(winner_id)
+
+
+class SQLiteStore:
+    """Persistence in the app database, scoped to one auction id"""
+
+    def __init__(self, connect, auction_id):
+        self.connect = connect  # callable returning a sqlite3 connection
+        self.auction_id = auction_id
+
+    def available_purse(self, user_id):
+        conn = self.connect()
+        try:
+            c = conn.cursor()
+            c.execute('SELECT purse FROM users WHERE id = ?', (user_id,))
+            user_purse = c.fetchone()[0]
+            # Calculate total spent in this auction
+            c.execute('SELECT COALESCE(SUM(final_price), 0) FROM auction_log WHERE sold_to_user_id = ? AND auction_id = ?',
+                     (user_id, self.auction_id))
+            total_spent = c.fetchone()[0] or 0
+            return user_purse - total_spent
+        finally:
+            conn.close()
+
+    def record_bid(self, user_id, player_name, amount, proxy_steps=0):
+        """proxy_steps: 0 for a bid placed by hand, else the implied increments this proxy bid stands for"""
+        conn = self.connect()
+        try:
+            conn.cursor().execute('INSERT INTO bids (user_id, player_name, amount, auction_id, proxy_steps) '
+                                  'VALUES (?, ?, ?, ?, ?)',
+                                  (user_id, player_name, amount, self.auction_id, proxy_steps))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def record_closed_lots(self, closed):
+        """Persist the closed-lot archive (a few KB even for a full auction, so it is rewritten whole)"""
+        conn = self.connect()
+        try:
+            conn.cursor().execute('INSERT OR REPLACE INTO closed_lots (auction_id, lots, catalog) VALUES (?, ?, ?)',
+                                  (self.auction_id, closed.to_bytes(), closed.catalog.fingerprint))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def record_sale(self, player_name, category, base_price, winner_id, price):
+        conn = self.connect()
+        try:
+            c = conn.cursor()
+            # Get starting purse and what the winner already spent in this auction
+            # (users.purse is the per-auction budget; spending is tracked in auction_log)
+            c.execute('SELECT username, team_name, purse FROM users WHERE id = ?', (winner_id,))
+            winner_info = c.fetchone()
+            c.execute('SELECT COALESCE(SUM(final_price), 0) FROM auction_log WHERE sold_to_user_id = ? AND auction_id = ?',
+                     (winner_id, self.auction_id))
+            already_spent = c.fetchone()[0] or 0
+
+            # Log sale
+            c.execute('''INSERT INTO auction_log (player_name, category, base_price, sold_to_user_id, final_price, auction_id)
+                         VALUES (?, ?, ?, ?, ?, ?)''', (player_name, category, base_price, winner_id, price, self.auction_id))
+
+            # Add to winner's team
+            c.execute('''INSERT OR REPLACE INTO teams (user_id, player_name, player_category, purchase_price, auction_id)
+                         VALUES (?, ?, ?, ?, ?)''', (winner_id, player_name, category, price, self.auction_id))
+
+            # Mark winning bid
+            c.execute('UPDATE bids SET is_winning = 1 WHERE user_id = ? AND player_name = ? AND amount = ? AND auction_id = ?',
+                     (winner_id, player_name, price, self.auction_id))
+            conn.commit()
+            return winner_info[0], winner_info[1], winner_info[2] - already_spent - price
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+class LotSchedule:
+    """The full lot order of an auction - every category, both sets - built from one seed
+
+    Lots are one array('H') of catalog indices; each pool is a (start, end) slice
+    of it, so "lot at position i" and "lots left in this pool" are O(1).
+    """
+
+    def __init__(self, catalog, seed, lots, splits=None):
+        if len(lots) != len(catalog.names):
+            raise ValueError(f'Schedule has {len(lots)} lots but the catalog has {len(catalog.names)} players')
+        self.catalog = catalog
+        self.seed = seed
+        self.lots = lots
+        # Set 1 is the first half of each category unless a catalog reload said otherwise,
+        # so only those overrides are stored: {category: set 1 size}
+        self.splits = splits or {}
+        self.pools = {}
+        for category, (start, end) in catalog.category_slices.items():
+            mid = start + min(self.splits.get(category, (end - start + 1) // 2), end - start)
+            self.pools[(category, 1)] = (start, mid)
+            self.pools[(category, 2)] = (mid, end)
+
+    @classmethod
+    def build(cls, catalog, seed):
+        """Shuffle each category once and split it into two sets, deterministically from seed"""
+        rng = random.Random(seed)
+        lots = array('H')
+        for category, (start, end) in catalog.category_slices.items():
+            indices = list(range(start, end))
+            rng.shuffle(indices)  # Shuffle once per category
+            lots.extend(indices)
+        return cls(catalog, seed, lots)
+
+    @classmethod
+    def from_bytes(cls, catalog, seed, data, splits=None):
+        """Rebuild a schedule persisted with to_bytes() (and its splits)"""
+        lots = array('H')
+        lots.frombytes(data)
+        if sys.byteorder == 'big':
+            lots.byteswap()
+        if lots and max(lots) >= len(catalog.names):
+            raise ValueError('Schedule refers to players outside the catalog')
+        return cls(catalog, seed, lots, splits)
+
+    def to_bytes(self):
+        """Compact little-endian encoding (2 bytes per lot)"""
+        lots = array('H', self.lots)
+        if sys.byteorder == 'big':
+            lots.byteswap()
+        return lots.tobytes()
+
+    def _pool(self, category, set_num):
+        return self.pools.get((category, int(set_num)), (0, 0))
+
+    def players(self, category, set_num):
+        """Player names of a pool in auction order"""
+        start, end = self._pool(category, set_num)
+        names = self.catalog.names
+        return [names[i] for i in self.lots[start:end]]
+
+    def size(self, category, set_num):
+        start, end = self._pool(category, set_num)
+        return end - start
+
+    def lot(self, category, set_num, position):
+        """Player at a position in a pool, or None past the end"""
+        start, end = self._pool(category, set_num)
+        if 0 <= position < end - start:
+            return self.catalog.names[self.lots[start + position]]
+        return None
+
+    def remaining(self, category, set_num, position):
+        """Lots still to come after the one at position"""
+        start, end = self._pool(category, set_num)
+        return max(0, end - start - position - 1)
+
+    def position(self, category, set_num, player_name):
+        """Position of a player in a pool, or None"""
+        names = self.catalog.names
+        start, end = self._pool(category, set_num)
+        for i in range(start, end):
+            if names[self.lots[i]] == player_name:
+                return i - start
+        return None
+
+    def remap(self, catalog, index_map):
+        """This schedule over a reloaded catalog (index_map: old index -> new index)
+
+        Players still in their category keep their pool and order; players
+        new to a category join the end of its set 2, shuffled by the seed. A
+        new category is shuffled and split in half like in build().
+        """
+        rng = random.Random(self.seed)
+        lots = array('H')
+        splits = {}
+        for category, (start, end) in catalog.category_slices.items():
+            if category not in self.catalog.category_slices:
+                indices = list(range(start, end))
+                rng.shuffle(indices)
+                lots.extend(indices)
+                continue
+            pools = []
+            for set_num in (1, 2):
+                old_start, old_end = self._pool(category, set_num)
+                mapped = (index_map.get(i) for i in self.lots[old_start:old_end])
+                pools.append([i for i in mapped if i is not None and start <= i < end])
+            placed = set(pools[0]) | set(pools[1])
+            added = [i for i in range(start, end) if i not in placed]
+            rng.shuffle(added)
+            pools[1].extend(added)
+            lots.extend(pools[0] + pools[1])
+            if len(pools[0]) != (end - start + 1) // 2:
+                splits[category] = len(pools[0])
+        return LotSchedule(catalog, self.seed, lots, splits)
+
+
+class ClosedLots:
+    """Archive of lots that have left the block, as fixed-size little-endian records
+
+    Each record is 17 bytes: catalog index (H), outcome (B, SOLD or UNSOLD),
+    user id (I: the buyer, or the top bidder of an unsold lot, 0 for none),
+    price in lakh (I: the sale price or top bid, 1 Cr = 100), bids (H) and
+    the Unix time it closed (I). A lot offered again is archived again; the
+    latest outcome per player is kept in a bytearray for O(1) lookups.
+    """
+
+    RECORD = struct.Struct('<HBIIHI')
+    UNSOLD, SOLD = 1, 2
+    OUTCOMES = {UNSOLD: 'unsold', SOLD: 'sold'}
+
+    def __init__(self, catalog, data=b''):
+        if len(data) % self.RECORD.size:
+            raise ValueError(f'Closed-lot data is {len(data)} bytes, not a multiple of {self.RECORD.size}')
+        self.catalog = catalog
+        self.player_ids = {}
+        for i, name in enumerate(catalog.names):
+            self.player_ids.setdefault(name, i)
+        self.records = bytearray(data)
+        self.outcomes = bytearray(len(catalog.names))  # catalog index -> latest outcome (0 = never closed)
+        for index, outcome, *_ in self.RECORD.iter_unpack(self.records):
+            if index >= len(self.outcomes):
+                raise ValueError('Closed lots refer to players outside the catalog')
+            self.outcomes[index] = outcome
+
+    def __len__(self):
+        return len(self.records) // self.RECORD.size
+
+    def remap(self, catalog, index_map):
+        """This archive over a reloaded catalog (index_map: old index -> new index); lots of removed players are dropped"""
+        records = bytearray()
+        for index, *fields in self.RECORD.iter_unpack(self.records):
+            if index in index_map:
+                records += self.RECORD.pack(index_map[index], *fields)
+        return ClosedLots(catalog, records)
+
+    def close(self, player_name, outcome, user_id, price, bids, closed_at):
+        """Archive one lot; closed_at is a datetime"""
+        index = self.player_ids[player_name]
+        self.records += self.RECORD.pack(index, outcome, user_id or 0, round(price * 100), min(bids, 0xFFFF),
+                                         int(closed_at.timestamp()))
+        self.outcomes[index] = outcome
+
+    def outcome(self, player_name):
+        """Latest outcome of a player's lot: 'sold', 'unsold' or None if it never closed"""
+        index = self.player_ids.get(player_name)
+        return self.OUTCOMES.get(self.outcomes[index]) if index is not None else None
+
+    def summary(self):
+        """Counters kept in the live state (players offered twice count once, by latest outcome)"""
+        summary = new_summary()
+        for outcome in self.outcomes:
+            if outcome:
+                summary[self.OUTCOMES[outcome]] += 1
+        for index, outcome, user_id, price, _, _ in self.RECORD.iter_unpack(self.records):
+            if outcome == self.SOLD:
+                summary['spent'] += price
+        summary['spent'] /= 100
+        return summary
+
+    def query(self, outcome=None, user_id=None, category=None, offset=0, limit=100):
+        """Closed lots matching every given filter, oldest first: ([lot dicts], total matched)"""
+        first, last = self.catalog.category_slices.get(category, (0, 0)) if category else (0, len(self.outcomes))
+        wanted = {name: code for code, name in self.OUTCOMES.items()}.get(outcome) if outcome else None
+        names = self.catalog.names
+        lots, total = [], 0
+        for index, code, buyer, price, bids, closed_at in self.RECORD.iter_unpack(self.records):
+            if not first <= index < last or (wanted and code != wanted) or (user_id and buyer != user_id):
+                continue
+            total += 1
+            if offset < total <= offset + limit:
+                lots.append({
+                    'player_name': names[index],
+                    'category': self.catalog.category_of(names[index]),
+                    'outcome': self.OUTCOMES[code],
+                    'user_id': buyer or None,
+                    'price': price / 100,
+                    'bids': bids,
+                    'closed_at': datetime.fromtimestamp(closed_at).isoformat()
+                })
+        return lots, total
+
+    def to_bytes(self):
+        return bytes(self.records)
+
+
+def _discard(event, data):
+    pass
+
+
+class AuctionEngine:
+    """Auction rules over a state dict, lot schedule, catalog, store and broadcast sink"""
+
+    def __init__(self, catalog, store, broadcast=None, clock=None, state=None, schedule=None, rng=None,
+                 throttle=None, proxies=None, increment=BID_INCREMENT, closed=None):
+        self.catalog = catalog
+        self.store = store
+        self.broadcast = broadcast or _discard
+        self.clock = clock or SystemClock()
+        self.state = state if state is not None else new_state()
+        self.rng = rng or random
+        self.schedule = schedule or LotSchedule.build(catalog, self.rng.randrange(2 ** 32))
+        # Optional BidThrottle (throttle.py): turns away bid floods before any store work
+        self.throttle = throttle
+        # {player_name: [[user_id, username, team_name, max_amount], ...]} in registration order
+        self.proxies = proxies if proxies is not None else {}
+        self.increment = increment
+        self.closed = closed if closed is not None else ClosedLots(catalog)
+        self.state.setdefault('closed', self.closed.summary())
+
+    # --- Pools -------------------------------------------------------------
+
+    def get_set(self, category, set_num):
+        """Players of a pool in auction order (each category is split into two disjoint sets)"""
+        return self.schedule.players(category, set_num)
+
+    def reschedule(self, seed):
+        """Replace the lot schedule with a fresh one built from seed (fresh auction)"""
+        self.schedule = LotSchedule.build(self.catalog, seed)
+        return self.schedule
+
+    def lot(self, player_name):
+        return {
+            'name': player_name,
+            'base_price': self.catalog.base_price(player_name),
+            'is_critical': self.catalog.is_critical(player_name)
+        }
+
+    def start_auction(self, action='start', category=None, set_num=None):
+        """Start a pool, or pause/resume the auction"""
+        state = self.state
+
+        # Prevent starting new pool if one is already active
+        if action == 'start' and state['status'] == 'active' and state['active_pool']:
+            self.broadcast('auction_error', {
+                'message': f'Pool "{state["current_category"]} - Set {state["current_set"]}" is already in progress. Please complete or pause it first.'
+            })
+            return
+
+        state['status'] = 'active' if action == 'start' else action
+
+        if action == 'start' and category and set_num:
+            set_num = int(set_num)
+
+            state['current_category'] = category
+            state['current_set'] = set_num
+            state['active_pool'] = f"{category}_{set_num}"
+            self._move_to(0)
+            state['start_time'] = self.clock.now().isoformat()
+
+            # Broadcast pool start announcement
+            self.broadcast('pool_started', {
+                'category': category,
+                'set': set_num,
+                'message': f'Auction started: {category} - Set {set_num}'
+            })
+
+        self.broadcast('auction_state', state)
+
+    def next_player(self):
+        """Move to next player (no-op at the end of the set)"""
+        state = self.state
+        if state['status'] != 'active':
+            return False
+
+        category = state['current_category']
+        set_num = state['current_set']
+        if not state['active_pool'] or not category or not set_num:
+            return False
+
+        if self._move_to(state['current_player_index'] + 1):
+            self.broadcast('auction_state', state)
+            return True
+        return False
+
+    def _move_to(self, index):
+        """Put the lot at index of the current pool on the block; False past the end of the pool"""
+        state = self.state
+        category, set_num = state['current_category'], state['current_set']
+        player_name = self.schedule.lot(category, set_num, index)
+        if player_name is None:
+            if index == 0:
+                self._archive_unsold()
+                state['current_player'] = None
+                state['current_player_index'] = 0
+                state['lots_remaining'] = 0
+            return False
+        self._archive_unsold()
+        state['current_player_index'] = index
+        state['current_player'] = self.lot(player_name)
+        state['lots_remaining'] = self.schedule.remaining(category, set_num, index)
+        # Initialize bids for new player; maximum bids only ever apply to the lot on the block
+        state['bids'][player_name] = []
+        self.proxies.clear()
+        return True
+
+    def _archive_unsold(self):
+        """Archive the lot on the block as unsold if it is leaving without a sale"""
+        current = self.state['current_player']
+        bids = self.state['bids'].pop(current['name'], None) if current else None
+        outcome = self.closed.outcome(current['name']) if current else None
+        if bids is None or outcome == 'sold':
+            return  # Nothing on the block, it was just sold, or it was sold before and offered again
+        top = max(bids, key=lambda b: b['amount'], default=None)
+        if outcome != 'unsold':
+            self.state['closed']['unsold'] += 1
+        self.closed.close(current['name'], ClosedLots.UNSOLD, top and top['user_id'], top['amount'] if top else 0,
+                          len(bids), self.clock.now())
+        self.store.record_closed_lots(self.closed)
+
+    def upcoming(self, count=1):
+        """The next `count` lots of the current pool after the one on the block"""
+        state = self.state
+        if not state['active_pool']:
+            return []
+        index = state['current_player_index']
+        names = (self.schedule.lot(state['current_category'], state['current_set'], index + i)
+                 for i in range(1, count + 1))
+        return [name for name in names if name is not None]
+
+    # --- Bidding -----------------------------------------------------------
+
+    def highest_bid(self, player_name):
+        return max([b['amount'] for b in self.state['bids'].get(player_name, [])], default=0)
+
+    def _check_bid(self, bidder, player_name, amount):
+        """Checks shared by bids and maximum bids: login, rate limit, lot on the block"""
+        if not player_name or amount <= 0:
+            raise AuctionError('bid_error', 'Invalid bid')
+        if not bidder or not bidder.user_id:
+            raise AuctionError('bid_error', 'Please log in to place bids')
+        current = self.state['current_player']
+        if not current or current['name'] != player_name:
+            raise AuctionError('bid_error', f'{player_name} is not on the block')
+        if self.closed.outcome(player_name) == 'sold':
+            raise AuctionError('bid_error', f'{player_name} has already been sold')
+        if self.throttle is not None:
+            # Only the lot on the block keys the lot bucket: bids naming another player never reach it
+            exhausted = self.throttle.admit(bidder.user_id, current['name'], self.clock.now().timestamp())
+            if exhausted == 'user':
+                raise AuctionError('bid_error', 'Too many bids - please slow down')
+            if exhausted == 'lot':
+                raise AuctionError('bid_error', 'Bidding is too fast right now - try again in a moment')
+
+    def place_bid(self, bidder, player_name, amount):
+        """Validate and record a bid, then broadcast it; returns the bid entry"""
+        self._check_bid(bidder, player_name, amount)
+
+        # Check if user has enough purse
+        available_purse = self.store.available_purse(bidder.user_id)
+        if amount > available_purse:
+            raise AuctionError('bid_error', f'Insufficient funds! Available: {available_purse:.2f} Cr')
+
+        # Check if bid is higher than current highest
+        highest_bid = self.highest_bid(player_name)
+        if amount <= highest_bid:
+            raise AuctionError('bid_error', f'Bid must be higher than {highest_bid} Cr')
+
+        # Record bid
+        bid_entry = {
+            'user_id': bidder.user_id,
+            'username': bidder.username,
+            'team_name': bidder.team_name,
+            'amount': amount,
+            'timestamp': self.clock.now().isoformat()
+        }
+        self.state['bids'].setdefault(player_name, []).append(bid_entry)
+        self.store.record_bid(bidder.user_id, player_name, amount)
+
+        # Broadcast bid to all users
+        self.broadcast('new_bid', {
+            'player_name': player_name,
+            'bid': bid_entry,
+            'highest_bid': amount
+        })
+        # Maximum bids above it answer straight away
+        if self.proxies.get(player_name):
+            self.resolve_proxies(player_name)
+        return bid_entry
+
+    # --- Maximum (proxy) bids ----------------------------------------------
+
+    def set_proxy(self, bidder, player_name, max_amount):
+        """Register a private maximum for the lot on the block and let the proxies bid it out
+
+        Returns {'player_name', 'max_amount', 'highest_bid', 'leading'} for the bidder only.
+        """
+        self._check_bid(bidder, player_name, max_amount)
+        available_purse = self.store.available_purse(bidder.user_id)
+        if max_amount > available_purse:
+            raise AuctionError('bid_error', f'Insufficient funds! Available: {available_purse:.2f} Cr')
+        highest_bid = self.highest_bid(player_name)
+        if max_amount <= highest_bid:
+            raise AuctionError('bid_error', f'Maximum bid must be higher than {highest_bid} Cr')
+
+        # A raised maximum counts from when it was raised (earlier maximums win ties)
+        entries = [e for e in self.proxies.get(player_name, []) if e[0] != bidder.user_id]
+        entries.append([bidder.user_id, bidder.username, bidder.team_name, max_amount])
+        self.proxies[player_name] = entries
+        self.resolve_proxies(player_name)
+        leader = self.leader(player_name)
+        return {
+            'player_name': player_name,
+            'max_amount': max_amount,
+            'highest_bid': self.highest_bid(player_name),
+            'leading': leader is not None and leader['user_id'] == bidder.user_id
+        }
+
+    def leader(self, player_name):
+        """Highest bid entry on a lot, or None"""
+        return max(self.state['bids'].get(player_name) or [], key=lambda b: b['amount'], default=None)
+
+    def resolve_proxies(self, player_name):
+        """Bid the maximums on a lot against each other in one step; returns the new leading entry or None
+
+        English auction with a fixed increment: the highest maximum wins at one
+        increment over the runner-up's maximum (or the standing bid), capped at
+        its own maximum; on equal maximums the earlier one wins. Instead of one
+        bid per increment, at most two entries are recorded - the runner-up's
+        last implied bid and the winner's - each with `proxy_steps`, the number
+        of increments of the bidding war it stands for. Only the result is
+        broadcast.
+        """
+        entries = self.proxies.get(player_name)
+        if not entries:
+            return None
+        standing = self.leader(player_name)
+        price = standing['amount'] if standing else 0
+        leader_id = standing['user_id'] if standing else None
+        opening = price + self.increment if standing else self.catalog.base_price(player_name)
+
+        # Maximums still in play, capped at what each team can pay now (highest first, ties by age)
+        contenders = []
+        for user_id, username, team_name, max_amount in entries:
+            ceiling = min(max_amount, self.store.available_purse(user_id))
+            if ceiling >= opening or user_id == leader_id:
+                contenders.append((ceiling, Bidder(user_id, username, team_name)))
+        contenders.sort(key=lambda c: -c[0])
+        if not contenders:
+            return None
+        (top_ceiling, top), rivals = contenders[0], contenders[1:]
+        rival_ceiling = max((c for c, bidder in rivals if c >= opening), default=None)
+
+        if top.user_id == leader_id:
+            if rival_ceiling is None:
+                return None  # Nobody left who can outbid the leader
+            new_price = min(top_ceiling, rival_ceiling + self.increment)
+        else:
+            floor = max(price, rival_ceiling) if rival_ceiling is not None else (price if standing else None)
+            new_price = opening if floor is None else max(opening, min(top_ceiling, floor + self.increment))
+
+        # (bidder, amount, price it was raised from) - the opening bid counts as one increment
+        start = price if standing else opening - self.increment
+        recorded = []
+        if rival_ceiling is not None:
+            runner_up = next(bidder for c, bidder in rivals if c == rival_ceiling)
+            runner_amount = min(rival_ceiling, new_price - self.increment)
+            if runner_amount >= opening:
+                recorded.append((runner_up, runner_amount, start))
+        recorded.append((top, new_price, recorded[-1][1] if recorded else start))
+
+        now = self.clock.now().isoformat()
+        bids = self.state['bids'].setdefault(player_name, [])
+        for bidder, amount, previous in recorded:
+            steps = max(1, round((amount - previous) / self.increment))
+            entry = {
+                'user_id': bidder.user_id,
+                'username': bidder.username,
+                'team_name': bidder.team_name,
+                'amount': amount,
+                'timestamp': now,
+                'proxy_steps': steps
+            }
+            bids.append(entry)
+            self.store.record_bid(bidder.user_id, player_name, amount, proxy_steps=steps)
+
+        self.broadcast('new_bid', {
+            'player_name': player_name,
+            'bid': entry,
+            'highest_bid': entry['amount']
+        })
+        return entry
+
+    # --- Selling -----------------------------------------------------------
+
+    def sell(self, player_name):
+        """Sell a player to the highest bidder and move to the next lot; returns the sale"""
+        state = self.state
+        if not player_name or player_name not in state['bids']:
+            raise AuctionError('sell_error', 'No bids for this player')
+        current = state['current_player']
+        if not current or current['name'] != player_name:
+            # Bids left over from a lot that was passed or from a pool that was switched away from
+            raise AuctionError('sell_error', f'{player_name} is not on the block')
+
+        bids = state['bids'][player_name]
+        if not bids:
+            raise AuctionError('sell_error', 'No bids found')
+
+        # Find highest bidder
+        highest_bid = max(bids, key=lambda x: x['amount'])
+        winner_id = highest_bid['user_id']
+        final_price = highest_bid['amount']
+
+        # The purse was checked at bid time, but the winner may have bought someone since
+        available_purse = self.store.available_purse(winner_id)
+        if final_price > available_purse:
+            raise AuctionError('sell_error', f'{highest_bid["team_name"]} can no longer afford {final_price} Cr '
+                                             f'(available: {available_purse:.2f} Cr)')
+
+        base_price = self.catalog.base_price(player_name)
+        category = self.catalog.category_of(player_name)
+        username, team_name, remaining_purse = self.store.record_sale(
+            player_name, category, base_price, winner_id, final_price)
+
+        # Archive the lot: only the counters stay in the live state
+        if self.closed.outcome(player_name) == 'unsold':
+            state['closed']['unsold'] -= 1  # Passed earlier, sold when offered again
+        self.closed.close(player_name, ClosedLots.SOLD, winner_id, final_price, len(bids), self.clock.now())
+        state['closed']['sold'] += 1
+        state['closed']['spent'] = round(state['closed']['spent'] + final_price, 2)
+        self.store.record_closed_lots(self.closed)
+
+        # Clear bids and maximum bids for this player
+        del state['bids'][player_name]
+        self.proxies.pop(player_name, None)
+
+        # Move to next player automatically, if there are more in the current set
+        self._advance_after_sale()
+
+        sale = {
+            'player_name': player_name,
+            'user_id': winner_id,
+            'buyer': username,
+            'team_name': team_name,
+            'price': final_price,
+            'remaining_purse': remaining_purse
+        }
+        # Broadcast sale, then updated auction state (with next player)
+        self.broadcast('player_sold', sale)
+        self.broadcast('auction_state', state)
+        return sale
+
+    def _advance_after_sale(self):
+        state = self.state
+        if not (state['status'] == 'active' and state['active_pool'] and state['current_category'] and state['current_set']):
+            return
+        # Move to next player, if there are more in this set
+        if not self._move_to(state.get('current_player_index', 0) + 1):
+            state['current_player'] = None
+            state['current_player_index'] = 0
+            state['lots_remaining'] = 0
+            state['status'] = 'waiting'
+            state['active_pool'] = None
@@ -1,56 +1,159 @@
 #!/usr/bin/env python3
 """
 Export database to Excel for backup/review
+
+Rows are streamed from SQLite in keyset-paginated chunks (WHERE id > ? LIMIT n)
+into a write-only workbook or CSV, so memory stays bounded however long the bid
+history gets, and no read lock is held between chunks while an auction is live.
 """
+import csv
+import io
 import sqlite3
-import pandas as pd
-from datetime import datetime
+import zipfile
+from openpyxl import Workbook
 
 DATABASE = 'auction.db'
 EXCEL_FILE = 'auction_data.xlsx'
+CHUNK_SIZE = 1000
+
+# (table, sheet name, columns left out of the export)
+EXPORT_TABLES = [
+    ('users', 'Users', {'password_hash'}),  # Don't export passwords
+    ('teams', 'Teams', set()),
+    ('bids', 'Bids', set()),
+    ('auction_log', 'Auction_Log', set()),
+]
+TABLE_LABELS = {'users': 'users', 'teams': 'team entries', 'bids': 'bids', 'auction_log': 'auction log entries'}
+
+
+def table_columns(conn, table, exclude=()):
+    """Column names of a table, minus excluded ones"""
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})') if row[1] not in exclude]
+
+
+def iter_table_chunks(conn, table, columns, chunk_size=CHUNK_SIZE):
+    """Yield lists of rows ordered by id, one short query per chunk"""
+    select = ', '.join(columns)
+    last_id = 0
+    while True:
+        rows = conn.execute(f'SELECT id, {select} FROM {table} WHERE id > ? ORDER BY id LIMIT ?',
+                            (last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [row[1:] for row in rows]
+        if len(rows) < chunk_size:
+            return
+
+
+def _count(conn, table):
+    return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+def export_xlsx(database, output, chunk_size=CHUNK_SIZE, progress=None):
+    """Write every table to a write-only workbook (path or binary file object)
+
+    progress(table, rows_written, total_rows) is called after each chunk.
+    Returns {table: rows_written}.
+    """
+    conn = sqlite3.connect(database)
+    workbook = Workbook(write_only=True)
+    written = {}
+    try:
+        for table, sheet_name, exclude in EXPORT_TABLES:
+            columns = table_columns(conn, table, exclude)
+            if not columns:
+                continue  # Table missing
+            total = _count(conn, table)
+            sheet = workbook.create_sheet(sheet_name)
+            sheet.append(columns)
+            written[table] = 0
+            for rows in iter_table_chunks(conn, table, columns, chunk_size):
+                for row in rows:
+                    sheet.append(row)
+                written[table] += len(rows)
+                if progress:
+                    progress(table, written[table], total)
+            if progress and not written[table]:
+                progress(table, 0, 0)
+        workbook.save(output)
+    finally:
+        conn.close()
+    return written
+
+
+def iter_csv(database, table, chunk_size=CHUNK_SIZE):
+    """Stream one table as CSV text chunks (header first)"""
+    exclude = next((ex for name, _, ex in EXPORT_TABLES if name == table), None)
+    if exclude is None:
+        raise ValueError(f'Unknown table: {table}')
+    conn = sqlite3.connect(database)
+    try:
+        columns = table_columns(conn, table, exclude)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in iter_table_chunks(conn, table, columns, chunk_size):
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        conn.close()
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Unseekable sink that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_csv_zip(database, chunk_size=CHUNK_SIZE):
+    """Stream a zip archive with one CSV per table, as bytes chunks"""
+    sink = _StreamBuffer()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for table, _, _ in EXPORT_TABLES:
+            with archive.open(f'{table}.csv', 'w') as member:
+                try:
+                    for text in iter_csv(database, table, chunk_size):
+                        member.write(text.encode('utf-8'))
+                        data = sink.drain()
+                        if data:
+                            yield data
+                except sqlite3.OperationalError:
+                    pass  # Table missing
+    yield sink.drain()
+
 
 def export_to_excel():
     """Export all database tables to Excel"""
-    conn = sqlite3.connect(DATABASE)
-    
-    # Read all tables
-    with pd.ExcelWriter(EXCEL_FILE, engine='openpyxl') as writer:
-        # Users
-        try:
-            df_users = pd.read_sql_query('SELECT * FROM users', conn)
-            df_users = df_users.drop(columns=['password_hash'])  # Don't export passwords
-            df_users.to_excel(writer, sheet_name='Users', index=False)
-            print(f"✓ Exported {len(df_users)} users")
-        except Exception as e:
-            print(f"⚠ Error exporting users: {e}")
-        
-        # Teams
-        try:
-            df_teams = pd.read_sql_query('SELECT * FROM teams', conn)
-            df_teams.to_excel(writer, sheet_name='Teams', index=False)
-            print(f"✓ Exported {len(df_teams)} team entries")
-        except Exception as e:
-            print(f"⚠ Error exporting teams: {e}")
-        
-        # Bids
-        try:
-            df_bids = pd.read_sql_query('SELECT * FROM bids', conn)
-            df_bids.to_excel(writer, sheet_name='Bids', index=False)
-            print(f"✓ Exported {len(df_bids)} bids")
-        except Exception as e:
-            print(f"⚠ Error exporting bids: {e}")
-        
-        # Auction Log
-        try:
-            df_log = pd.read_sql_query('SELECT * FROM auction_log', conn)
-            df_log.to_excel(writer, sheet_name='Auction_Log', index=False)
-            print(f"✓ Exported {len(df_log)} auction log entries")
-        except Exception as e:
-            print(f"⚠ Error exporting auction log: {e}")
-    
-    conn.close()
+    def progress(table, done, total):
+        if done >= total:
+            print(f"✓ Exported {done} {TABLE_LABELS[table]}")
+        else:
+            print(f"  {table}: {done}/{total} rows...", end='\r')
+
+    try:
+        export_xlsx(DATABASE, EXCEL_FILE, progress=progress)
+    except Exception as e:
+        print(f"⚠ Error exporting: {e}")
+        return
     print(f"\n✅ Exported all data to {EXCEL_FILE}")
 
 if __name__ == '__main__':
     export_to_excel()
-
@@ -3,6 +3,9 @@ import random
 import math
 import os
 
+from catalog import Catalog
+from engine import LotSchedule
+
 # === CONFIGURATION ===
 EXCEL_FILE = 'Auction.xlsx'        # Your Excel file
 SHEET_NAME = 0                     # or 'Sheet1'
@@ -30,16 +33,17 @@ for col in COLUMNS:
 print(f"Loaded {len(COLUMNS)} categories.\n")
 
 # === SHUFFLE & SPLIT EACH COLUMN INTO 2 SETS ===
+# Same deterministic schedule as the web app: AUCTION_SEED=<seed> replays an auction's lot order
+seed = int(os.environ.get('AUCTION_SEED', random.randrange(2 ** 31)))
+schedule = LotSchedule.build(Catalog({col: {'players': players, 'total': len(players)} for col, players in data.items()}), seed)
 splits = {}
 for col, players in data.items():
-    random.shuffle(players)
-    n = len(players)
-    mid = (n + 1) // 2
     splits[col] = {
-        'set1': players[:mid],
-        'set2': players[mid:]
+        'set1': schedule.players(col, 1),
+        'set2': schedule.players(col, 2)
     }
-    print(f"{col}: {n} → Set 1: {len(splits[col]['set1'])}, Set 2: {len(splits[col]['set2'])}")
+    print(f"{col}: {len(players)} → Set 1: {len(splits[col]['set1'])}, Set 2: {len(splits[col]['set2'])}")
+print(f"\nSchedule seed: {seed}")
 
 print("\n" + "="*80)
 print("IPL MEGA AUCTION - PLAYER DISPLAY (Names Stay On Screen)")
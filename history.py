@@ -0,0 +1,127 @@
+"""
+Auction history - sales (auction_log) and bids, filtered and keyset-paginated
+
+Rows are ordered by (timestamp, id): the insert time and the row id grow
+together, and every history index ends in timestamp (SQLite appends the
+rowid), so one index both filters and orders a query. A page is a range
+seek from a cursor - the (timestamp, id) of the last row seen - rather
+than an OFFSET, so page 100 costs the same as page 1 and rows inserted
+meanwhile never shift a page. Tailing new rows is the same seek forward
+from the newest cursor.
+
+Each filter combination has an index whose columns are the equality
+filters, then timestamp (see HISTORY_INDEXES, created by init_db):
+
+    team       (auction_id, sold_to_user_id | user_id, timestamp)
+    category   (auction_id, category, timestamp)        sales
+    player     (auction_id, player_name, timestamp)     bids; a category is its players
+    none       (auction_id, timestamp)
+
+The time window is a range on the same index. Price ranges are checked on
+the rows the seek finds.
+"""
+import base64
+from datetime import datetime, timezone
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+HISTORY_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_auction_log_history ON auction_log (auction_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_auction_log_team_history ON auction_log (auction_id, sold_to_user_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_auction_log_category_history ON auction_log (auction_id, category, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_bids_history ON bids (auction_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_bids_team_history ON bids (auction_id, user_id, timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_bids_player_history ON bids (auction_id, player_name, timestamp)',
+]
+
+# kind -> (table, selected columns, team column, price column, category column or None)
+HISTORY_TABLES = {
+    'sales': ('auction_log', ('id', 'player_name', 'category', 'base_price', 'sold_to_user_id', 'final_price', 'timestamp'),
+              'sold_to_user_id', 'final_price', 'category'),
+    'bids': ('bids', ('id', 'player_name', 'user_id', 'amount', 'timestamp', 'is_winning', 'proxy_steps'),
+             'user_id', 'amount', None),
+}
+ROW_KEYS = {
+    'sales': ('id', 'player_name', 'category', 'base_price', 'user_id', 'price', 'timestamp'),
+    'bids': ('id', 'player_name', 'user_id', 'amount', 'timestamp', 'is_winning', 'proxy_steps'),
+}
+
+
+def encode_cursor(timestamp, row_id):
+    return base64.urlsafe_b64encode(f'{timestamp}|{row_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(timestamp, id) of a cursor; ValueError if it isn't one"""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split('|')
+        return timestamp, int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('cursor is not valid') from None
+
+
+def parse_time(value):
+    """ISO 8601 time as stored by SQLite's CURRENT_TIMESTAMP (UTC, 'YYYY-MM-DD HH:MM:SS')"""
+    moment = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def query_history(conn, kind, auction_id, team=None, category=None, players=None, min_price=None, max_price=None,
+                  start=None, end=None, before=None, after=None, limit=DEFAULT_LIMIT):
+    """One page of history rows as dicts, and the cursor to continue from (None at the end)
+
+    Newest first, older than `before` if given; with `after`, oldest first
+    from just after that cursor (tailing). `players` limits rows to those
+    player names (a category of bids). start/end bound the timestamp,
+    inclusive, in the stored format (see parse_time).
+    """
+    table, columns, team_column, price_column, category_column = HISTORY_TABLES[kind]
+    where, params = ['auction_id = ?'], [auction_id]
+    if team is not None:
+        where.append(f'{team_column} = ?')
+        params.append(team)
+    if category is not None and category_column:
+        where.append(f'{category_column} = ?')
+        params.append(category)
+    if players is not None:
+        if not players:
+            return [], None
+        where.append(f"player_name IN ({', '.join('?' * len(players))})")
+        params.extend(players)
+    if start is not None:
+        where.append('timestamp >= ?')
+        params.append(start)
+    if end is not None:
+        where.append('timestamp <= ?')
+        params.append(end)
+    if min_price is not None:
+        where.append(f'{price_column} >= ?')
+        params.append(min_price)
+    if max_price is not None:
+        where.append(f'{price_column} <= ?')
+        params.append(max_price)
+    if after is not None:
+        where.append('(timestamp, id) > (?, ?)')
+        params.extend(decode_cursor(after))
+        order = 'ASC'
+    else:
+        if before is not None:
+            where.append('(timestamp, id) < (?, ?)')
+            params.extend(decode_cursor(before))
+        order = 'DESC'
+    limit = min(MAX_LIMIT, max(1, limit))
+    c = conn.cursor()
+    c.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(where)} "
+              f'ORDER BY timestamp {order}, id {order} LIMIT ?', params + [limit + 1])
+    rows = c.fetchall()
+    more = len(rows) > limit
+    rows = [dict(zip(ROW_KEYS[kind], row)) for row in rows[:limit]]
+    for row in rows:
+        row['cursor'] = encode_cursor(row['timestamp'], row['id'])
+    # Tailing always continues from the newest row seen, even when caught up
+    if after is not None:
+        return rows, rows[-1]['cursor'] if rows else after
+    return rows, rows[-1]['cursor'] if more else None
@@ -0,0 +1,207 @@
+"""
+Player headshot cache - fetch each image once, serve resized copies from disk
+
+ImageCache downloads a headshot the first time it is asked for, shrinks it
+to a thumbnail (when the optional Pillow package is installed; otherwise
+the original bytes are kept) and stores it as <content hash>.<ext> in the
+cache directory. index.json maps source URLs to stored files, so restarts
+don't refetch. Stored names change whenever the content does, so the app
+can serve them with immutable Cache-Control headers.
+"""
+import io
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from assets import fingerprint
+from upstream import upstream_url
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: store originals without resizing
+    Image = None
+
+INDEX = 'index.json'
+THUMB_SIZE = (240, 240)
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+FETCH_TIMEOUT = 5
+PREFETCH_WORKERS = 2
+RETRY_FAILED_AFTER = 300  # seconds before a failed source is tried again
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+IMAGE_TYPES = {
+    'image/webp': '.webp',
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif'
+}  # No SVG: served from our origin it could run script
+
+
+class ImageFetchError(Exception):
+    """The source image could not be fetched or is not an image"""
+
+
+def _write(path, data):
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def thumbnail(data, extension, size=THUMB_SIZE):
+    """(bytes, extension) of a resized copy; the original if Pillow is missing or can't decode it"""
+    if Image is None:
+        return data, extension
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width <= size[0] and image.height <= size[1]:
+                return data, extension
+            image.thumbnail(size)
+            out = io.BytesIO()
+            if extension in ('.jpg', '.webp'):
+                image.convert('RGB' if extension == '.jpg' else 'RGBA').save(
+                    out, 'JPEG' if extension == '.jpg' else 'WEBP', quality=80)
+            else:
+                image.save(out, 'PNG', optimize=True)
+                extension = '.png'
+            return out.getvalue(), extension
+    except (OSError, ValueError):
+        return data, extension
+
+
+class ImageCache:
+    """Content-addressed on-disk cache of resized player images"""
+
+    def __init__(self, cache_dir, upstream=None, size=THUMB_SIZE, session=None):
+        self.cache_dir = cache_dir
+        self.upstream = upstream
+        self.size = size
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', USER_AGENT)
+        self.lock = threading.Lock()
+        self.in_flight = {}  # source URL -> Event set when its fetch finishes
+        self.failed = {}  # source URL -> time of the last failed fetch
+        self.executor = None
+        self.stats = {'fetches': 0, 'fetched_bytes': 0, 'stored_bytes': 0, 'errors': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+        self.names = set(self.index.values())
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose file was cleaned up, or of a type no longer served (SVGs of older versions)
+        return {url: name for url, name in index.items()
+                if os.path.splitext(name)[1] in IMAGE_TYPES.values() and os.path.exists(os.path.join(self.cache_dir, name))}
+
+    def _save_index(self):
+        _write(os.path.join(self.cache_dir, INDEX), json.dumps(self.index, indent=1, sort_keys=True).encode('utf-8'))
+
+    def cached(self, url):
+        """Stored file name for a source URL, or None if it has not been fetched"""
+        return self.index.get(url)
+
+    def is_stored(self, name):
+        """True if name is a file this cache wrote (safe to serve)"""
+        return name in self.names
+
+    def path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _download(self, url):
+        try:
+            with self.session.get(upstream_url(url, self.upstream), timeout=FETCH_TIMEOUT, stream=True) as response:
+                if response.status_code != 200:
+                    raise ImageFetchError(f'{url}: HTTP {response.status_code}')
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                extension = IMAGE_TYPES.get(content_type)
+                if extension is None and content_type in ('', 'application/octet-stream'):
+                    # Only a server that doesn't say what it sends is trusted on the URL's extension
+                    extension = IMAGE_TYPES.get(mimetypes.guess_type(urlsplit(url).path)[0])
+                if extension is None:
+                    raise ImageFetchError(f'{url}: not an image ({content_type or "no Content-Type"})')
+                chunks, size = [], 0
+                for chunk in response.iter_content(64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > MAX_IMAGE_BYTES:
+                        raise ImageFetchError(f'{url}: larger than {MAX_IMAGE_BYTES} bytes')
+        except requests.exceptions.RequestException as e:
+            raise ImageFetchError(f'{url}: {e}') from e
+        return b''.join(chunks), extension
+
+    def get(self, url):
+        """Stored file name for a source URL, fetching and resizing it on first use
+
+        Concurrent callers for the same URL share one download. Raises
+        ImageFetchError if the source can't be fetched.
+        """
+        while True:
+            with self.lock:
+                name = self.index.get(url)
+                if name is not None:
+                    return name
+                if time.time() - self.failed.get(url, 0) < RETRY_FAILED_AFTER:
+                    raise ImageFetchError(f'{url}: fetch failed recently')
+                pending = self.in_flight.get(url)
+                if pending is None:
+                    pending = self.in_flight[url] = threading.Event()
+                    break
+            pending.wait()
+            if url not in self.index:
+                raise ImageFetchError(f'{url}: fetch failed')
+
+        try:
+            data, extension = self._download(url)
+            stored, extension = thumbnail(data, extension, self.size)
+            name = fingerprint(stored) + extension
+            if not os.path.exists(self.path(name)):
+                _write(self.path(name), stored)
+            with self.lock:
+                self.index[url] = name
+                self.names.add(name)
+                self.stats['fetches'] += 1
+                self.stats['fetched_bytes'] += len(data)
+                self.stats['stored_bytes'] += len(stored)
+                self._save_index()
+            return name
+        except ImageFetchError:
+            with self.lock:
+                self.failed[url] = time.time()
+                self.stats['errors'] += 1
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(url, None)
+            pending.set()
+
+    def prefetch(self, urls):
+        """Fetch uncached URLs in the background; returns the futures that were queued"""
+        futures = []
+        with self.lock:
+            urls = [url for url in urls if url and url not in self.index and url not in self.in_flight]
+            if urls and self.executor is None:
+                self.executor = ThreadPoolExecutor(PREFETCH_WORKERS, thread_name_prefix='image-prefetch')
+        for url in urls:
+            futures.append(self.executor.submit(self._prefetch_one, url))
+        return futures
+
+    def shutdown(self):
+        """Drop queued prefetches and wait for running ones"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _prefetch_one(self, url):
+        try:
+            return self.get(url)
+        except ImageFetchError:
+            return None
@@ -0,0 +1,200 @@
+"""
+Playing XI optimizer - best eleven and batting order from a team's roster
+
+Players are grouped by (role, overseas). Within a group, picking k players
+means picking the k best, so the search only branches on how many to take
+from each group. Every branch is memoized on what is still needed (slots,
+overseas allowance, keeper / bowling minimums), so a 25-player squad is
+solved exactly in well under a millisecond.
+"""
+from collections import namedtuple
+from functools import lru_cache
+from itertools import combinations
+
+from catalog import is_foreign_player
+
+Rules = namedtuple('Rules', ['size', 'max_overseas', 'min_keepers', 'min_bowlers', 'min_bowling_options'])
+DEFAULT_RULES = Rules(size=11, max_overseas=4, min_keepers=1, min_bowlers=3, min_bowling_options=5)
+
+ROLES = ('keeper', 'batter', 'allrounder', 'bowler')
+# Batting order tiers: top order, then all-rounders, then bowlers
+BATTING_TIER = {'batter': 0, 'keeper': 0, 'allrounder': 1, 'bowler': 2}
+
+INFEASIBLE = float('-inf')
+
+
+def role_of(category):
+    """Playing role implied by an auction category"""
+    if category == 'Wicketkeepers':
+        return 'keeper'
+    if category.endswith('AR'):
+        return 'allrounder'
+    if category.endswith('Pace') or category.endswith('spin'):
+        return 'bowler'
+    return 'batter'
+
+
+def impact(ratings, role):
+    """Selection value of a player: main skill plus half the secondary one"""
+    batting, bowling = ratings['batting'], ratings['bowling']
+    if role == 'allrounder':
+        return max(batting, bowling) + 0.5 * min(batting, bowling) + 0.5 * ratings['allrounder']
+    return max(batting, bowling) + 0.5 * min(batting, bowling)
+
+
+def _solve(groups, rules):
+    """Best total impact choosing counts per group; returns (value, counts) or (INFEASIBLE, None)"""
+    # Prefix sums: value of taking the best k from each group
+    prefix = []
+    for group in groups:
+        sums = [0.0]
+        for player in group['players']:
+            sums.append(sums[-1] + player['impact'])
+        prefix.append(sums)
+    # Players still available from group i onwards (feasibility pruning)
+    available = [0] * (len(groups) + 1)
+    keepers_after = [0] * (len(groups) + 1)
+    bowlers_after = [0] * (len(groups) + 1)
+    options_after = [0] * (len(groups) + 1)
+    for i in range(len(groups) - 1, -1, -1):
+        n = len(groups[i]['players'])
+        role = groups[i]['role']
+        available[i] = available[i + 1] + n
+        keepers_after[i] = keepers_after[i + 1] + (n if role == 'keeper' else 0)
+        bowlers_after[i] = bowlers_after[i + 1] + (n if role == 'bowler' else 0)
+        options_after[i] = options_after[i + 1] + (n if role in ('bowler', 'allrounder') else 0)
+
+    @lru_cache(maxsize=None)
+    def best(i, slots, overseas_left, keepers, bowlers, options):
+        if slots == 0:
+            return (0.0, ()) if keepers == bowlers == options == 0 else (INFEASIBLE, None)
+        # Bound: not enough players left to fill the XI or meet the minimums
+        if (i == len(groups) or available[i] < slots or keepers_after[i] < keepers
+                or bowlers_after[i] < bowlers or options_after[i] < options or keepers + max(bowlers, options) > slots):
+            return INFEASIBLE, None
+        group = groups[i]
+        role = group['role']
+        limit = min(len(group['players']), slots)
+        if group['overseas']:
+            limit = min(limit, overseas_left)
+        result = (INFEASIBLE, None)
+        for k in range(limit, -1, -1):
+            rest, counts = best(i + 1, slots - k,
+                                overseas_left - (k if group['overseas'] else 0),
+                                max(0, keepers - (k if role == 'keeper' else 0)),
+                                max(0, bowlers - (k if role == 'bowler' else 0)),
+                                max(0, options - (k if role in ('bowler', 'allrounder') else 0)))
+            if counts is None:
+                continue
+            value = prefix[i][k] + rest
+            if value > result[0]:
+                result = (value, (k,) + counts)
+        return result
+
+    return best(0, rules.size, rules.max_overseas, rules.min_keepers, rules.min_bowlers, rules.min_bowling_options)
+
+
+def batting_order(players):
+    """Order a selected XI: top order by batting rating, then all-rounders, then bowlers"""
+    return sorted(players, key=lambda p: (BATTING_TIER[p['role']], -p['ratings']['batting'], p['name']))
+
+
+# Minimums an incomplete squad may have to give up, in the order they are given up
+RELAXABLE = ('min_keepers', 'min_bowlers', 'min_bowling_options')
+
+
+def relaxations(rules):
+    """The rules, then with as few minimums dropped as possible: one at a time, then two, then all"""
+    yield rules
+    for n in range(1, len(RELAXABLE) + 1):
+        for dropped in combinations(RELAXABLE, n):
+            yield rules._replace(**dict.fromkeys(dropped, 0))
+
+
+def best_xi(roster, ratings, rules=DEFAULT_RULES):
+    """Pick the best XI from roster [{'name', 'category'}] using PlayerRatings
+
+    Returns {'players': [... in batting order with position], 'captain', 'value',
+    'overseas', 'feasible', 'unmet'}. If the full rules cannot be met (an
+    incomplete squad), minimums are lowered to what the squad has, then as
+    few as possible are dropped (see relaxations); shortfalls are listed in
+    'unmet'. The overseas cap is never relaxed.
+    """
+    players = []
+    for entry in roster:
+        category = entry.get('category') or 'Unknown'
+        player_ratings = ratings.of(entry['name']) or {'batting': 0.0, 'bowling': 0.0, 'allrounder': 0.0}
+        role = role_of(category)
+        players.append({
+            'name': entry['name'],
+            'category': category,
+            'role': role,
+            'is_foreign': is_foreign_player(category),
+            'ratings': player_ratings,
+            'impact': round(impact(player_ratings, role), 2)
+        })
+
+    groups = {}
+    for player in players:
+        groups.setdefault((player['role'], player['is_foreign']), []).append(player)
+    groups = [{'role': role, 'overseas': overseas, 'players': sorted(members, key=lambda p: -p['impact'])}
+              for (role, overseas), members in sorted(groups.items(), key=lambda kv: (ROLES.index(kv[0][0]), kv[0][1]))]
+
+    size = min(rules.size, len(players))
+    relaxed = rules._replace(size=size, min_keepers=0, min_bowlers=0, min_bowling_options=0)
+    # Ask for no more keepers or bowlers than the squad has, then drop minimums only if still infeasible
+    attainable = rules._replace(
+        size=size,
+        min_keepers=min(rules.min_keepers, sum(p['role'] == 'keeper' for p in players)),
+        min_bowlers=min(rules.min_bowlers, sum(p['role'] == 'bowler' for p in players)),
+        min_bowling_options=min(rules.min_bowling_options, sum(p['role'] in ('bowler', 'allrounder') for p in players)))
+    for attempt in relaxations(attainable):
+        value, counts = _solve(groups, attempt)
+        if counts is not None:
+            break
+    else:
+        # Even the relaxed rules fail: too few domestic players to fill around the overseas cap
+        size = min(size, rules.max_overseas + sum(not p['is_foreign'] for p in players))
+        attempt = relaxed._replace(size=size)
+        value, counts = _solve(groups, attempt)
+
+    selected = []
+    for group, k in zip(groups, counts or ()):
+        selected.extend(group['players'][:k])
+    ordered = batting_order(selected)
+    for position, player in enumerate(ordered, 1):
+        player['position'] = position
+
+    unmet = []
+    if len(selected) < rules.size:
+        unmet.append(f'only {len(selected)} of {rules.size} players')
+    keepers = sum(p['role'] == 'keeper' for p in selected)
+    bowlers = sum(p['role'] == 'bowler' for p in selected)
+    options = sum(p['role'] in ('bowler', 'allrounder') for p in selected)
+    if keepers < rules.min_keepers:
+        unmet.append(f'{keepers}/{rules.min_keepers} wicketkeepers')
+    if bowlers < rules.min_bowlers:
+        unmet.append(f'{bowlers}/{rules.min_bowlers} specialist bowlers')
+    if options < rules.min_bowling_options:
+        unmet.append(f'{options}/{rules.min_bowling_options} bowling options')
+
+    captain = max(selected, key=lambda p: p['impact'])['name'] if selected else None
+    return {
+        'players': ordered,
+        'captain': captain,
+        'value': round(value, 2) if counts is not None else 0.0,
+        'overseas': sum(p['is_foreign'] for p in selected),
+        'feasible': not unmet,
+        'unmet': unmet
+    }
+
+
+def check_xi(players, rules=DEFAULT_RULES):
+    """Validate a hand-picked XI [{'name', 'category'}]; returns a list of rule violations"""
+    errors = []
+    if len(players) > rules.size:
+        errors.append(f'A playing XI has at most {rules.size} players')
+    overseas = sum(is_foreign_player(p.get('category') or '') for p in players)
+    if overseas > rules.max_overseas:
+        errors.append(f'At most {rules.max_overseas} overseas players allowed ({overseas} selected)')
+    return errors
@@ -0,0 +1,169 @@
+"""
+Player name resolution - match the spellings in AUCTION.xlsx to known players
+
+Stats (PLAYER_DETAILS), critical-player base prices and the player info
+cache are keyed by name, and used to need the sheet to spell every player
+exactly the same way. NameIndex maps a typed name to one of the known names:
+
+1. normalized equality: accents, case, punctuation and spacing dropped and
+   runs of initials joined ("M.S. Dhoni", "M S Dhoni" -> "ms dhoni"), also
+   compared with all spaces removed ("Surya Kumar Yadav")
+2. the alias table (full names, short forms, common transliterations)
+3. character trigram search: known names sharing trigrams with the typed
+   one are scored by Dice similarity; the best wins if it scores at least
+   MIN_SCORE, no other candidate is as close (within MIN_MARGIN), and
+   first name and surname start with the same letters and the surnames
+   are similar too, by trigrams or one typo apart ("Kholi", "Gull" for
+   "Gill"), so "Mohit Sharma" is not a misspelt "Rohit Sharma"
+
+`resolve_all()` resolves a whole sheet at once: a fuzzy match can't take a
+known name that another row of the sheet spells exactly, and two rows
+can't both fuzzy-match the same player. Answers are memoized, so after the
+catalog resolves every player at load time a lookup is a dict hit.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+NGRAM = 3
+MIN_SCORE = 0.6
+MIN_SURNAME_SCORE = 0.4
+MIN_MARGIN = 0.05
+MAX_MEMO = 10000  # Names typed into URLs are memoized too; cap them
+
+# Other ways of writing a known player's name (normalized -> normalized known name)
+ALIASES = {
+    'mahendra singh dhoni': 'ms dhoni',
+    'kannur lokesh rahul': 'kl rahul',
+    'lokesh rahul': 'kl rahul',
+    'r ashwin': 'ravichandran ashwin',
+    'ravi ashwin': 'ravichandran ashwin',
+    'mohd shami': 'mohammed shami',
+    'mohd siraj': 'mohammed siraj',
+    'yuzi chahal': 'yuzvendra chahal',
+    'sky': 'suryakumar yadav',
+    'rutu gaikwad': 'ruturaj gaikwad',
+    'dk': 'dinesh karthik',
+    'qdk': 'quinton de kock',
+    'patrick cummins': 'pat cummins',
+    'mitch starc': 'mitchell starc',
+}
+
+_NOT_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(name):
+    """Lowercase ASCII words, punctuation dropped and runs of initials joined"""
+    name = unicodedata.normalize('NFKD', str(name))
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower().replace("'", '').replace('’', '')
+    words, initials = [], ''
+    for word in _NOT_ALNUM.sub(' ', name).split():
+        if len(word) == 1:
+            initials += word
+            continue
+        if initials:
+            words.append(initials)
+            initials = ''
+        words.append(word)
+    if initials:
+        words.append(initials)
+    return ' '.join(words)
+
+
+def ngrams(key, n=NGRAM):
+    padded = f' {key} '
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def one_edit_apart(a, b):
+    """True if b is a with at most one letter replaced, added or dropped, or two adjacent letters swapped"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) != len(b):
+        shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+        return shorter[i:] == longer[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i + 1:i + 2] + b[i:i + 1] and a[i + 2:] == b[i + 2:])
+
+
+def similarity(a, b):
+    """Dice coefficient of the trigram sets of two normalized names"""
+    grams_a, grams_b = ngrams(a), ngrams(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b)) if grams_a or grams_b else 0.0
+
+
+class NameIndex:
+    """Resolves typed player names to known (normalized) names"""
+
+    def __init__(self, names, aliases=ALIASES):
+        self.names = sorted({normalize(name) for name in names} - {''})
+        self.exact = {}  # normalized name, and with spaces removed -> known name
+        for name in self.names:
+            self.exact[name] = name
+            self.exact.setdefault(name.replace(' ', ''), name)
+        self.aliases = {normalize(alias): name for alias, name in aliases.items() if name in self.exact}
+        self.grams = {name: ngrams(name) for name in self.names}
+        self.postings = {}  # trigram -> known names containing it
+        for name, grams in self.grams.items():
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(name)
+        self.memo = {}  # typed name -> (known name or None, how, score)
+
+    def _direct(self, key):
+        known = self.exact.get(key) or self.exact.get(key.replace(' ', ''))
+        if known:
+            return known, 'exact', 1.0
+        if key in self.aliases:
+            return self.aliases[key], 'alias', 1.0
+        return None
+
+    def _fuzzy(self, key, exclude=()):
+        grams = ngrams(key)
+        shared = Counter(name for gram in grams for name in self.postings.get(gram, ()) if name not in exclude)
+        scored = sorted(((2 * count / (len(grams) + len(self.grams[name])), name) for name, count in shared.items()),
+                        reverse=True)
+        if not scored or scored[0][0] < MIN_SCORE:
+            return None, None, scored[0][0] if scored else 0.0
+        score, best = scored[0]
+        if len(scored) > 1 and score - scored[1][0] < MIN_MARGIN:
+            return None, None, score  # Too close to call
+        words, known_words = key.split(), best.split()
+        surname, known_surname = words[-1], known_words[-1]
+        if (words[0][0] != known_words[0][0] or surname[0] != known_surname[0]
+                or (similarity(surname, known_surname) < MIN_SURNAME_SCORE
+                    and not one_edit_apart(surname, known_surname))):
+            return None, None, score  # A different player with a similar name
+        return best, 'fuzzy', score
+
+    def match(self, name):
+        """(known name or None, 'exact' / 'alias' / 'fuzzy' / None, score)"""
+        result = self.memo.get(name)
+        if result is None:
+            key = normalize(name)
+            result = self._direct(key) or self._fuzzy(key)
+            if len(self.memo) < MAX_MEMO:
+                self.memo[name] = result
+        return result
+
+    def resolve(self, name):
+        """Known name for a typed name, or None"""
+        return self.match(name)[0]
+
+    def resolve_all(self, names):
+        """{typed name: match} for every row of a sheet (see the module docstring)"""
+        results = {name: self._direct(normalize(name)) for name in names}
+        claimed = {result[0] for result in results.values() if result}
+        fuzzy = {}  # known name -> best typed name fuzzy-matching it
+        for name, result in results.items():
+            if result is None:
+                results[name] = result = self._fuzzy(normalize(name), claimed)
+                known, _, score = result
+                if known and (known not in fuzzy or score > results[fuzzy[known]][2]):
+                    fuzzy[known] = name
+        for name, (known, how, score) in results.items():
+            if how == 'fuzzy' and fuzzy[known] != name:
+                results[name] = (None, None, score)
+        self.memo.update(results)
+        return results
@@ -0,0 +1,179 @@
+"""
+Per-connection outbound queues for slow Socket.IO clients
+
+Room broadcasts go straight to the transport for every client that keeps up.
+A client whose transport queue backs up (a spectator on a bad connection, a
+long-poll that isn't being collected) is marked lagging: broadcasts skip it
+and land in its own bounded queue instead, where superseded messages
+collapse. A newer `auction_state` replaces the queued one, and a higher
+`new_bid` replaces the queued bid on the same lot. The queue is drained
+once the transport has caught up.
+
+If a lagging client still falls too far behind (more than `max_depth`
+messages queued, or the oldest one older than `resync_after` seconds), its
+queue is discarded and it is put in resync mode. It gets one fresh snapshot
+(`snapshot(sid)`) when it catches up instead of the history it missed.
+Memory per slow client is therefore bounded by `max_depth` messages however
+long the bidding war runs.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+LAG_PACKETS = 8      # Transport packets waiting before a client counts as lagging
+DRAIN_PACKETS = 2    # Transport packets waiting at most before queued messages are handed over
+MAX_DEPTH = 32       # Queued messages (after coalescing) before a lagging client is resynced
+RESYNC_AFTER = 5.0   # Seconds the oldest queued message may wait before a resync
+
+
+def coalesce_key(event, data):
+    """Messages with the same key supersede each other; None means deliver every one"""
+    if event == 'auction_state':
+        return event
+    if event == 'new_bid':
+        return event, data.get('player_name')
+    return None
+
+
+def supersedes(event, data, queued):
+    """Whether a message replaces the queued one with the same key
+
+    Bid handlers broadcast concurrently, so a lower bid can arrive after a
+    higher one on the same lot; the higher one stays.
+    """
+    if event == 'new_bid':
+        return data['bid']['amount'] >= queued['bid']['amount']
+    return True
+
+
+class ClientQueue:
+    __slots__ = ('room', 'messages', 'oldest', 'resync', 'sequence')
+
+    def __init__(self, room):
+        self.room = room
+        self.messages = OrderedDict()  # key -> (event, data)
+        self.oldest = None  # When the oldest undelivered message was queued
+        self.resync = False
+        self.sequence = 0  # Unique keys for messages that don't coalesce
+
+
+class OutboundQueues:
+    """Tracks lagging connections and holds their coalesced outbound messages
+
+    `send(sid, event, data)` delivers one message to one connection,
+    `transport_depth(sid)` is the number of packets still waiting in its
+    transport, and `snapshot(sid)` returns the [(event, data)] a resynced
+    client needs to catch up. `on_resync(sid)` and `on_coalesce(event)` are
+    called for metrics.
+    """
+
+    def __init__(self, send, transport_depth, snapshot, lag_packets=LAG_PACKETS, drain_packets=DRAIN_PACKETS,
+                 max_depth=MAX_DEPTH, resync_after=RESYNC_AFTER, on_resync=None, on_coalesce=None,
+                 clock=time.monotonic):
+        self.send = send
+        self.transport_depth = transport_depth
+        self.snapshot = snapshot
+        self.lag_packets, self.drain_packets = lag_packets, drain_packets
+        self.max_depth, self.resync_after = max_depth, resync_after
+        self.on_resync, self.on_coalesce = on_resync, on_coalesce
+        self.clock = clock
+        self.lagging = {}  # sid -> ClientQueue
+        self.resyncs = 0
+        self.coalesced = 0
+        self.lock = threading.Lock()
+
+    def skip(self, room):
+        """Lagging connections in a room: leave them out of the broadcast and enqueue() for each"""
+        with self.lock:
+            return [sid for sid, queue in self.lagging.items() if queue.room == room]
+
+    def enqueue(self, sid, event, data):
+        with self.lock:
+            queue = self.lagging.get(sid)
+            if queue is None:
+                return False
+            if queue.resync:
+                return True  # The snapshot will cover it
+            key = coalesce_key(event, data)
+            coalesced = key is not None and key in queue.messages
+            if key is None:
+                queue.sequence += 1
+                key = queue.sequence
+            elif coalesced:
+                self.coalesced += 1
+                if supersedes(event, data, queue.messages[key][1]):
+                    del queue.messages[key]  # Keep delivery order: the newest goes to the back
+                else:
+                    key = None
+            if key is not None:
+                queue.messages[key] = (event, data)
+            if queue.oldest is None:
+                queue.oldest = self.clock()
+            if len(queue.messages) > self.max_depth:
+                self._start_resync(sid, queue)
+        if coalesced and self.on_coalesce:
+            self.on_coalesce(event)
+        return True
+
+    def depth(self, sid):
+        """Messages waiting for a connection (0 when it keeps up)"""
+        with self.lock:
+            queue = self.lagging.get(sid)
+            return len(queue.messages) if queue else 0
+
+    def pump(self, connections):
+        """Check every {sid: room} connection once; returns {sid: (transport depth, queued)}"""
+        depths = {}
+        now = self.clock()
+        for sid, room in connections.items():
+            transport = self.transport_depth(sid)
+            with self.lock:
+                queue = self.lagging.get(sid)
+                if queue is None:
+                    if transport > self.lag_packets:
+                        self.lagging[sid] = ClientQueue(room)
+                    depths[sid] = (transport, 0)
+                    continue
+                if queue.oldest is not None and now - queue.oldest > self.resync_after:
+                    self._start_resync(sid, queue)
+                if transport > self.drain_packets:
+                    depths[sid] = (transport, len(queue.messages))
+                    continue
+            depths[sid] = (transport + self._drain(sid, queue), 0)
+        with self.lock:
+            for sid in [sid for sid in self.lagging if sid not in connections]:
+                del self.lagging[sid]
+        return depths
+
+    def _drain(self, sid, queue):
+        """Hand a caught-up client its queue (or snapshot), then return it to plain broadcasts"""
+        sent = 0
+        while True:
+            with self.lock:
+                resync, messages = queue.resync, list(queue.messages.values())
+                queue.messages.clear()
+                queue.oldest, queue.resync = None, False
+                if not resync and not messages:
+                    # Only now back to plain broadcasts: anything broadcast while sending queued up behind
+                    if self.lagging.get(sid) is queue:
+                        del self.lagging[sid]
+                    return sent
+            if resync:
+                messages = self.snapshot(sid)
+            for event, data in messages:
+                self.send(sid, event, data)
+            sent += len(messages)
+
+    def remove(self, sid):
+        with self.lock:
+            self.lagging.pop(sid, None)
+
+    def _start_resync(self, sid, queue):
+        """Drop a queue that fell too far behind; the client gets a snapshot instead (lock held)"""
+        queue.messages.clear()
+        queue.oldest = None
+        if not queue.resync:
+            queue.resync = True
+            self.resyncs += 1
+            if self.on_resync:
+                self.on_resync(sid)
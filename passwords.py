@@ -0,0 +1,161 @@
+"""
+Password hashing off the request threads, with a bounded queue and a login guard
+
+Werkzeug's scrypt/PBKDF2 hashes are deliberately slow (tens of ms of CPU and,
+for scrypt, 32 MB of memory each). HashPool runs them on a fixed number of
+worker threads - hashlib releases the GIL while hashing, so threads run in
+parallel without the pickling cost of a process pool - and refuses new work
+once `max_pending` hashes are queued, so a login burst can't pile up
+unbounded memory or starve the Socket.IO handlers.
+
+LoginGuard limits attempts per (client address, username) in a sliding
+window, so password guessing can't keep the pool busy.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_PENDING = 64
+WAIT_TIMEOUT = 30
+
+
+class HashPoolBusy(Exception):
+    """Too many hashes are already queued; the caller should retry shortly"""
+
+
+class HashPool:
+    """Bounded worker pool for password hashing and verification
+
+    workers=0 hashes inline on the calling thread (the old behaviour).
+    `executor` replaces the default ThreadPoolExecutor (e.g. one running
+    real OS threads under gevent). `on_depth(depth)` is called whenever the
+    number of queued or running hashes changes (e.g. to update a metrics
+    gauge).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING, on_depth=None, executor=None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.on_depth = on_depth
+        self.depth = 0
+        self.peak_depth = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+        if executor is None and workers:
+            executor = ThreadPoolExecutor(workers, thread_name_prefix='password-hash')
+        self.executor = executor if workers else None
+
+    def _enter(self):
+        with self.lock:
+            if self.depth >= self.max_pending:
+                self.rejected += 1
+                raise HashPoolBusy(f'{self.depth} password hashes already queued')
+            self.depth += 1
+            self.peak_depth = max(self.peak_depth, self.depth)
+            depth = self.depth
+        if self.on_depth:
+            self.on_depth(depth)
+
+    def _leave(self, _future=None):
+        with self.lock:
+            self.depth -= 1
+            depth = self.depth
+        if self.on_depth:
+            self.on_depth(depth)
+
+    def submit(self, fn, *args):
+        """Future for fn(*args) on the pool; raises HashPoolBusy when the queue is full"""
+        self._enter()
+        if self.executor is None:
+            future = _Done(fn, *args)
+            self._leave()
+            return future
+        try:
+            future = self.executor.submit(fn, *args)
+        except RuntimeError:
+            self._leave()
+            raise
+        future.add_done_callback(self._leave)
+        return future
+
+    def verify(self, password_hash, password, timeout=WAIT_TIMEOUT):
+        """check_password_hash on the pool; blocks the caller, not the CPU"""
+        return self.submit(check_password_hash, password_hash, password).result(timeout)
+
+    def hash(self, password, timeout=WAIT_TIMEOUT, **kwargs):
+        return self.submit(_generate, password, kwargs).result(timeout)
+
+    def hash_many(self, passwords, **kwargs):
+        """Hash a batch in parallel (waits for queue room instead of raising); returns hashes in order"""
+        futures = []
+        for password in passwords:
+            while True:
+                try:
+                    futures.append(self.submit(_generate, password, kwargs))
+                    break
+                except HashPoolBusy:
+                    # Wait for the oldest unfinished hash, then retry
+                    pending = [future for future in futures if not future.done()]
+                    if pending:
+                        pending[0].result()
+                    else:
+                        time.sleep(0.01)
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+
+def _generate(password, kwargs):
+    return generate_password_hash(password, **kwargs)
+
+
+class _Done:
+    """Already-completed stand-in for a Future (inline mode)"""
+
+    def __init__(self, fn, *args):
+        self.value = fn(*args)
+
+    def result(self, timeout=None):
+        return self.value
+
+
+class LoginGuard:
+    """Sliding-window limit on login attempts per key"""
+
+    def __init__(self, max_attempts=10, window=60, max_keys=10000):
+        self.max_attempts = max_attempts
+        self.max_keys = max_keys
+        self.window = window
+        self.attempts = {}  # key -> deque of attempt times
+        self.lock = threading.Lock()
+
+    def check(self, key, now=None):
+        """Record an attempt; returns 0 if allowed, else seconds until the next one is"""
+        now = time.time() if now is None else now
+        with self.lock:
+            if len(self.attempts) >= self.max_keys:
+                self._prune(now)
+            attempts = self.attempts.setdefault(key, deque())
+            while attempts and attempts[0] <= now - self.window:
+                attempts.popleft()
+            if len(attempts) >= self.max_attempts:
+                return attempts[0] + self.window - now
+            attempts.append(now)
+            return 0
+
+    def reset(self, key):
+        """Forget a key's attempts (after a successful login)"""
+        with self.lock:
+            self.attempts.pop(key, None)
+
+    def _prune(self, now):
+        """Drop keys with no attempts in the window (lock held)"""
+        for key in [k for k, v in self.attempts.items() if not v or v[-1] <= now - self.window]:
+            del self.attempts[key]
@@ -0,0 +1,209 @@
+"""
+Player info sources - structured summaries first, page scraping as a fallback
+
+Player cards used to download the whole Wikipedia article (hundreds of KB
+of HTML) and parse it with BeautifulSoup to find one paragraph and a
+thumbnail. Wikipedia's REST summary endpoint returns the same lead
+paragraph, the thumbnail and a short description in a couple of KB of
+JSON, so it is tried first. The article is only scraped when there is no
+usable summary (missing page, disambiguation, no extract).
+
+Sources are grouped: within a group the first source that finds something
+wins, and every group is asked in turn (Wikipedia, then ESPN Cricinfo for
+a profile link). A network error (timeout, connection refused) is raised
+if nothing was found yet, as a fallback on the same network would not fare
+better; HTTP errors and pages without the data just fall through.
+
+Each source counts requests, bytes transferred and latency in `stats`, and
+reports every request to `on_fetch(source, result, size, seconds)`.
+"""
+import re
+import threading
+import time
+from urllib.parse import quote
+
+import requests
+from bs4 import BeautifulSoup
+
+from upstream import upstream_url
+
+FETCH_TIMEOUT = 5
+MAX_DESCRIPTION = 500
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+# Short descriptions look like "Indian cricketer (born 1988)"
+SHORT_DESCRIPTION = re.compile(r'^(?P<nationality>[A-Z][\w-]*(?: [A-Z][\w-]*)*) cricketer(?: \(born (?P<born>\d{4})\))?')
+# Lead paragraphs open with "Virat Kohli (born 5 November 1988) is ..."
+BORN = re.compile(r'\(born (\d{1,2} [A-Z][a-z]+ \d{4}|[A-Z][a-z]+ \d{1,2}, \d{4})')
+
+
+def wikipedia_title(player_name):
+    return quote(player_name.strip().replace(' ', '_'))
+
+
+def wikipedia_description(text):
+    return text[:MAX_DESCRIPTION] + '... (Source: Wikipedia)'
+
+
+class Source:
+    """One upstream; fetch() adds what it finds to info and returns True, or False to fall through"""
+    name = None
+
+    def __init__(self, session, upstream=None, on_fetch=None):
+        self.session = session
+        self.upstream = upstream
+        self.on_fetch = on_fetch
+        self.stats = {'requests': 0, 'bytes': 0, 'seconds': 0.0, 'errors': 0, 'found': 0}
+        self.lock = threading.Lock()
+
+    def _record(self, result, size, seconds):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['bytes'] += size
+            self.stats['seconds'] += seconds
+            if result == 'error':
+                self.stats['errors'] += 1
+        if self.on_fetch:
+            self.on_fetch(self.name, result, size, seconds)
+
+    def get(self, url):
+        """Response for url (via the upstream stand-in if set), recording its size and latency"""
+        url = upstream_url(url, self.upstream)
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=FETCH_TIMEOUT)
+        except requests.RequestException:
+            self._record('error', 0, time.perf_counter() - started)
+            raise
+        # Bytes on the wire: the (possibly compressed) Content-Length when given
+        size = int(response.headers.get('Content-Length') or len(response.content))
+        self._record('ok' if response.status_code == 200 else 'miss', size, time.perf_counter() - started)
+        return response
+
+    def found(self):
+        with self.lock:
+            self.stats['found'] += 1
+
+    def fetch(self, player_name, info):
+        raise NotImplementedError
+
+
+class WikipediaSummary(Source):
+    """Lead paragraph, thumbnail and short description from the REST summary endpoint"""
+    name = 'wikipedia_summary'
+
+    def fetch(self, player_name, info):
+        response = self.get(f'https://en.wikipedia.org/api/rest_v1/page/summary/{wikipedia_title(player_name)}')
+        if response.status_code != 200:
+            return False
+        try:
+            summary = response.json()
+        except ValueError:
+            return False
+        extract = (summary.get('extract') or '').strip()
+        if summary.get('type') != 'standard' or len(extract) <= 100:
+            return False  # Disambiguation or stub: let the page scraper look
+        info['description'] = wikipedia_description(extract)
+        image = (summary.get('thumbnail') or summary.get('originalimage') or {}).get('source')
+        if image:
+            info['wikipedia_image'] = image
+        match = SHORT_DESCRIPTION.match(summary.get('description') or '')
+        if match:
+            info['nationality'] = match.group('nationality')
+        born = BORN.search(extract)
+        if born or (match and match.group('born')):
+            info['birth_info'] = born.group(1) if born else match.group('born')
+        return True
+
+
+class WikipediaPage(Source):
+    """Scrapes the full article: lead paragraph, infobox fields and the first thumbnail"""
+    name = 'wikipedia_page'
+
+    def fetch(self, player_name, info):
+        response = self.get(f'https://en.wikipedia.org/wiki/{wikipedia_title(player_name)}')
+        if response.status_code != 200:
+            return False
+        soup = BeautifulSoup(response.content, 'html.parser')
+        found = False
+
+        first_name = player_name.split()[0].lower()
+        for p in soup.find_all('p')[:3]:  # Check first 3 paragraphs
+            text = p.get_text().strip()
+            if len(text) > 100 and first_name in text.lower():
+                info['description'] = wikipedia_description(text)
+                found = True
+                break
+
+        infobox = soup.find('table', class_='infobox')
+        if infobox:
+            for row in infobox.find_all('tr'):
+                th = row.find('th')
+                td = row.find('td')
+                if th and td:
+                    key = th.get_text().strip().lower()
+                    value = td.get_text().strip()
+                    if 'born' in key or 'date of birth' in key:
+                        info['birth_info'] = value
+                    if 'nationality' in key or 'country' in key:
+                        info['nationality'] = value
+                    if 'nickname' in key:
+                        info['nickname'] = value
+
+        img = soup.find('img', class_=lambda x: x and 'thumb' in x.lower())
+        if img and img.get('src'):
+            img_url = img['src']
+            if img_url.startswith('//'):
+                img_url = 'https:' + img_url
+            elif img_url.startswith('/'):
+                img_url = 'https://en.wikipedia.org' + img_url
+            info['wikipedia_image'] = img_url
+            found = True
+        return found
+
+
+class CricinfoSearch(Source):
+    """Profile link from an ESPN Cricinfo search"""
+    name = 'cricinfo_search'
+
+    def fetch(self, player_name, info):
+        response = self.get(f'https://www.espncricinfo.com/search?q={quote(player_name)}')
+        if response.status_code != 200:
+            return False
+        profile_link = BeautifulSoup(response.content, 'html.parser').find('a', href=lambda x: x and '/players/' in x)
+        if not profile_link:
+            return False
+        info['cricinfo_url'] = 'https://www.espncricinfo.com' + profile_link['href']
+        info['description'] = info.get('description', '') + ' View detailed stats on ESPN Cricinfo.'
+        return True
+
+
+DEFAULT_GROUPS = ((WikipediaSummary, WikipediaPage), (CricinfoSearch,))
+
+
+class PlayerInfoSources:
+    """Asks each group of sources in turn; within a group, the first that finds something wins"""
+
+    def __init__(self, groups=DEFAULT_GROUPS, upstream=None, session=None, on_fetch=None):
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', USER_AGENT)
+        self.groups = [[source(self.session, upstream, on_fetch) for source in group] for group in groups]
+
+    def fetch(self, player_name):
+        """(info fields, names of the sources that provided them); raises requests errors if nothing was found"""
+        info, used = {}, []
+        for group in self.groups:
+            for source in group:
+                try:
+                    if source.fetch(player_name, info):
+                        source.found()
+                        used.append(source.name)
+                        break
+                except requests.RequestException:
+                    if not used:
+                        raise
+                    return info, used  # Network trouble: keep what the earlier groups found
+        return info, used
+
+    @property
+    def stats(self):
+        return {source.name: dict(source.stats) for group in self.groups for source in group}
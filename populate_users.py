@@ -3,7 +3,10 @@
 Script to pre-populate users in the database
 """
 import sqlite3
-from werkzeug.security import generate_password_hash
+import time
+
+from passwords import HashPool
+from schema import create_schema
 
 # User credentials
 USERS = [
@@ -27,54 +30,19 @@ def populate_users():
     conn = sqlite3.connect(DATABASE)
     c = conn.cursor()
     
-    # Create users table if not exists
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        team_name TEXT,
-        purse REAL DEFAULT 100.0,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    # Create other tables
-    c.execute('''CREATE TABLE IF NOT EXISTS teams (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        player_name TEXT NOT NULL,
-        player_category TEXT,
-        purchase_price REAL,
-        position INTEGER,
-        FOREIGN KEY (user_id) REFERENCES users (id),
-        UNIQUE(user_id, player_name)
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS bids (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        player_name TEXT NOT NULL,
-        amount REAL NOT NULL,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        is_winning INTEGER DEFAULT 0,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
+    # Same tables, migrations and indexes as the app's init_db
+    create_schema(c)
     
-    c.execute('''CREATE TABLE IF NOT EXISTS auction_log (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        player_name TEXT NOT NULL,
-        category TEXT,
-        base_price REAL,
-        sold_to_user_id INTEGER,
-        final_price REAL,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (sold_to_user_id) REFERENCES users (id)
-    )''')
+    # Hash every password in parallel (each one is deliberately slow)
+    started = time.perf_counter()
+    pool = HashPool()
+    password_hashes = pool.hash_many([password for _, password, _ in USERS])
+    pool.shutdown()
+    print(f"Hashed {len(USERS)} passwords on {pool.workers} workers in {time.perf_counter() - started:.2f}s")
     
     # Insert or update users
-    for username, password, team_name in USERS:
+    for (username, password, team_name), password_hash in zip(USERS, password_hashes):
         email = f"{username}@auction.local"
-        password_hash = generate_password_hash(password)
         
         # Check if user exists
         c.execute('SELECT id FROM users WHERE username = ?', (username,))
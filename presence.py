@@ -0,0 +1,88 @@
+"""
+Presence - which teams are connected to each auction, announced in debounced digests
+
+Every Socket.IO connection used to broadcast `user_connected` /
+`user_disconnected` to its whole room, so a venue Wi-Fi blip (N clients
+dropping and reconnecting) cost N x N presence messages. Here connections
+only update an in-memory refcount per user (several tabs count once). A
+background pump calls `flush()` every few hundred ms and broadcasts one
+`presence` digest per auction whose set of online users changed since its
+last digest:
+
+    {'online': count, 'joined': [username, ...], 'left': [username, ...]}
+
+A user who drops and reconnects between two flushes never shows up in a
+digest at all. "Who's online" is answered from memory by `online()`.
+"""
+import threading
+
+FLUSH_INTERVAL = 0.25  # Seconds between digests (at most) per auction
+
+
+class Presence:
+    """Connected users per auction with multi-tab refcounts"""
+
+    def __init__(self):
+        self.tabs = {}  # auction_id -> {user_id: open connections}
+        self.connections = {}  # sid -> (auction_id, user_id)
+        self.announced = {}  # auction_id -> frozenset of user ids in the last digest
+        self.names = {}  # user_id -> (username, team_name)
+        self.dirty = set()  # Auctions whose refcounts changed since the last flush
+        self.lock = threading.Lock()
+
+    def join(self, sid, auction_id, user_id, username, team_name):
+        """Count a new connection; True if it is the user's first in this auction"""
+        with self.lock:
+            self.connections[sid] = (auction_id, user_id)
+            self.names[user_id] = (username, team_name)
+            tabs = self.tabs.setdefault(auction_id, {})
+            tabs[user_id] = tabs.get(user_id, 0) + 1
+            self.dirty.add(auction_id)
+            return tabs[user_id] == 1
+
+    def leave(self, sid):
+        """Count a closed connection; True if it was the user's last in its auction"""
+        with self.lock:
+            auction_id, user_id = self.connections.pop(sid, (None, None))
+            tabs = self.tabs.get(auction_id)
+            if not tabs or user_id not in tabs:
+                return False
+            tabs[user_id] -= 1
+            self.dirty.add(auction_id)
+            if tabs[user_id] > 0:
+                return False
+            del tabs[user_id]
+            return True
+
+    def count(self, auction_id):
+        with self.lock:
+            return len(self.tabs.get(auction_id, ()))
+
+    def online(self, auction_id):
+        """[{'user_id', 'username', 'team_name', 'tabs'}] for an auction, by username"""
+        with self.lock:
+            tabs = dict(self.tabs.get(auction_id, {}))
+            users = [{'user_id': user_id, 'username': self.names[user_id][0], 'team_name': self.names[user_id][1],
+                      'tabs': count} for user_id, count in tabs.items()]
+        return sorted(users, key=lambda user: user['username'].lower())
+
+    def flush(self):
+        """{auction_id: digest} for every auction whose online set changed since its last digest"""
+        digests = {}
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            for auction_id in dirty:
+                current = frozenset(self.tabs.get(auction_id, ()))
+                previous = self.announced.get(auction_id, frozenset())
+                if current == previous:
+                    continue  # Only tab counts changed, or a reconnect within the interval
+                self.announced[auction_id] = current
+                digests[auction_id] = {
+                    'online': len(current),
+                    'joined': sorted(self.names[user_id][0] for user_id in current - previous),
+                    'left': sorted(self.names[user_id][0] for user_id in previous - current)
+                }
+                if not current:
+                    self.tabs.pop(auction_id, None)
+                    del self.announced[auction_id]
+        return digests
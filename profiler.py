@@ -0,0 +1,120 @@
+"""
+Opt-in request profiler and slow-event log
+
+A sampled fraction of Socket.IO events / HTTP requests is run under cProfile and
+dumped as .prof files (load with `python -m pstats` or snakeviz). Independently,
+tracked events slower than a threshold are appended to a JSON-lines log with a
+per-component timing breakdown (db, serialize, emit, fetch).
+"""
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+_local = threading.local()
+
+
+class RequestProfiler:
+    def __init__(self, output_dir, sample_rate=0.0, slow_threshold_ms=250, slow_events=()):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_events = set(slow_events)
+        # cProfile allows only one active profiler per process (Python 3.12+)
+        self._profile_lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._counter = 0
+
+    @property
+    def slow_log_path(self):
+        return os.path.join(self.output_dir, 'slow_events.jsonl')
+
+    def configure(self, sample_rate=None, slow_threshold_ms=None):
+        """Change sampling / threshold at runtime"""
+        if sample_rate is not None:
+            self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = max(0.0, float(slow_threshold_ms))
+        return self.settings()
+
+    def settings(self):
+        return {
+            'sample_rate': self.sample_rate,
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'slow_events': sorted(self.slow_events),
+            'output_dir': self.output_dir
+        }
+
+    def begin(self, name):
+        """Start timing (and maybe profiling) an event on this thread; returns a token for end()"""
+        profile = None
+        if self.sample_rate and random.random() < self.sample_rate and self._profile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiling tool is active
+                self._profile_lock.release()
+                profile = None
+        token = {'name': name, 'started': time.perf_counter(), 'breakdown': {}, 'profile': profile,
+                 'parent': getattr(_local, 'current', None)}
+        _local.current = token
+        return token
+
+    def end(self, token, **details):
+        """Finish an event: dump its profile if sampled, log it if slow"""
+        total = time.perf_counter() - token['started']
+        _local.current = token['parent']
+        profile = token['profile']
+        if profile is not None:
+            profile.disable()
+            self._profile_lock.release()
+            self._dump(token['name'], profile)
+        total_ms = total * 1000
+        if token['name'] in self.slow_events and total_ms >= self.slow_threshold_ms:
+            self._log_slow(token, total_ms, details)
+        return total
+
+    def add_time(self, component, seconds):
+        """Attribute time to a component of the event running on this thread (no-op outside one)"""
+        token = getattr(_local, 'current', None)
+        if token is not None:
+            breakdown = token['breakdown']
+            breakdown[component] = breakdown.get(component, 0.0) + seconds
+
+    def _dump(self, name, profile):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._log_lock:
+            self._counter += 1
+            counter = self._counter
+        safe_name = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in name).strip('_')
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        profile.dump_stats(os.path.join(self.output_dir, f'{safe_name}-{stamp}-{counter}.prof'))
+
+    def _log_slow(self, token, total_ms, details):
+        breakdown_ms = {k: round(v * 1000, 3) for k, v in sorted(token['breakdown'].items())}
+        accounted = sum(token['breakdown'].values()) * 1000
+        entry = {
+            'event': token['name'],
+            'at': datetime.now().isoformat(),
+            'total_ms': round(total_ms, 3),
+            'breakdown_ms': breakdown_ms,
+            'other_ms': round(max(0.0, total_ms - accounted), 3),
+            **details
+        }
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._log_lock:
+            with open(self.slow_log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, default=str) + '\n')
+
+    def recent_slow_events(self, limit=50):
+        """Last `limit` slow-event log entries, newest first"""
+        if not os.path.exists(self.slow_log_path):
+            return []
+        with self._log_lock:
+            with open(self.slow_log_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()[-limit:]
+        return [json.loads(line) for line in reversed(lines)]
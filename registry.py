@@ -0,0 +1,180 @@
+"""
+Auction registry - hosts many independent auction instances in one server process
+"""
+import json
+import os
+import re
+import threading
+import time
+
+from engine import new_state
+
+DEFAULT_AUCTION_ID = 'main'
+AUCTION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def room_for(auction_id):
+    """Socket.IO room name for an auction (the default auction keeps its original room)"""
+    if auction_id == DEFAULT_AUCTION_ID:
+        return 'main_auction_room'
+    return f'auction_{auction_id}'
+
+
+def new_auction_state(auction_id):
+    """Fresh auction state tagged with its id and Socket.IO room"""
+    state = new_state()
+    state['room_id'] = room_for(auction_id)
+    state['auction_id'] = auction_id
+    return state
+
+
+class AuctionInstance:
+    """One auction: its own state, pool cursor, lot schedule and Socket.IO room"""
+
+    def __init__(self, auction_id, state=None, proxies=None):
+        self.auction_id = auction_id
+        self.state = state or new_auction_state(auction_id)
+        # Private maximum bids on the lot on the block (persisted, never broadcast)
+        self.proxies = proxies or {}
+        # Lot schedule and closed-lot archive, loaded from the database on first use (persisted there, not here)
+        self.schedule = None
+        self.closed_lots = None
+        self.connections = 0
+        self.last_active = time.time()
+        # Team strength scores, derived from auction_log on first use (not persisted)
+        self.team_strength = None
+        # Bid rate limiter token buckets (not persisted)
+        self.bid_throttle = None
+
+    @property
+    def room_id(self):
+        return self.state['room_id']
+
+    def touch(self):
+        """Mark the instance as recently used"""
+        self.last_active = time.time()
+
+    def to_dict(self):
+        return {
+            'auction_id': self.auction_id,
+            'state': self.state,
+            'proxies': self.proxies
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = data['state']
+        if 'sold_players' in state:
+            # Saved before lots were archived: keep only the lot on the block (sales are rebuilt from auction_log)
+            del state['sold_players']
+            current = state['current_player']
+            state['bids'] = {current['name']: state['bids'].get(current['name'], [])} if current else {}
+        return cls(data['auction_id'], state, data.get('proxies'))
+
+
+class AuctionRegistry:
+    """Keyed collection of auction instances with idle eviction to disk"""
+
+    def __init__(self, storage_dir, idle_timeout=1800, sweep_interval=60):
+        self.storage_dir = storage_dir
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._live = {}
+        self._lock = threading.RLock()
+        self._last_sweep = time.time()
+
+    def _path(self, auction_id):
+        return os.path.join(self.storage_dir, f'{auction_id}.json')
+
+    def validate_id(self, auction_id):
+        """Reject ids that are not safe to use as a file name / room suffix"""
+        if not auction_id or not AUCTION_ID_PATTERN.match(auction_id):
+            raise ValueError(f'Invalid auction id: {auction_id!r}')
+        return auction_id
+
+    def get(self, auction_id=None, create=True):
+        """Get a live instance, reloading it from disk or creating it if needed"""
+        auction_id = self.validate_id(auction_id or DEFAULT_AUCTION_ID)
+        with self._lock:
+            instance = self._live.get(auction_id)
+            if instance is None:
+                instance = self._load(auction_id)
+                if instance is None:
+                    if not create:
+                        return None
+                    instance = AuctionInstance(auction_id)
+                self._live[auction_id] = instance
+            instance.touch()
+            self._maybe_sweep()
+            return instance
+
+    def _load(self, auction_id):
+        path = self._path(auction_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            instance = AuctionInstance.from_dict(json.load(f))
+        os.remove(path)
+        return instance
+
+    def save(self, instance):
+        """Write an instance snapshot to disk (atomic rename)"""
+        os.makedirs(self.storage_dir, exist_ok=True)
+        path = self._path(instance.auction_id)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(instance.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def flush(self):
+        """Write every live instance to disk, keeping it live (graceful shutdown)"""
+        with self._lock:
+            for instance in self._live.values():
+                self.save(instance)
+            return list(self._live)
+
+    def evict(self, auction_id):
+        """Persist an instance to disk and drop it from memory"""
+        with self._lock:
+            instance = self._live.pop(auction_id, None)
+            if instance is not None:
+                self.save(instance)
+            return instance is not None
+
+    def evict_idle(self, now=None):
+        """Evict every instance with no connected clients that has been idle too long"""
+        now = now or time.time()
+        evicted = []
+        with self._lock:
+            for auction_id, instance in list(self._live.items()):
+                if auction_id == DEFAULT_AUCTION_ID or instance.connections > 0:
+                    continue
+                if now - instance.last_active >= self.idle_timeout:
+                    self.evict(auction_id)
+                    evicted.append(auction_id)
+            self._last_sweep = now
+        return evicted
+
+    def _maybe_sweep(self):
+        if time.time() - self._last_sweep >= self.sweep_interval:
+            self.evict_idle()
+
+    def live_instances(self):
+        """Snapshot of live instances (does not count as activity)"""
+        with self._lock:
+            return list(self._live.values())
+
+    def stored_state(self, auction_id):
+        """Auction state of an instance evicted to disk, without loading it (None if there is none)"""
+        try:
+            with open(self._path(self.validate_id(auction_id)), 'r', encoding='utf-8') as f:
+                return json.load(f)['state']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def stored_ids(self):
+        """Ids of instances currently evicted to disk"""
+        if not os.path.isdir(self.storage_dir):
+            return []
+        return [name[:-5] for name in os.listdir(self.storage_dir) if name.endswith('.json')]
+
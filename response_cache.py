@@ -0,0 +1,95 @@
+"""
+Version-based ETags and a serialized-body cache for read-mostly JSON endpoints
+
+A cached response is identified by a key (e.g. ('init', auction_id)) and the
+scopes it depends on (e.g. ('catalog',), ('schedule', auction_id)). Each
+scope has a version number that is bumped when its data changes, so the
+ETag is a hash of the key and the current versions - computing it costs no
+database work and no serialization. A request whose If-None-Match carries
+that ETag gets a 304. Otherwise the body is served from memory if it was
+built at the same versions, or built once and kept (LRU, `max_entries`).
+
+ETags include a per-process generation, so versions restarting from 0 after
+a restart (possibly with a different AUCTION.xlsx) can never match an old
+ETag. Bytes saved by 304s are counted per session.
+"""
+import hashlib
+import secrets
+import threading
+from collections import Counter, OrderedDict
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_SESSIONS = 10000
+
+
+def parse_if_none_match(header):
+    """ETags listed in an If-None-Match header (weak ones compared as strong, '*' kept)"""
+    if not header:
+        return set()
+    tags = set()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+class ResponseCache:
+    """Scope versions, ETags and cached bodies; thread-safe"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_sessions=DEFAULT_MAX_SESSIONS, generation=None):
+        self.max_entries = max_entries
+        self.max_sessions = max_sessions
+        self.generation = generation or secrets.token_hex(4)
+        self.versions = Counter()  # scope tuple -> version
+        self.entries = OrderedDict()  # key -> (etag, body bytes), least recently used first
+        self.saved = OrderedDict()  # session -> bytes saved by 304s
+        self.lock = threading.Lock()
+
+    def bump(self, *scopes):
+        """Invalidate every response that depends on any of these scopes"""
+        with self.lock:
+            for scope in scopes:
+                self.versions[scope] += 1
+
+    def etag(self, key, scopes):
+        with self.lock:
+            versions = [self.versions[scope] for scope in scopes]
+        digest = hashlib.blake2b(repr((self.generation, key, scopes, versions)).encode(), digest_size=8)
+        return f'"{digest.hexdigest()}"'
+
+    def size(self, key, etag):
+        """Size of the cached body for key at this ETag, or None if it is not (or no longer) cached"""
+        with self.lock:
+            entry = self.entries.get(key)
+            return len(entry[1]) if entry and entry[0] == etag else None
+
+    def body(self, key, etag, build):
+        """Cached body for key at this ETag; build() -> bytes is called (outside the lock) on a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == etag:
+                self.entries.move_to_end(key)
+                return entry[1], True
+        body = build()
+        with self.lock:
+            self.entries[key] = (etag, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return body, False
+
+    def record_saved(self, session, size):
+        """Count bytes a 304 saved for a session; returns the session's total"""
+        with self.lock:
+            total = self.saved.pop(session, 0) + size
+            self.saved[session] = total
+            while len(self.saved) > self.max_sessions:
+                self.saved.popitem(last=False)
+            return total
+
+    def saved_by_session(self):
+        with self.lock:
+            return dict(self.saved)
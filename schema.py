@@ -0,0 +1,137 @@
+"""
+Database schema - tables, migrations of older databases and indexes
+
+Shared by the app (init_db) and populate_users.py, so a database created by
+either ends up the same. Safe to run on every start: tables and indexes are
+created if missing and older layouts are migrated in place.
+"""
+from history import HISTORY_INDEXES
+
+TEAMS_TABLE = '''CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        player_name TEXT NOT NULL,
+        player_category TEXT,
+        purchase_price REAL,
+        position INTEGER,
+        is_captain INTEGER DEFAULT 0,
+        auction_id TEXT DEFAULT 'main',
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        UNIQUE(auction_id, user_id, player_name)
+    )'''
+
+
+def _unique_keys(c, table):
+    """Column sets of a table's UNIQUE constraints"""
+    keys = []
+    for _, index, unique, *_ in c.execute(f'PRAGMA index_list({table})').fetchall():
+        if unique:
+            keys.append({row[2] for row in c.execute(f'PRAGMA index_info({index})').fetchall()})
+    return keys
+
+
+def create_schema(c):
+    """Create or migrate every table and index through cursor c (the caller commits)"""
+    # Users table
+    c.execute('''CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        team_name TEXT,
+        purse REAL DEFAULT 100.0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    
+    # Teams table (playing 11)
+    c.execute(TEAMS_TABLE.format(name='teams'))
+    
+    # Bids table
+    c.execute('''CREATE TABLE IF NOT EXISTS bids (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        player_name TEXT NOT NULL,
+        amount REAL NOT NULL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_winning INTEGER DEFAULT 0,
+        auction_id TEXT DEFAULT 'main',
+        proxy_steps INTEGER DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+    
+    # Auction log
+    c.execute('''CREATE TABLE IF NOT EXISTS auction_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        player_name TEXT NOT NULL,
+        category TEXT,
+        base_price REAL,
+        sold_to_user_id INTEGER,
+        final_price REAL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        auction_id TEXT DEFAULT 'main',
+        FOREIGN KEY (sold_to_user_id) REFERENCES users (id)
+    )''')
+    
+    # Lot schedule per auction: the seed it was built from, the lot order as little-endian
+    # uint16 catalog indices, set 1 sizes that differ from half a category (JSON, after reloads)
+    # and the fingerprint of the catalog the indices refer to
+    c.execute('''CREATE TABLE IF NOT EXISTS auction_schedules (
+        auction_id TEXT PRIMARY KEY,
+        seed INTEGER NOT NULL,
+        lots BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        splits TEXT,
+        catalog TEXT
+    )''')
+    
+    # Lots that have left the block, per auction: ClosedLots records (17 bytes each, little-endian)
+    # and the fingerprint of the catalog their indices refer to
+    c.execute('''CREATE TABLE IF NOT EXISTS closed_lots (
+        auction_id TEXT PRIMARY KEY,
+        lots BLOB NOT NULL,
+        catalog TEXT
+    )''')
+    
+    # Every catalog rows were saved against (players per category, JSON), so they can be remapped after an edit
+    c.execute('''CREATE TABLE IF NOT EXISTS catalogs (
+        fingerprint TEXT PRIMARY KEY,
+        data TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    
+    # Older databases predate multi-auction support: add auction_id where missing
+    for table in ('teams', 'bids', 'auction_log'):
+        c.execute(f"PRAGMA table_info({table})")
+        columns = [col[1] for col in c.fetchall()]
+        if 'auction_id' not in columns:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN auction_id TEXT DEFAULT 'main'")
+    
+    # ... but kept UNIQUE(user_id, player_name), so a purchase in one auction replaced the same
+    # team's row for that player in another (INSERT OR REPLACE): rebuild with the per-auction key
+    if {'user_id', 'player_name'} in _unique_keys(c, 'teams'):
+        columns = ', '.join(col[1] for col in c.execute('PRAGMA table_info(teams)').fetchall())
+        c.execute('DROP TABLE IF EXISTS teams_rebuild')
+        c.execute(TEAMS_TABLE.format(name='teams_rebuild'))
+        c.execute(f'INSERT INTO teams_rebuild ({columns}) SELECT {columns} FROM teams')
+        c.execute('DROP TABLE teams')
+        c.execute('ALTER TABLE teams_rebuild RENAME TO teams')
+    
+    # Bids placed by maximum-bid proxies: how many implied increments the row stands for (0 = by hand)
+    c.execute("PRAGMA table_info(bids)")
+    if 'proxy_steps' not in [col[1] for col in c.fetchall()]:
+        c.execute('ALTER TABLE bids ADD COLUMN proxy_steps INTEGER DEFAULT 0')
+    
+    # Pool splits changed by catalog reloads
+    c.execute("PRAGMA table_info(auction_schedules)")
+    if 'splits' not in [col[1] for col in c.fetchall()]:
+        c.execute('ALTER TABLE auction_schedules ADD COLUMN splits TEXT')
+    
+    # Schedules and closed lots saved before catalog fingerprints
+    for table in ('auction_schedules', 'closed_lots'):
+        c.execute(f"PRAGMA table_info({table})")
+        if 'catalog' not in [col[1] for col in c.fetchall()]:
+            c.execute(f'ALTER TABLE {table} ADD COLUMN catalog TEXT')
+    
+    # History API indexes: equality filters, then timestamp (see history.py)
+    for statement in HISTORY_INDEXES:
+        c.execute(statement)
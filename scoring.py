@@ -0,0 +1,184 @@
+"""
+Team strength scoring from player stats
+
+PlayerRatings turns PLAYER_DETAILS (runs, average, strike rate, wickets,
+economy, ...) into batting, bowling and all-rounder ratings for every
+player in the catalog at once, as NumPy arrays. TeamStrength keeps a
+team x player roster matrix per auction and scores every roster in one
+batched operation; after a sale only the buying team's row is rescored.
+"""
+import numpy as np
+
+STATS = ('matches', 'runs', 'average', 'strike_rate', 'fifties', 'hundreds', 'wickets', 'economy')
+RATINGS = ('batting', 'bowling', 'allrounder')
+
+# How many of a team's best players count towards each rating
+TOP_BATTERS = 6
+TOP_BOWLERS = 5
+TOP_ALLROUNDERS = 2
+OVERALL_WEIGHTS = np.array([0.4, 0.4, 0.2])
+
+# Players without stats are rated at this fraction of their category's median
+REPLACEMENT_LEVEL = 0.5
+
+
+def _relative(values, higher_is_better=True):
+    """Scale to 0..1 relative to the best finite value (NaN stays NaN)"""
+    finite = values[np.isfinite(values) & (values > 0)]
+    if not len(finite):
+        return np.full_like(values, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if higher_is_better:
+            return values / finite.max()
+        return np.where(values > 0, finite.min() / values, np.nan)
+
+
+def _weighted(components, weights):
+    """Weighted mean over the components present for each player (NaN if none are)"""
+    stacked = np.stack(components, axis=1)
+    weights = np.asarray(weights, dtype=np.float64)
+    present = np.isfinite(stacked)
+    total = (np.where(present, stacked, 0.0) * weights).sum(axis=1)
+    weight = (present * weights).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(weight > 0, total / weight, np.nan)
+
+
+class PlayerRatings:
+    """Batting / bowling / all-rounder ratings (0-100) for every known player"""
+
+    def __init__(self, player_details, catalog):
+        self.key = catalog.key  # Sheet spellings and stats keys resolve to the same row
+        names = {}
+        for category in catalog.data:
+            for player in catalog.players(category):
+                names.setdefault(self.key(player), category)
+        for player, details in player_details.items():
+            names.setdefault(self.key(player), details.get('category'))
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        categories = [names[name] for name in self.names]
+
+        stats = np.full((len(self.names), len(STATS)), np.nan)
+        for player, details in player_details.items():
+            row = self.index[self.key(player)]
+            stats[row] = [details.get(stat, np.nan) for stat in STATS]
+        self.stats = stats
+        self.rated = np.isfinite(stats[:, 1:]).any(axis=1)
+        self.ratings = self._compute(stats, categories)
+
+    def _compute(self, stats, categories):
+        col = {stat: stats[:, i] for i, stat in enumerate(STATS)}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matches = np.where(col['matches'] > 0, col['matches'], np.nan)
+            runs_per_match = col['runs'] / matches
+            milestones_per_match = (np.nan_to_num(col['fifties']) + 2 * np.nan_to_num(col['hundreds'])) / matches
+            milestones_per_match[~np.isfinite(col['fifties'])] = np.nan
+            wickets_per_match = col['wickets'] / matches
+        # 'average' is a batting average for batters and a bowling average for bowlers
+        is_batter = np.isfinite(col['runs'])
+        batting_average = np.where(is_batter, col['average'], np.nan)
+        bowling_average = np.where(~is_batter & np.isfinite(col['wickets']), col['average'], np.nan)
+
+        batting = 100 * _weighted([_relative(batting_average), _relative(col['strike_rate']),
+                                   _relative(runs_per_match), _relative(milestones_per_match)],
+                                  [0.35, 0.35, 0.2, 0.1])
+        bowling = 100 * _weighted([_relative(wickets_per_match), _relative(col['economy'], higher_is_better=False),
+                                   _relative(bowling_average, higher_is_better=False)], [0.45, 0.35, 0.2])
+        # Geometric mean: only players who do both score as all-rounders
+        allrounder = np.sqrt(np.nan_to_num(batting) * np.nan_to_num(bowling))
+        ratings = np.stack([batting, bowling, allrounder], axis=1)
+
+        # Rated players simply lack the skill they have no stats for
+        ratings[self.rated] = np.nan_to_num(ratings[self.rated])
+        # Unrated players get a replacement-level share of their category's median
+        categories = np.array(categories, dtype=object)
+        for category in set(categories):
+            in_category = categories == category
+            peers = ratings[in_category & self.rated]
+            fill = REPLACEMENT_LEVEL * np.median(peers, axis=0) if len(peers) else np.zeros(len(RATINGS))
+            ratings[in_category & ~self.rated] = fill
+        return np.nan_to_num(ratings)
+
+    def lookup(self, player_name):
+        """Row index of a player, or None if unknown"""
+        return self.index.get(self.key(player_name))
+
+    def of(self, player_name):
+        row = self.lookup(player_name)
+        if row is None:
+            return None
+        return {name: round(float(v), 1) for name, v in zip(RATINGS, self.ratings[row])}
+
+
+class TeamStrength:
+    """Roster matrix and team ratings for one auction"""
+
+    def __init__(self, ratings):
+        self.ratings = ratings
+        self.team_rows = {}  # user_id -> row
+        self.team_names = []
+        self.roster = np.zeros((0, len(ratings.names)), dtype=bool)
+        self.scores = np.zeros((0, len(RATINGS) + 1))
+
+    def _row(self, user_id, team_name):
+        row = self.team_rows.get(user_id)
+        if row is None:
+            row = len(self.team_names)
+            self.team_rows[user_id] = row
+            self.team_names.append(team_name)
+            self.roster = np.vstack([self.roster, np.zeros((1, self.roster.shape[1]), dtype=bool)])
+            self.scores = np.vstack([self.scores, np.zeros((1, self.scores.shape[1]))])
+        return row
+
+    def _score(self, roster):
+        """Ratings for a block of rosters: mean of each team's top-k per skill, plus overall"""
+        masked = np.where(roster[:, :, None], self.ratings.ratings[None, :, :], 0.0)
+        best = -np.sort(-masked, axis=1)  # descending per team and skill
+        batting = best[:, :TOP_BATTERS, 0].sum(axis=1) / TOP_BATTERS
+        bowling = best[:, :TOP_BOWLERS, 1].sum(axis=1) / TOP_BOWLERS
+        allrounder = best[:, :TOP_ALLROUNDERS, 2].sum(axis=1) / TOP_ALLROUNDERS
+        skills = np.stack([batting, bowling, allrounder], axis=1)
+        return np.column_stack([skills, skills @ OVERALL_WEIGHTS])
+
+    def rebuild(self, teams, purchases):
+        """Score every roster from scratch; teams: [(user_id, team_name)], purchases: [(user_id, player_name)]"""
+        self.team_rows, self.team_names = {}, []
+        self.roster = np.zeros((0, len(self.ratings.names)), dtype=bool)
+        self.scores = np.zeros((0, len(RATINGS) + 1))
+        for user_id, team_name in teams:
+            self._row(user_id, team_name)
+        rows, cols = [], []
+        for user_id, player_name in purchases:
+            col = self.ratings.lookup(player_name)
+            if col is not None and user_id in self.team_rows:
+                rows.append(self.team_rows[user_id])
+                cols.append(col)
+        self.roster[rows, cols] = True
+        if len(self.team_names):
+            self.scores = self._score(self.roster)
+
+    def add_sale(self, user_id, team_name, player_name):
+        """Add a purchase and rescore only the buying team"""
+        row = self._row(user_id, team_name)
+        col = self.ratings.lookup(player_name)
+        if col is not None:
+            self.roster[row, col] = True
+        self.scores[row] = self._score(self.roster[row:row + 1])[0]
+
+    def leaderboard(self):
+        order = np.argsort(-self.scores[:, -1], kind='stable')
+        squad_sizes = self.roster.sum(axis=1)
+        board = []
+        for rank, row in enumerate(order, 1):
+            batting, bowling, allrounder, overall = (round(float(v), 1) for v in self.scores[row])
+            board.append({
+                'rank': rank,
+                'team_name': self.team_names[row],
+                'players': int(squad_sizes[row]),
+                'batting': batting,
+                'bowling': bowling,
+                'allrounder': allrounder,
+                'overall': overall
+            })
+        return board
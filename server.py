@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Production server - gevent, with graceful shutdown
+
+`python app.py` runs the Werkzeug development server with the debugger and
+reloader. This entry point runs without them (--mode or SERVER_MODE):
+
+    gevent     The production server. Monkey-patched cooperative WSGI
+               server: thousands of idle Socket.IO connections cost a
+               greenlet each, and socket I/O (including upstream requests)
+               yields. Password hashing runs on real OS threads; SQLite
+               calls are short and stay inline. The default; gevent and
+               gevent-websocket are in requirements.txt.
+    threading  Development fallback, not for production: still the Werkzeug
+               development server (one OS thread per connection), only
+               without the debugger and reloader.
+
+SIGTERM/SIGINT stop accepting connections and flush every live auction to
+disk (auction_rooms/), from where it is reloaded on the next start.
+
+Usage:
+    python server.py --port 8080
+    SERVER_MODE=threading python server.py   # development fallback
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+MODES = ('gevent', 'threading')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=MODES, default=os.environ.get('SERVER_MODE') or 'gevent')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8080)))
+    parser.add_argument('--database', default=os.environ.get('AUCTION_DATABASE'), help='SQLite file (default auction.db)')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    ARGS = parse_args()
+    if ARGS.mode == 'gevent' and not importlib.util.find_spec('gevent'):
+        sys.exit('gevent is not installed: pip install -r requirements.txt '
+                 '(or --mode threading, the development fallback)')
+    if ARGS.mode == 'gevent':
+        # Must run before anything imports socket, ssl, threading or time
+        from gevent import monkey
+        monkey.patch_all()
+
+import signal
+
+
+def serve(mode, host, port, database=None):
+    os.environ['SERVER_MODE'] = mode
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    import app as auction_app
+    app, socketio = auction_app.app, auction_app.socketio
+    if database:
+        app.config['DATABASE'] = database
+    auction_app.init_db()
+    auction_app.load_raw_data()
+    auction_app.prepare_assets()
+
+    if mode == 'gevent':
+        import gevent
+
+        def stop():
+            print('Shutting down: closing listener, waiting up to 5s for requests')
+            socketio.wsgi_server.stop(timeout=5)
+
+        gevent.signal_handler(signal.SIGTERM, stop)
+        gevent.signal_handler(signal.SIGINT, stop)
+    else:
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, stop)
+
+    if mode == 'threading':
+        print('Warning: --mode threading is the Werkzeug development server, a fallback for development only')
+    print(f'IPL auction server ({mode}) on http://{host}:{port}')
+    try:
+        socketio.run(app, host=host, port=port, debug=False, use_reloader=False, log_output=False,
+                     allow_unsafe_werkzeug=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        flushed = auction_app.shutdown()
+        print(f'Flushed {len(flushed)} live auction(s) to {auction_app.auction_registry.storage_dir}/')
+
+
+def main():
+    args = ARGS if __name__ == '__main__' else parse_args()
+    serve(args.mode, args.host, args.port, args.database)
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo auction simulator - how purse, base prices and pool order play out
+
+Runs thousands of synthetic mega-auctions over the real catalog from
+AUCTION.xlsx through the headless engine (in-memory store, virtual clock).
+Teams follow configurable bidding strategies; auctions are spread across a
+process pool and the sale records are aggregated with NumPy into price
+distributions per category, per pool position and per strategy.
+
+Usage:
+    python simulate.py --auctions 2000 --strategies value=4,stars=3,balanced=3
+    python simulate.py --auctions 2000 --purse 120 --critical-base 2 --order reverse
+    python simulate.py --auctions 1000 --workers 1,2,4,8     # scaling across cores
+"""
+import argparse
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from catalog import COLUMNS, EXCEL_FILE, Catalog, read_player_data
+from engine import AuctionEngine, Bidder, MemoryStore, VirtualClock
+
+PURSE = 100.0
+INCREMENT = 0.25
+SQUAD_MIN = 18
+SQUAD_MAX = 25
+DEFAULT_STRATEGIES = 'value=4,stars=3,balanced=3'
+
+# Columns of the per-lot record array returned by each worker
+LOT_FIELDS = ('auction', 'category', 'set', 'pool_position', 'lot_position',
+              'base_price', 'is_critical', 'price', 'strategy', 'bids')
+UNSOLD = -1
+
+
+class SimCatalog(Catalog):
+    """Catalog with an overridable base price for critical players"""
+
+    def __init__(self, data, critical_base=None):
+        super().__init__(data)
+        self.critical_base = critical_base
+
+    def base_price(self, player_name):
+        if self.critical_base is not None and self.is_critical(player_name):
+            return self.critical_base
+        return super().base_price(player_name)
+
+
+# --- Bidding strategies ----------------------------------------------------
+
+class Strategy:
+    """Decides the most a team will pay for a lot; subclasses set value()"""
+    name = None
+
+    def max_bid(self, lot, team, rng):
+        if len(team['squad']) >= SQUAD_MAX:
+            return 0
+        # Keep 1 Cr back for every slot still needed to reach the minimum squad
+        still_needed = max(0, SQUAD_MIN - len(team['squad']) - 1)
+        cap = team['purse_left'] - still_needed
+        return min(self.value(lot, team, rng), cap)
+
+    def value(self, lot, team, rng):
+        raise NotImplementedError
+
+
+class ValueBidder(Strategy):
+    """Noisy valuation around base price, stars valued higher"""
+    name = 'value'
+
+    def value(self, lot, team, rng):
+        multiplier = rng.lognormvariate(0.5, 0.5)
+        return lot['base_price'] * multiplier * (1.5 if lot['is_critical'] else 1.0)
+
+
+class StarHunter(Strategy):
+    """Spends big on critical players, buys the rest near base price"""
+    name = 'stars'
+
+    def value(self, lot, team, rng):
+        if lot['is_critical']:
+            return lot['base_price'] * rng.uniform(2.0, 5.0)
+        return lot['base_price'] * rng.uniform(1.0, 1.3)
+
+
+class Balanced(Strategy):
+    """Budgets per remaining slot and favours categories it is short of"""
+    name = 'balanced'
+
+    def value(self, lot, team, rng):
+        slots_left = max(1, SQUAD_MIN - len(team['squad']))
+        per_slot = team['purse_left'] / slots_left
+        owned = team['categories'].get(lot['category'], 0)
+        need = 1.5 if owned == 0 else (1.0 if owned < 3 else 0.6)
+        return min(lot['base_price'] * rng.lognormvariate(0.3, 0.4) * need, 2.5 * per_slot)
+
+
+class Bargain(Strategy):
+    """Only picks up cheap lots"""
+    name = 'bargain'
+
+    def value(self, lot, team, rng):
+        if lot['is_critical']:
+            return 0
+        return lot['base_price'] * rng.uniform(1.0, 1.5)
+
+
+STRATEGIES = {cls.name: cls for cls in (ValueBidder, StarHunter, Balanced, Bargain)}
+
+
+def parse_strategies(spec):
+    """'value=4,stars=3' -> ['value', 'value', 'value', 'value', 'stars', ...]"""
+    teams = []
+    for part in spec.split(','):
+        name, _, count = part.strip().partition('=')
+        if name not in STRATEGIES:
+            raise ValueError(f'Unknown strategy {name!r} (choose from {", ".join(STRATEGIES)})')
+        teams.extend([name] * int(count or 1))
+    if len(teams) < 2:
+        raise ValueError('An auction needs at least two teams')
+    return teams
+
+
+def pool_order(order, rng):
+    """(category, set) pairs in the order pools are auctioned"""
+    pools = [(category, set_num) for set_num in (1, 2) for category in COLUMNS]
+    if order == 'reverse':
+        pools.reverse()
+    elif order == 'random':
+        rng.shuffle(pools)
+    return pools
+
+
+# --- One auction -------------------------------------------------------------
+
+def simulate_auction(catalog, team_strategies, seed, purse=PURSE, order='columns', increment=INCREMENT):
+    """Run one full auction; returns (lot records, team records) as lists of tuples"""
+    rng = random.Random(seed)
+    teams = {i + 1: (f'team{i}', f'Team {i}') for i in range(len(team_strategies))}
+    store = MemoryStore(teams, purse)
+    clock = VirtualClock()
+    engine = AuctionEngine(catalog, store, clock=clock, rng=rng)
+    bidders = [Bidder(user_id, username, team_name) for user_id, (username, team_name) in teams.items()]
+    strategies = [STRATEGIES[name]() for name in team_strategies]
+    strategy_index = {name: i for i, name in enumerate(STRATEGIES)}
+    rosters = {b.user_id: {'squad': [], 'categories': {}, 'purse_left': purse} for b in bidders}
+    category_index = {category: i for i, category in enumerate(COLUMNS)}
+
+    lots = []
+    for pool_position, (category, set_num) in enumerate(pool_order(order, rng)):
+        engine.start_auction('start', category, set_num)
+        lot_position = 0
+        while engine.state['current_player'] and engine.state['status'] == 'active':
+            player = engine.state['current_player']
+            lot = dict(player, category=category)
+            # Each team fixes its limit for the lot up front
+            limits = []
+            for bidder, strategy in zip(bidders, strategies):
+                team = rosters[bidder.user_id]
+                team['purse_left'] = store.available_purse(bidder.user_id)
+                limits.append(strategy.max_bid(lot, team, rng))
+
+            # English auction: a random team still under its limit outbids the leader
+            price, leader, n_bids = None, None, 0
+            while True:
+                next_price = player['base_price'] if price is None else price + increment
+                contenders = [i for i, limit in enumerate(limits) if i != leader and limit >= next_price]
+                if not contenders:
+                    break
+                i = rng.choice(contenders)
+                engine.place_bid(bidders[i], player['name'], next_price)
+                price, leader, n_bids = next_price, i, n_bids + 1
+                clock.advance(3)
+
+            record = [0, category_index[category], set_num, pool_position, lot_position,
+                      player['base_price'], int(player['is_critical']), 0.0, UNSOLD, n_bids]
+            if leader is None:
+                if not engine.next_player():
+                    break  # Last lot went unsold: pool is over
+            else:
+                engine.sell(player['name'])
+                winner = rosters[bidders[leader].user_id]
+                winner['squad'].append(player['name'])
+                winner['categories'][category] = winner['categories'].get(category, 0) + 1
+                record[7] = price
+                record[8] = strategy_index[team_strategies[leader]]
+            lots.append(record)
+            lot_position += 1
+        if engine.state['status'] == 'active' and engine.state['active_pool']:
+            engine.start_auction('paused')
+
+    team_records = []
+    for bidder, name in zip(bidders, team_strategies):
+        spent = store.spent[bidder.user_id]
+        critical = sum(1 for player, _, _ in store.purchases[bidder.user_id] if catalog.is_critical(player))
+        team_records.append((0, strategy_index[name], spent, len(store.purchases[bidder.user_id]), critical))
+    return lots, team_records
+
+
+# --- Worker pool -------------------------------------------------------------
+
+_worker_catalog = None
+
+
+def _init_worker(data, critical_base):
+    global _worker_catalog
+    _worker_catalog = SimCatalog(data, critical_base)
+
+
+def _run_batch(args):
+    """Simulate a batch of seeds in a worker; returns compact NumPy arrays"""
+    seeds, team_strategies, purse, order, increment = args
+    lots, teams = [], []
+    for seed in seeds:
+        auction_lots, auction_teams = simulate_auction(_worker_catalog, team_strategies, seed,
+                                                       purse, order, increment)
+        for record in auction_lots:
+            record[0] = seed
+        lots.extend(auction_lots)
+        teams.extend((seed,) + record[1:] for record in auction_teams)
+    return np.array(lots, dtype=np.float64).reshape(-1, len(LOT_FIELDS)), np.array(teams, dtype=np.float64).reshape(-1, 5)
+
+
+def run_simulation(data, n_auctions, team_strategies, workers, seed=0, purse=PURSE, order='columns',
+                   increment=INCREMENT, critical_base=None, batch_size=None):
+    """Spread n auctions over a process pool; returns (lots array, teams array, seconds)"""
+    seeds = list(range(seed, seed + n_auctions))
+    batch_size = batch_size or max(1, min(50, n_auctions // (workers * 4) or 1))
+    batches = [(seeds[i:i + batch_size], team_strategies, purse, order, increment)
+               for i in range(0, len(seeds), batch_size)]
+    started = time.perf_counter()
+    if workers == 1:
+        _init_worker(data, critical_base)
+        results = [_run_batch(batch) for batch in batches]
+    else:
+        with Pool(workers, initializer=_init_worker, initargs=(data, critical_base)) as pool:
+            results = pool.map(_run_batch, batches)
+    elapsed = time.perf_counter() - started
+    lots = np.concatenate([r[0] for r in results])
+    teams = np.concatenate([r[1] for r in results])
+    return lots, teams, elapsed
+
+
+# --- Aggregation -------------------------------------------------------------
+
+def _col(name):
+    return LOT_FIELDS.index(name)
+
+
+def summarize(lots, teams, n_auctions):
+    """Price distributions per category, critical vs rest, per pool position and per strategy"""
+    category = lots[:, _col('category')].astype(np.int64)
+    price = lots[:, _col('price')]
+    sold = lots[:, _col('strategy')] != UNSOLD
+    critical = lots[:, _col('is_critical')] == 1
+    n_categories = len(COLUMNS)
+
+    lots_per_category = np.bincount(category, minlength=n_categories)
+    sold_per_category = np.bincount(category, weights=sold, minlength=n_categories)
+    spend_per_category = np.bincount(category, weights=price, minlength=n_categories)
+
+    # Percentiles per category in one pass: sort sold prices by (category, price) and index into runs
+    sold_category, sold_price = category[sold], price[sold]
+    order = np.lexsort((sold_price, sold_category))
+    sorted_category, sorted_price = sold_category[order], sold_price[order]
+    starts = np.searchsorted(sorted_category, np.arange(n_categories), side='left')
+    ends = np.searchsorted(sorted_category, np.arange(n_categories), side='right')
+
+    counts = ends - starts
+
+    def pct(q):
+        # Nearest-rank percentile within each category's run
+        if not len(sorted_price):
+            return np.zeros(n_categories)
+        idx = np.minimum(starts + np.floor((counts - 1).clip(min=0) * q).astype(np.int64), len(sorted_price) - 1)
+        return np.where(counts > 0, sorted_price[idx], 0.0)
+
+    p50, p90, p99 = pct(0.5), pct(0.9), pct(0.99)
+    max_price = np.zeros(n_categories)
+    if len(sold_price):
+        np.maximum.at(max_price, sold_category, sold_price)
+
+    categories = []
+    for i, name in enumerate(COLUMNS):
+        n_sold = sold_per_category[i]
+        categories.append({
+            'category': name,
+            'lots_per_auction': round(lots_per_category[i] / n_auctions, 1),
+            'sold_pct': round(100 * n_sold / lots_per_category[i], 1) if lots_per_category[i] else 0.0,
+            'mean': round(spend_per_category[i] / n_sold, 2) if n_sold else 0.0,
+            'p50': float(p50[i]), 'p90': float(p90[i]), 'p99': float(p99[i]), 'max': float(max_price[i]),
+        })
+
+    def mean_price(mask):
+        mask = mask & sold
+        return round(float(price[mask].mean()), 2) if mask.any() else 0.0
+
+    base = lots[:, _col('base_price')]
+    critical_summary = {
+        'critical_mean': mean_price(critical),
+        'critical_premium': round(float((price[critical & sold] / base[critical & sold]).mean()), 2) if (critical & sold).any() else 0.0,
+        'others_mean': mean_price(~critical),
+        'others_premium': round(float((price[~critical & sold] / base[~critical & sold]).mean()), 2) if (~critical & sold).any() else 0.0,
+        'critical_sold_pct': round(100 * float(sold[critical].mean()), 1) if critical.any() else 0.0,
+    }
+
+    # Pool order effect: mean price and sell-through per pool position
+    position = lots[:, _col('pool_position')].astype(np.int64)
+    n_positions = int(position.max()) + 1 if len(position) else 0
+    pos_lots = np.bincount(position, minlength=n_positions)
+    pos_sold = np.bincount(position, weights=sold, minlength=n_positions)
+    pos_spend = np.bincount(position, weights=price, minlength=n_positions)
+    pools = [{'position': p, 'mean': round(pos_spend[p] / pos_sold[p], 2) if pos_sold[p] else 0.0,
+              'sold_pct': round(100 * pos_sold[p] / pos_lots[p], 1) if pos_lots[p] else 0.0}
+             for p in range(n_positions)]
+
+    # Strategy outcomes from the team records (auction, strategy, spent, squad size, critical players)
+    strategy = teams[:, 1].astype(np.int64)
+    n_strategies = len(STRATEGIES)
+    team_counts = np.bincount(strategy, minlength=n_strategies)
+    strategies = []
+    for i, name in enumerate(STRATEGIES):
+        if not team_counts[i]:
+            continue
+        mask = strategy == i
+        strategies.append({
+            'strategy': name,
+            'teams': int(team_counts[i] // n_auctions),
+            'spent': round(float(teams[mask, 2].mean()), 2),
+            'squad': round(float(teams[mask, 3].mean()), 1),
+            'critical_players': round(float(teams[mask, 4].mean()), 2),
+            'under_min_squad_pct': round(100 * float((teams[mask, 3] < SQUAD_MIN).mean()), 1),
+        })
+
+    return {'categories': categories, 'critical': critical_summary, 'pools': pools, 'strategies': strategies}
+
+
+def print_summary(summary):
+    print(f"\n{'category':<14} {'lots':>5} {'sold%':>6} {'mean':>6} {'p50':>6} {'p90':>6} {'p99':>6} {'max':>6}")
+    for row in summary['categories']:
+        print(f"{row['category']:<14} {row['lots_per_auction']:>5} {row['sold_pct']:>6} {row['mean']:>6.2f} "
+              f"{row['p50']:>6.2f} {row['p90']:>6.2f} {row['p99']:>6.2f} {row['max']:>6.2f}")
+
+    crit = summary['critical']
+    print(f"\ncritical players: mean {crit['critical_mean']:.2f} Cr ({crit['critical_premium']:.2f}x base), "
+          f"{crit['critical_sold_pct']}% sold; others: mean {crit['others_mean']:.2f} Cr ({crit['others_premium']:.2f}x base)")
+
+    print('\npool order (position: mean price / sold%):')
+    print('  ' + '  '.join(f"{p['position'] + 1}: {p['mean']:.2f}/{p['sold_pct']:.0f}%" for p in summary['pools']))
+
+    print(f"\n{'strategy':<10} {'teams':>5} {'spent':>7} {'squad':>6} {'stars':>6} {'<min squad':>11}")
+    for row in summary['strategies']:
+        print(f"{row['strategy']:<10} {row['teams']:>5} {row['spent']:>7.2f} {row['squad']:>6} "
+              f"{row['critical_players']:>6} {row['under_min_squad_pct']:>10}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--auctions', type=int, default=1000, help='auctions to simulate')
+    parser.add_argument('--strategies', default=DEFAULT_STRATEGIES,
+                        help=f'teams per strategy, e.g. {DEFAULT_STRATEGIES} ({", ".join(STRATEGIES)})')
+    parser.add_argument('--workers', default=str(os.cpu_count() or 1),
+                        help='worker processes; a comma-separated list measures scaling')
+    parser.add_argument('--purse', type=float, default=PURSE, help='starting purse per team (Cr)')
+    parser.add_argument('--critical-base', type=float, default=None, help='override the critical players base price')
+    parser.add_argument('--increment', type=float, default=INCREMENT, help='bid increment (Cr)')
+    parser.add_argument('--order', choices=('columns', 'reverse', 'random'), default='columns',
+                        help='pool order: COLUMNS order (set 1 then set 2), reversed, or shuffled per auction')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the summary to this file')
+    args = parser.parse_args()
+
+    team_strategies = parse_strategies(args.strategies)
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    data = read_player_data(EXCEL_FILE)
+
+    scaling = []
+    for workers in worker_counts:
+        lots, teams, elapsed = run_simulation(data, args.auctions, team_strategies, workers, args.seed, args.purse,
+                                              args.order, args.increment, args.critical_base)
+        scaling.append({'workers': workers, 'seconds': round(elapsed, 3),
+                        'auctions_per_sec': round(args.auctions / elapsed, 1)})
+
+    print(f'{args.auctions} auctions, {len(team_strategies)} teams ({args.strategies}), '
+          f'purse {args.purse:g} Cr, order {args.order}')
+    print(f"\n{'workers':>7} {'seconds':>8} {'auctions/s':>11} {'speedup':>8} {'efficiency':>11}")
+    for row in scaling:
+        speedup = row['auctions_per_sec'] / scaling[0]['auctions_per_sec'] * scaling[0]['workers']
+        row['speedup'] = round(speedup, 2)
+        print(f"{row['workers']:>7} {row['seconds']:>8.2f} {row['auctions_per_sec']:>11.1f} "
+              f"{speedup:>7.2f}x {100 * speedup / row['workers']:>10.0f}%")
+
+    summary = summarize(lots, teams, args.auctions)
+    print_summary(summary)
+
+    if args.json:
+        summary.update(config=vars(args), scaling=scaling)
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f'\nSummary written to {args.json}')
+
+
+if __name__ == '__main__':
+    main()
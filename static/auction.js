@@ -1,12 +1,97 @@
+// Auction instance to join (?auction=<id>, defaults to the main auction)
+const auctionId = new URLSearchParams(window.location.search).get('auction') || 'main';
+
+// Wire encoding: ?encoding=compact opts in to positional payloads (remembered for next visits)
+const encodingParam = new URLSearchParams(window.location.search).get('encoding');
+if (encodingParam) localStorage.setItem('wireEncoding', encodingParam);
+const wireEncoding = localStorage.getItem('wireEncoding') || 'json';
+
 // Initialize Socket.IO connection
-const socket = io();
+const socket = io({ query: { auction: auctionId, encoding: wireEncoding } });
+
+// Lookup tables for compact payloads (sent by the server as wire_dictionary)
+let wire = null;
+
+function wirePlayer(player) {
+    return typeof player === 'number' ? wire.players[player] : player;
+}
+
+function wireTeam(userId) {
+    return wire.teams[userId] || [null, null];
+}
+
+function wireTime(ms) {
+    return ms === null ? null : new Date(wire.epoch + ms).toISOString();
+}
+
+function wireLot(player) {
+    if (player === null) return null;
+    const name = wirePlayer(player);
+    return typeof player === 'number'
+        ? { name, base_price: wire.base_prices[player], is_critical: !!wire.critical[player] }
+        : { name, base_price: 1, is_critical: false };
+}
+
+const wireDecoders = {
+    new_bid: ([player, userId, amount, ms]) => {
+        const [username, teamName] = wireTeam(userId);
+        return {
+            player_name: wirePlayer(player),
+            bid: { user_id: userId, username, team_name: teamName, amount, timestamp: wireTime(ms) },
+            highest_bid: amount
+        };
+    },
+    player_sold: ([player, userId, price, remaining]) => {
+        const [username, teamName] = wireTeam(userId);
+        return { player_name: wirePlayer(player), user_id: userId, buyer: username, team_name: teamName,
+                 price, remaining_purse: remaining };
+    },
+    auction_state: ([status, player, index, category, set, lotsRemaining, startMs, bids, closed, poolActive]) => {
+        const categoryName = category === null ? null : (typeof category === 'number' ? wire.categories[category] : category);
+        const state = {
+            status: typeof status === 'number' ? wire.statuses[status] : status,
+            current_player: wireLot(player),
+            current_player_index: index,
+            current_category: categoryName,
+            current_set: set || null,
+            active_pool: poolActive ? `${categoryName}_${set}` : null,
+            lots_remaining: lotsRemaining,
+            start_time: wireTime(startMs),
+            bids: {},
+            closed: { sold: closed[0], unsold: closed[1], spent: closed[2] }
+        };
+        bids.forEach(([bidPlayer, flat]) => {
+            const entries = [];
+            for (let i = 0; i < flat.length; i += 3) {
+                const [username, teamName] = wireTeam(flat[i]);
+                entries.push({ user_id: flat[i], username, team_name: teamName, amount: flat[i + 1], timestamp: wireTime(flat[i + 2]) });
+            }
+            state.bids[wirePlayer(bidPlayer)] = entries;
+        });
+        if (state.current_player && !state.bids[state.current_player.name]) {
+            state.bids[state.current_player.name] = [];
+        }
+        return state;
+    }
+};
+
+// Wrap a handler so compact payloads are decoded into the usual objects first
+function wireDecode(event, handler) {
+    return (data) => handler(wire && Array.isArray(data) ? wireDecoders[event](data) : data);
+}
+
+// Append the auction id to API URLs
+function withAuction(url) {
+    return url + (url.includes('?') ? '&' : '?') + 'auction=' + encodeURIComponent(auctionId);
+}
 
 let currentUser = null;
 let auctionState = null;
 let categories = [];
+let categoryInfo = {}; // Pool sizes from /api/init, patched by catalog_delta
 let lastAnnouncedPlayerName = null; // Track last player announced to avoid duplicate messages
 let lastBidIds = new Set(); // Track bid IDs to avoid duplicate bid messages
-let announcedUsers = new Set(); // Track users who have been announced as joined/left
+let onlineUsers = new Set(); // Usernames currently online, kept from presence digests
 
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', async () => {
@@ -62,7 +147,7 @@ async function loadUserInfo() {
 
 async function loadCategories() {
     try {
-        const res = await fetch('/api/init', { method: 'POST' });
+        const res = await fetch(withAuction('/api/init'));
         const data = await res.json();
         if (data.success) {
             categories = data.categories;
@@ -73,7 +158,8 @@ async function loadCategories() {
     }
 }
 
-function renderCategoryGrid(categoryInfo) {
+function renderCategoryGrid(info) {
+    categoryInfo = info;
     const grid = document.getElementById('category-grid');
     if (!grid) return; // Not admin, grid doesn't exist
     
@@ -160,7 +246,27 @@ function setupSocketListeners() {
         console.log('Connected to auction room');
     });
 
-    socket.on('auction_state', (state) => {
+    socket.on('wire_dictionary', (dictionary) => {
+        wire = dictionary;
+        wire.epoch = new Date(dictionary.epoch).getTime();
+    });
+
+    socket.on('catalog_delta', (delta) => {
+        // AUCTION.xlsx changed: patch the pool sizes it touched instead of reloading
+        renderCategoryGrid(Object.assign({}, categoryInfo, delta.category_info));
+        const parts = [];
+        if (delta.added.length) parts.push(`+${delta.added.length} added`);
+        if (delta.removed.length) parts.push(`-${delta.removed.length} removed`);
+        if (delta.renamed.length) parts.push(`${delta.renamed.length} renamed`);
+        if (delta.moved.length) parts.push(`${delta.moved.length} moved`);
+        addFeedMessage(`📋 Player list updated: ${parts.join(', ')}`, 'info');
+    });
+
+    socket.on('wire_teams', (teams) => {
+        if (wire) Object.assign(wire.teams, teams);
+    });
+
+    socket.on('auction_state', wireDecode('auction_state', (state) => {
         const previousPlayerName = auctionState?.current_player?.name;
         auctionState = state;
         
@@ -180,7 +286,7 @@ function setupSocketListeners() {
         
         // Re-render category grid to update button states if admin
         if (currentUser && currentUser.username.toLowerCase() === 'mithesh') {
-            fetch('/api/init', { method: 'POST' })
+            fetch(withAuction('/api/init'))
                 .then(res => res.json())
                 .then(data => {
                     if (data.success) {
@@ -189,13 +295,13 @@ function setupSocketListeners() {
                 })
                 .catch(err => console.error('Error refreshing categories:', err));
         }
-    });
+    }));
 
     socket.on('auction_error', (data) => {
         alert(data.message || 'An error occurred');
     });
 
-    socket.on('new_bid', (data) => {
+    socket.on('new_bid', wireDecode('new_bid', (data) => {
         // Only add to feed if this is a genuinely new bid (not from auto-refresh)
         // The new_bid event is emitted from server only when a real bid happens
         addBidToFeed(data);
@@ -204,9 +310,9 @@ function setupSocketListeners() {
             auctionState.current_player.name === data.player_name) {
             updateHighestBid(data.highest_bid);
         }
-    });
+    }));
 
-    socket.on('player_sold', (data) => {
+    socket.on('player_sold', wireDecode('player_sold', (data) => {
         addSaleToFeed(data);
         // Update My Team for the buyer
         if (currentUser && data.buyer === currentUser.username) {
@@ -216,32 +322,40 @@ function setupSocketListeners() {
         updatePurse();
         // Also update My Team purchases list (shows in right panel)
         updateMyTeam();
+    }));
+
+    socket.on('team_strength', (leaderboard) => {
+        renderTeamStrength(leaderboard);
     });
 
     socket.on('bid_error', (data) => {
         showBidStatus(data.message, 'error');
     });
 
-    socket.on('user_connected', (data) => {
-        // Only show join message once per user
-        const userKey = `joined_${data.username}`;
-        if (!announcedUsers.has(userKey)) {
-            addFeedMessage(`${data.username} joined the auction`, 'info');
-            announcedUsers.add(userKey);
-            // Remove from left set if they had left before
-            announcedUsers.delete(`left_${data.username}`);
-        }
+    socket.on('max_bid_set', (data) => {
+        showBidStatus(data.leading
+            ? `Max bid ${data.max_amount.toFixed(2)} Cr set - you lead at ${data.highest_bid.toFixed(2)} Cr`
+            : `Max bid ${data.max_amount.toFixed(2)} Cr set - already outbid at ${data.highest_bid.toFixed(2)} Cr`,
+            data.leading ? 'success' : 'error');
     });
 
-    socket.on('user_disconnected', (data) => {
-        // Only show leave message once per user
-        const userKey = `left_${data.username}`;
-        if (!announcedUsers.has(userKey)) {
-            addFeedMessage(`${data.username} left the auction`, 'info');
-            announcedUsers.add(userKey);
-            // Remove from joined set so they can rejoin later
-            announcedUsers.delete(`joined_${data.username}`);
+    socket.on('presence', (data) => {
+        // Debounced digest of who came and went; the one sent on connect lists everyone online
+        if (data.users) {
+            onlineUsers = new Set(data.users);
         }
+        data.joined.forEach(username => {
+            if (!onlineUsers.has(username)) {
+                addFeedMessage(`${username} joined the auction`, 'info');
+                onlineUsers.add(username);
+            }
+        });
+        data.left.forEach(username => {
+            addFeedMessage(`${username} left the auction`, 'info');
+            onlineUsers.delete(username);
+        });
+        document.getElementById('online-count').textContent = data.online;
+        document.getElementById('online-users').title = [...onlineUsers].sort().join(', ');
     });
 
     socket.on('pool_started', (data) => {
@@ -256,6 +370,30 @@ function setupSocketListeners() {
     });
 }
 
+function renderTeamStrength(leaderboard) {
+    const list = document.getElementById('team-strength-list');
+    if (!list) return;
+    list.innerHTML = '';
+    if (!leaderboard || leaderboard.length === 0) {
+        list.innerHTML = '<p style="color: var(--text-light);">No teams yet</p>';
+        return;
+    }
+    leaderboard.forEach(team => {
+        const div = document.createElement('div');
+        div.className = 'strength-item';
+        if (currentUser && team.team_name === currentUser.team_name) {
+            div.classList.add('mine');
+        }
+        div.innerHTML = `
+            <span class="strength-rank">#${team.rank}</span>
+            <span class="strength-team">${team.team_name} <small>(${team.players})</small></span>
+            <span class="strength-detail" title="Batting / Bowling / All-rounder">${team.batting.toFixed(0)} / ${team.bowling.toFixed(0)} / ${team.allrounder.toFixed(0)}</span>
+            <span class="strength-overall">${team.overall.toFixed(1)}</span>
+        `;
+        list.appendChild(div);
+    });
+}
+
 function updateAuctionDisplay() {
     if (!auctionState || !auctionState.current_player) {
         document.getElementById('category-selector').style.display = 'block';
@@ -271,6 +409,8 @@ function updateAuctionDisplay() {
     const lotNum = auctionState.current_player_index + 1;
     
     document.getElementById('lot-number').textContent = lotNum;
+    document.getElementById('lots-remaining').textContent =
+        auctionState.lots_remaining !== undefined ? `· ${auctionState.lots_remaining} left in set` : '';
     document.getElementById('current-player-name').textContent = player.name;
     document.getElementById('base-price').textContent = player.base_price || '0.00';
     
@@ -379,6 +519,7 @@ function addFeedMessage(message, type = 'info') {
 function setupEventListeners() {
     // Place bid button
     document.getElementById('place-bid-btn').addEventListener('click', placeBid);
+    document.getElementById('max-bid-btn').addEventListener('click', setMaxBid);
     document.getElementById('bid-amount').addEventListener('keypress', e => {
         if (e.key === 'Enter') placeBid();
     });
@@ -416,6 +557,8 @@ function setupEventListeners() {
         updateMyTeam();
     });
 
+    document.getElementById('auto-pick-btn').addEventListener('click', autoPickXI);
+
     document.getElementById('close-team-modal').addEventListener('click', () => {
         document.getElementById('team-modal').classList.remove('active');
     });
@@ -483,6 +626,28 @@ function placeBid() {
     showBidStatus('Bid placed...', 'info');
 }
 
+function setMaxBid() {
+    const amount = parseFloat(document.getElementById('bid-amount').value);
+    if (!amount || amount <= 0) {
+        showBidStatus('Please enter your maximum bid', 'error');
+        return;
+    }
+
+    if (!auctionState || !auctionState.current_player) {
+        showBidStatus('No player currently on auction', 'error');
+        return;
+    }
+
+    // Private: the server bids for us one increment at a time, up to this amount
+    socket.emit('set_max_bid', {
+        player_name: auctionState.current_player.name,
+        max_amount: amount
+    });
+
+    document.getElementById('bid-amount').value = '';
+    showBidStatus('Setting maximum bid...', 'info');
+}
+
 function showBidStatus(message, type) {
     const status = document.getElementById('bid-status');
     status.textContent = message;
@@ -538,7 +703,7 @@ document.getElementById('close-info-modal').addEventListener('click', () => {
 
 async function updateMyTeam() {
     try {
-        const res = await fetch('/api/my-team');
+        const res = await fetch(withAuction('/api/my-team'));
         if (!res.ok) {
             console.error('Failed to fetch team data:', res.status);
             return;
@@ -574,6 +739,7 @@ async function updateMyTeam() {
 
     // Always update playing 11 in modal when data is available
     updatePlaying11(data.players || []);
+    renderXISuggestion(data.suggested_xi);
         
         // Update purse summary
         const totalSpentEl = document.getElementById('total-spent');
@@ -729,11 +895,15 @@ async function handleDrop(e) {
             captainName = playerName;
         }
 
-        await fetch('/api/update-playing-11', {
+        const res = await fetch(withAuction('/api/update-playing-11'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ players, captain: captainName })
         });
+        if (!res.ok) {
+            const result = await res.json();
+            alert(result.error || 'Could not update Playing 11');
+        }
 
         updateMyTeam();
     } catch (error) {
@@ -741,12 +911,44 @@ async function handleDrop(e) {
     }
 }
 
+function renderXISuggestion(suggestion) {
+    const elem = document.getElementById('xi-suggestion');
+    if (!elem || !suggestion) return;
+    if (!suggestion.players.length) {
+        elem.innerHTML = '';
+        return;
+    }
+    const names = suggestion.players.map(p => p.name === suggestion.captain ? `${p.name} (c)` : p.name);
+    let html = `<strong>Suggested XI</strong> (${suggestion.overseas} overseas): ${names.join(', ')}`;
+    if (suggestion.unmet.length) {
+        html += `<div class="xi-unmet">Not yet possible: ${suggestion.unmet.join(', ')}</div>`;
+    }
+    elem.innerHTML = html;
+}
+
+async function autoPickXI() {
+    try {
+        const res = await fetch(withAuction('/api/update-playing-11'), {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ optimize: true })
+        });
+        if (!res.ok) {
+            const result = await res.json();
+            alert(result.error || 'Could not pick Playing 11');
+        }
+        updateMyTeam();
+    } catch (error) {
+        console.error('Error auto-picking playing 11:', error);
+    }
+}
+
 async function updatePurse() {
     try {
         const res = await fetch('/api/user-info');
         if (res.ok) {
             const user = await res.json();
-            const teamRes = await fetch('/api/my-team');
+            const teamRes = await fetch(withAuction('/api/my-team'));
             if (teamRes.ok) {
                 const team = await teamRes.json();
                 document.getElementById('my-purse').textContent = team.purse_remaining.toFixed(2);
@@ -0,0 +1,46 @@
+"""Shared fixtures"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+
+class StubUpstream(ThreadingHTTPServer):
+    """Serves `routes` {path with query: (status, content type, body)} and records every path asked for"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.routes = {}
+        self.paths = []
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = unquote(self.path)
+        self.server.paths.append(path)
+        status, content_type, body = self.server.routes.get(path, (404, 'text/plain', b'not found'))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_upstream():
+    """A local HTTP stand-in to pass as `upstream`; set its routes, read back the paths it served"""
+    server = StubUpstream()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,69 @@
+"""Headshots are fetched from the upstream once, stored by content hash and served from disk after"""
+import io
+import os
+import struct
+import sys
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import images
+from images import ImageCache, ImageFetchError
+
+SOURCE = 'https://www.iplt20.com/players/headshots/kohli.png'
+PATH = '/players/headshots/kohli.png'
+
+
+def png_pixel():
+    """A valid 1x1 PNG, small enough to be stored as is"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(b'\x00\xff\x00\x00')) + chunk(b'IEND', b''))
+
+
+def test_fetched_once_then_served_from_disk(tmp_path, stub_upstream):
+    body = png_pixel()
+    stub_upstream.routes[PATH] = (200, 'image/png', body)
+    cache = ImageCache(str(tmp_path), upstream=stub_upstream.url)
+    name = cache.get(SOURCE)
+    assert name == images.fingerprint(body) + '.png' and cache.is_stored(name)
+    assert cache.get(SOURCE) == name and stub_upstream.paths == [PATH]
+    with open(cache.path(name), 'rb') as f:
+        assert f.read() == body
+    # A restart reads index.json instead of fetching again
+    assert ImageCache(str(tmp_path), upstream=stub_upstream.url).cached(SOURCE) == name
+    assert stub_upstream.paths == [PATH]
+
+
+def test_non_images_and_svg_are_refused_and_not_retried_at_once(tmp_path, stub_upstream):
+    stub_upstream.routes[PATH] = (200, 'image/svg+xml', b'<svg xmlns="http://www.w3.org/2000/svg"/>')
+    cache = ImageCache(str(tmp_path), upstream=stub_upstream.url)
+    with pytest.raises(ImageFetchError):
+        cache.get(SOURCE)
+    with pytest.raises(ImageFetchError):
+        cache.get(SOURCE)
+    assert stub_upstream.paths == [PATH] and cache.stats['errors'] == 1
+    assert os.listdir(tmp_path) == []
+
+
+def test_originals_kept_without_pillow(tmp_path, stub_upstream, monkeypatch):
+    monkeypatch.setattr(images, 'Image', None)
+    body = png_pixel() + b'\x00' * 1000  # Trailing bytes: stored unchanged, not decoded
+    stub_upstream.routes[PATH] = (200, 'image/png', body)
+    cache = ImageCache(str(tmp_path), upstream=stub_upstream.url)
+    with open(cache.path(cache.get(SOURCE)), 'rb') as f:
+        assert f.read() == body
+
+
+def test_large_headshots_are_shrunk_to_thumbnails(tmp_path, stub_upstream):
+    Image = pytest.importorskip('PIL.Image')
+    out = io.BytesIO()
+    Image.new('RGB', (600, 400), 'navy').save(out, 'PNG')
+    stub_upstream.routes[PATH] = (200, 'image/png', out.getvalue())
+    cache = ImageCache(str(tmp_path), upstream=stub_upstream.url)
+    with Image.open(cache.path(cache.get(SOURCE))) as stored:
+        assert stored.size == (240, 160)
+    assert cache.stats['stored_bytes'] < cache.stats['fetched_bytes']
@@ -0,0 +1,44 @@
+"""Incomplete squads give up as few XI minimums as possible"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lineup import best_xi
+
+
+class Ratings:
+    """Batters outscore bowlers, so dropping every minimum would pick no bowlers"""
+
+    def of(self, name):
+        if name.startswith('Bowler'):
+            return {'batting': 5.0, 'bowling': 30.0, 'allrounder': 0.0}
+        return {'batting': 70.0, 'bowling': 5.0, 'allrounder': 10.0}
+
+
+def squad(batters, bowlers, keepers=0):
+    return ([{'name': f'Batter {i}', 'category': 'Indian Bat'} for i in range(batters)]
+            + [{'name': f'Bowler {i}', 'category': 'Indian Pace'} for i in range(bowlers)]
+            + [{'name': f'Keeper {i}', 'category': 'Wicketkeepers'} for i in range(keepers)])
+
+
+def roles(xi):
+    return [player['role'] for player in xi['players']]
+
+
+def test_missing_keeper_keeps_the_bowling_minimums():
+    xi = best_xi(squad(12, 5), Ratings())
+    assert xi['unmet'] == ['0/1 wicketkeepers']
+    assert roles(xi).count('bowler') == 5
+
+
+def test_missing_bowlers_keeps_the_keeper():
+    xi = best_xi(squad(12, 2, keepers=1), Ratings())
+    assert 'keeper' in roles(xi)
+    assert roles(xi).count('bowler') == 2
+    assert not any('wicketkeepers' in unmet for unmet in xi['unmet'])
+
+
+def test_complete_squad_meets_every_rule():
+    xi = best_xi(squad(12, 5, keepers=1), Ratings())
+    assert xi['feasible'] and xi['unmet'] == []
@@ -0,0 +1,35 @@
+"""Misspelt surnames still resolve; a different player with a similar name does not"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from names import NameIndex, one_edit_apart
+
+KNOWN = ['Virat Kohli', 'Rohit Sharma', 'Mohit Sharma', 'Shubman Gill', 'Rishabh Pant', 'Hardik Pandya',
+         'Krunal Pandya', 'Jasprit Bumrah']
+
+
+def test_transposed_surname_resolves():
+    index = NameIndex(KNOWN)
+    assert index.match('Virat Kholi')[:2] == ('virat kohli', 'fuzzy')
+    assert index.resolve('Rohit Shamra') == 'rohit sharma'
+
+
+def test_vowel_swapped_surname_resolves():
+    index = NameIndex(KNOWN)
+    assert index.resolve('Shubman Gull') == 'shubman gill'
+    assert index.resolve('Rishabh Punt') == 'rishabh pant'
+    assert index.resolve('Hardik Pandia') == 'hardik pandya'
+
+
+def test_similar_names_of_other_players_stay_unresolved():
+    index = NameIndex(KNOWN)
+    assert index.resolve('Rohit Verma') is None
+    assert index.resolve('Mohit Sharma') == 'mohit sharma'
+    assert NameIndex(['Rohit Sharma']).resolve('Mohit Sharma') is None
+
+
+def test_one_edit_apart():
+    assert one_edit_apart('kohli', 'kholi') and one_edit_apart('gill', 'gull') and one_edit_apart('gill', 'gil')
+    assert not one_edit_apart('kohli', 'hokli') and not one_edit_apart('sharma', 'verma')
@@ -0,0 +1,73 @@
+"""Player cards come from the Wikipedia summary, and the article is scraped only when there is none"""
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_sources import PlayerInfoSources
+
+LEAD = ('Virat Kohli (born 5 November 1988) is an Indian international cricketer who plays for Royal '
+        'Challengers Bengaluru in the Indian Premier League.')
+
+
+def summary(kind='standard', extract=LEAD):
+    return 200, 'application/json', json.dumps({
+        'type': kind, 'extract': extract, 'description': 'Indian cricketer (born 1988)',
+        'thumbnail': {'source': 'https://upload.wikimedia.org/kohli.jpg'}}).encode()
+
+
+def article(lead=LEAD):
+    return 200, 'text/html; charset=UTF-8', f'''<html><body><main>
+        <table class="infobox"><tr><th>Born</th><td>5 November 1988</td></tr>
+        <tr><th>Nickname</th><td>Chiku</td></tr></table>
+        <p>{lead}</p><img class="mw-file-element thumbimage" src="//upload.wikimedia.org/page.jpg">
+        </main></body></html>'''.encode()
+
+
+def search():
+    return 200, 'text/html', b'<ul><li><a href="/players/virat-kohli-253802">Virat Kohli</a></li></ul>'
+
+
+def fetch(stub_upstream, player='Virat Kohli'):
+    sources = PlayerInfoSources(upstream=stub_upstream.url)
+    info, used = sources.fetch(player)
+    return info, used, sources.stats
+
+
+def test_summary_is_used_without_scraping_the_article(stub_upstream):
+    stub_upstream.routes['/api/rest_v1/page/summary/Virat_Kohli'] = summary()
+    stub_upstream.routes['/wiki/Virat_Kohli'] = article()
+    stub_upstream.routes['/search?q=Virat Kohli'] = search()
+    info, used, stats = fetch(stub_upstream)
+    assert used == ['wikipedia_summary', 'cricinfo_search']
+    assert '/wiki/Virat_Kohli' not in stub_upstream.paths and stats['wikipedia_page']['requests'] == 0
+    assert info['description'].startswith('Virat Kohli (born 5 November 1988)')
+    assert info['wikipedia_image'] == 'https://upload.wikimedia.org/kohli.jpg'
+    assert info['nationality'] == 'Indian' and info['birth_info'] == '5 November 1988'
+    assert info['cricinfo_url'].endswith('/players/virat-kohli-253802')
+
+
+@pytest.mark.parametrize('summary_route', [None, summary(kind='disambiguation'), summary(extract='Kohli.')],
+                         ids=['missing', 'disambiguation', 'stub'])
+def test_article_is_scraped_when_the_summary_is_unusable(stub_upstream, summary_route):
+    if summary_route:
+        stub_upstream.routes['/api/rest_v1/page/summary/Virat_Kohli'] = summary_route
+    stub_upstream.routes['/wiki/Virat_Kohli'] = article()
+    info, used, stats = fetch(stub_upstream)
+    assert used == ['wikipedia_page']
+    assert stub_upstream.paths[:2] == ['/api/rest_v1/page/summary/Virat_Kohli', '/wiki/Virat_Kohli']
+    assert info['description'].startswith('Virat Kohli (born') and info['nickname'] == 'Chiku'
+    assert info['wikipedia_image'] == 'https://upload.wikimedia.org/page.jpg'
+    assert stats['wikipedia_summary']['found'] == 0 and stats['wikipedia_page']['found'] == 1
+
+
+def test_unreachable_upstream_raises(stub_upstream):
+    url = stub_upstream.url
+    stub_upstream.shutdown()
+    stub_upstream.server_close()
+    with pytest.raises(requests.RequestException):
+        PlayerInfoSources(upstream=url).fetch('Virat Kohli')
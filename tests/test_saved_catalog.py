@@ -0,0 +1,99 @@
+"""Rows saved as catalog indices follow their players when AUCTION.xlsx changes between runs"""
+import os
+import sys
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as auction_app
+from engine import ClosedLots, SQLiteStore
+from registry import AuctionRegistry
+
+BAT, PACE = 'Indian Bat', 'Indian Pace'
+BATTERS = [f'Batter {name}' for name in 'ABCDEFGH']
+PACERS = [f'Pacer {name}' for name in 'ABCDEF']
+
+
+def write_workbook(path, columns):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for col, (header, players) in enumerate(columns.items(), start=1):
+        sheet.cell(row=1, column=col, value=header)
+        for row, player in enumerate(players, start=2):
+            sheet.cell(row=row, column=col, value=player)
+    workbook.save(path)
+
+
+@pytest.fixture
+def restart(tmp_path, monkeypatch):
+    """restart(columns): write AUCTION.xlsx and start afresh on the same database; returns the main auction"""
+    workbook = str(tmp_path / 'AUCTION.xlsx')
+    monkeypatch.setattr(auction_app, 'EXCEL_FILE', workbook)
+    monkeypatch.setitem(auction_app.app.config, 'DATABASE', str(tmp_path / 'auction.db'))
+    for name in ('raw_player_data', 'player_catalog', 'player_ratings', 'wire_codec', 'catalog_watcher',
+                 'auction_registry'):
+        monkeypatch.setattr(auction_app, name, getattr(auction_app, name))
+    auction_app.init_db()
+
+    def restart(columns):
+        write_workbook(workbook, columns)
+        auction_app.raw_player_data = None
+        auction_app.auction_registry = AuctionRegistry(str(tmp_path / 'rooms'))
+        auction_app.load_raw_data()
+        return auction_app.get_auction('main')
+    return restart
+
+
+def sell(auction, player_name):
+    closed = auction_app.get_engine(auction).closed
+    closed.close(player_name, ClosedLots.SOLD, 1, 2.0, 3, datetime.now())
+    SQLiteStore(auction_app.get_db, auction.auction_id).record_closed_lots(closed)
+
+
+def test_sold_player_stays_sold_after_a_player_is_added(restart):
+    auction = restart({BAT: BATTERS, PACE: PACERS})
+    sell(auction, PACERS[0])  # Its index now belongs to the new batter
+    auction = restart({BAT: BATTERS + ['New Batter'], PACE: PACERS})
+    closed = auction_app.get_closed_lots(auction)
+    assert closed.outcome(PACERS[0]) == 'sold'
+    assert closed.outcome('New Batter') is None
+    assert closed.summary()['sold'] == 1
+
+
+def test_sold_player_stays_sold_after_a_reorder(restart):
+    auction = restart({BAT: BATTERS, PACE: PACERS})
+    sell(auction, BATTERS[0])
+    auction = restart({BAT: BATTERS[::-1], PACE: PACERS})
+    closed = auction_app.get_closed_lots(auction)
+    assert closed.outcome(BATTERS[0]) == 'sold' and closed.outcome(BATTERS[-1]) is None
+
+
+def pools(schedule):
+    return {(category, set_num): schedule.players(category, set_num) for category in (BAT, PACE) for set_num in (1, 2)}
+
+
+def test_schedule_keeps_its_order_after_a_reorder(restart):
+    before = pools(auction_app.get_schedule(restart({BAT: BATTERS, PACE: PACERS})))
+    after = pools(auction_app.get_schedule(restart({BAT: BATTERS[::-1], PACE: PACERS[::-1]})))
+    assert after == before
+
+
+def test_schedule_is_not_reshuffled_when_a_player_is_added(restart):
+    before = pools(auction_app.get_schedule(restart({BAT: BATTERS, PACE: PACERS})))
+    after = pools(auction_app.get_schedule(restart({BAT: BATTERS + ['New Batter'], PACE: PACERS})))
+    assert after[(BAT, 2)] == before[(BAT, 2)] + ['New Batter']
+    assert all(after[pool] == players for pool, players in before.items() if pool != (BAT, 2))
+
+
+def test_lot_on_the_block_keeps_its_place(restart):
+    auction = restart({BAT: BATTERS, PACE: PACERS})
+    pool = auction_app.get_schedule(auction).players(BAT, 1)
+    auction.state.update(status='active', active_pool=f'{BAT}_1', current_category=BAT, current_set=1,
+                         current_player={'name': pool[2]}, current_player_index=2)
+    auction_app.auction_registry.flush()
+    auction = restart({BAT: [player for player in BATTERS if player != pool[0]], PACE: PACERS})
+    schedule = auction_app.get_schedule(auction)
+    assert auction.state['current_player_index'] == 1 and schedule.lot(BAT, 1, 1) == pool[2]
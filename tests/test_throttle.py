@@ -0,0 +1,70 @@
+"""Bid throttle bounds hold however bids name their lot"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import Catalog
+from engine import AuctionEngine, AuctionError, Bidder, MemoryStore, VirtualClock
+from throttle import BidThrottle
+
+CATEGORY = 'Indian Bat'
+PLAYERS = [f'Player {i}' for i in range(10)]
+SECONDS = 10
+TICK = 0.05
+
+
+def make_engine(n_teams):
+    catalog = Catalog({CATEGORY: {'players': PLAYERS, 'total': len(PLAYERS)}})
+    teams = {i + 1: (f'team{i}', f'Team {i}') for i in range(n_teams)}
+    events = []
+    engine = AuctionEngine(catalog, MemoryStore(teams, purse=1e6), broadcast=lambda event, data: events.append(event),
+                           clock=VirtualClock(), rng=random.Random(1), throttle=BidThrottle())
+    bidders = [Bidder(user_id, username, team_name) for user_id, (username, team_name) in teams.items()]
+    engine.start_auction('start', CATEGORY, 1)
+    return engine, bidders, events
+
+
+def flood(engine, honest, abuser, names):
+    """honest bidders at 2 bids/s on the lot on the block, abuser at 20 bids/s naming `names` in turn"""
+    amount = engine.state['current_player']['base_price']
+    for tick in range(int(SECONDS / TICK)):
+        engine.clock.advance(TICK)
+        senders = [(abuser, names[tick % len(names)])]
+        if tick % 10 == 0:
+            senders += [(bidder, engine.state['current_player']['name']) for bidder in honest]
+        for bidder, name in senders:
+            try:
+                engine.place_bid(bidder, name, amount)
+                amount += 0.25
+            except AuctionError:
+                pass
+
+
+def test_foreign_lot_names_do_not_refill_the_lot_bucket():
+    engine, bidders, events = make_engine(21)
+    throttle = engine.throttle
+    flood(engine, bidders[1:], bidders[0], ['Nobody'])
+    assert events.count('new_bid') <= throttle.lot_burst + throttle.lot_rate * SECONDS
+
+
+def test_stale_lot_names_do_not_refill_the_lot_bucket():
+    engine, bidders, events = make_engine(21)
+    throttle = engine.throttle
+    stale = engine.state['current_player']['name']
+    engine.next_player()
+    flood(engine, bidders[1:], bidders[0], [stale, 'Nobody', PLAYERS[-1]])
+    assert events.count('new_bid') <= throttle.lot_burst + throttle.lot_rate * SECONDS
+
+
+def test_lot_bucket_starts_full_for_the_next_lot():
+    engine, bidders, events = make_engine(41)
+    flood(engine, bidders[1:21], bidders[0], [engine.state['current_player']['name']])
+    engine.next_player()
+    before = events.count('new_bid')
+    amount = engine.state['current_player']['base_price']
+    for bidder in bidders[21:21 + engine.throttle.lot_burst]:  # Fresh bidders: only the lot bucket can say no
+        engine.place_bid(bidder, engine.state['current_player']['name'], amount)
+        amount += 0.25
+    assert events.count('new_bid') - before == engine.throttle.lot_burst
@@ -0,0 +1,93 @@
+"""
+Token-bucket bid throttling - per bidder and per lot
+
+Each bidder has a bucket of `user_burst` tokens refilled at `user_rate` per
+second, and the lot on the block has one shared bucket (`lot_burst`,
+`lot_rate`). A bid spends one token from each; with either bucket empty it
+is turned away before any database work or broadcast. A client spamming
+the bid button therefore costs one bucket check per event, and the
+room-wide `new_bid` volume per lot is bounded no matter how many bidders
+there are. The last LOT_RESERVE lot tokens are kept for bidders whose own
+bucket is full, so a few busy clients can't crowd out a team that has not
+bid recently. A bucket is two floats, so memory is O(1) per active bidder;
+full (idle) buckets are dropped once there are many.
+"""
+import threading
+
+USER_RATE = 2.0    # Sustained bids per second per bidder
+USER_BURST = 5     # Bids a bidder may place back to back
+LOT_RATE = 10.0    # Sustained bids per second on one lot, all bidders together
+LOT_BURST = 20
+LOT_RESERVE = 5    # Lot tokens only bidders with a full bucket (not bidding lately) may use
+MAX_IDLE_BUCKETS = 1000
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, tokens, now):
+        self.tokens = tokens
+        self.updated = now
+
+    def refill(self, rate, capacity, now):
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        return self.tokens
+
+
+class BidThrottle:
+    """Per-bidder and per-lot token buckets for one auction
+
+    `on_throttle(scope)` is called for every turned-away bid, with scope
+    'user' or 'lot' (e.g. to count it in metrics).
+    """
+
+    def __init__(self, user_rate=USER_RATE, user_burst=USER_BURST, lot_rate=LOT_RATE, lot_burst=LOT_BURST,
+                 lot_reserve=LOT_RESERVE, on_throttle=None):
+        self.user_rate, self.user_burst = user_rate, user_burst
+        self.lot_rate, self.lot_burst, self.lot_reserve = lot_rate, lot_burst, lot_reserve
+        self.on_throttle = on_throttle
+        self.users = {}  # user_id -> TokenBucket
+        self.lot = None  # Lot the lot bucket belongs to
+        self.lot_bucket = None
+        self.throttled = {'user': 0, 'lot': 0}
+        self.lock = threading.Lock()
+
+    def admit(self, user_id, lot, now):
+        """None if the bid may go ahead (spending its tokens), else the scope that is exhausted
+
+        `lot` must be the lot on the block (the caller checks the bid is for it
+        first): the lot bucket starts full whenever it changes.
+        """
+        with self.lock:
+            bucket = self.users.get(user_id)
+            if bucket is None:
+                if len(self.users) >= MAX_IDLE_BUCKETS:
+                    self._prune(now)
+                bucket = self.users[user_id] = TokenBucket(self.user_burst, now)
+            if lot != self.lot:
+                self.lot, self.lot_bucket = lot, TokenBucket(self.lot_burst, now)
+
+            scope = None
+            tokens = bucket.refill(self.user_rate, self.user_burst, now)
+            floor = 0 if tokens >= self.user_burst else self.lot_reserve
+            if tokens < 1:
+                scope = 'user'
+            else:
+                # Every attempt costs the bidder a token, so lot rejections can't refill a flooder's bucket
+                bucket.tokens -= 1
+                if self.lot_bucket.refill(self.lot_rate, self.lot_burst, now) < floor + 1:
+                    scope = 'lot'
+                else:
+                    self.lot_bucket.tokens -= 1
+                    return None
+            self.throttled[scope] += 1
+        if self.on_throttle:
+            self.on_throttle(scope)
+        return scope
+
+    def _prune(self, now):
+        """Drop buckets that have refilled completely (their bidders went quiet)"""
+        for user_id, bucket in list(self.users.items()):
+            if bucket.refill(self.user_rate, self.user_burst, now) >= self.user_burst:
+                del self.users[user_id]
@@ -0,0 +1,18 @@
+"""
+Upstream override - <NAME>_UPSTREAM=http://localhost:89xx sends a feature's outbound fetches to a local stand-in
+"""
+import os
+from urllib.parse import urlsplit
+
+
+def upstream_from_env(name):
+    """Stand-in base URL set in <name>_UPSTREAM (e.g. IMAGE_UPSTREAM), or None"""
+    return os.environ.get(f'{name}_UPSTREAM') or None
+
+
+def upstream_url(url, upstream=None):
+    """url with its scheme and host replaced by upstream's (path and query kept); url itself without one"""
+    if not upstream:
+        return url
+    parts = urlsplit(url)
+    return upstream.rstrip('/') + parts.path + (f'?{parts.query}' if parts.query else '')
@@ -0,0 +1,116 @@
+"""
+Compact wire encoding for the high-volume Socket.IO events (opt-in per client)
+
+Clients that connect with ?encoding=compact receive new_bid, player_sold and
+auction_state as positional arrays instead of keyed objects. Players are
+sent as catalog indices and teams as user ids. Timestamps are integer
+milliseconds since an epoch, and field names are dropped. The lookup tables
+(player names, base prices, categories, teams) are sent once as
+`wire_dictionary` on connect. Teams first seen later arrive as `wire_teams`.
+
+    new_bid        [player, user_id, amount, ms]
+    player_sold    [player, user_id, price, remaining_purse]
+    auction_state  [status, player, index, category, set, lots_remaining, start_ms,
+                    [[player, [user_id, amount, ms, ...]], ...], [sold, unsold, spent], pool_active]
+
+`player` is a catalog index, or the plain name for players not in the catalog.
+"""
+from datetime import datetime
+
+VERSION = 2
+STATUSES = ('waiting', 'active', 'paused', 'completed')
+ENCODED_EVENTS = ('new_bid', 'player_sold', 'auction_state')
+
+
+class WireCodec:
+    """Encodes auction events against interned player and team tables"""
+
+    def __init__(self, catalog, epoch=None):
+        self.catalog = catalog
+        self.player_ids = {}
+        for i, name in enumerate(catalog.names):
+            self.player_ids.setdefault(name, i)
+        self.categories = list(catalog.data)
+        self.category_ids = {category: i for i, category in enumerate(self.categories)}
+        self.teams = {}  # user_id -> (username, team_name)
+        # Midnight today keeps the millisecond offsets short
+        self.epoch = epoch or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def dictionary(self):
+        """Lookup tables a compact client needs before it can decode anything"""
+        names = self.catalog.names
+        return {
+            'version': VERSION,
+            'epoch': self.epoch.isoformat(),
+            'statuses': STATUSES,
+            'categories': self.categories,
+            'players': names,
+            'base_prices': [self.catalog.base_price(name) for name in names],
+            'critical': [1 if self.catalog.is_critical(name) else 0 for name in names],
+            'teams': {user_id: list(team) for user_id, team in self.teams.items()}
+        }
+
+    def register_teams(self, rows):
+        """Add (user_id, username, team_name) rows; returns the ones that were new or renamed"""
+        added = {}
+        for user_id, username, team_name in rows:
+            if self.teams.get(user_id) != (username, team_name):
+                self.teams[user_id] = (username, team_name)
+                added[user_id] = [username, team_name]
+        return added
+
+    def _player(self, name):
+        if name is None:
+            return None
+        return self.player_ids.get(name, name)
+
+    def _ms(self, timestamp):
+        if not timestamp:
+            return None
+        return int((datetime.fromisoformat(timestamp) - self.epoch).total_seconds() * 1000)
+
+    def encode(self, event, data):
+        """(payload, new_teams) for an encoded event; new_teams must reach clients first"""
+        new_teams = {}
+        if event == 'new_bid':
+            bid = data['bid']
+            new_teams = self.register_teams([(bid['user_id'], bid['username'], bid['team_name'])])
+            payload = [self._player(data['player_name']), bid['user_id'], bid['amount'], self._ms(bid['timestamp'])]
+        elif event == 'player_sold':
+            new_teams = self.register_teams([(data['user_id'], data['buyer'], data['team_name'])])
+            payload = [self._player(data['player_name']), data['user_id'], data['price'], data['remaining_purse']]
+        elif event == 'auction_state':
+            payload, new_teams = self._encode_state(data)
+        else:
+            raise ValueError(f'No compact encoding for {event}')
+        return payload, new_teams
+
+    def _encode_state(self, state):
+        seen = {}  # user_id -> (username, team_name)
+        bids = []
+        for player_name, entries in state['bids'].items():
+            if not entries:
+                continue
+            flat = []
+            for bid in entries:
+                seen[bid['user_id']] = (bid['username'], bid['team_name'])
+                flat.extend((bid['user_id'], bid['amount'], self._ms(bid['timestamp'])))
+            bids.append([self._player(player_name), flat])
+        closed = state['closed']
+        new_teams = self.register_teams([(user_id,) + team for user_id, team in seen.items()])
+
+        current = state['current_player']
+        category = state['current_category']
+        payload = [
+            STATUSES.index(state['status']) if state['status'] in STATUSES else state['status'],
+            self._player(current['name']) if current else None,
+            state['current_player_index'],
+            self.category_ids.get(category, category) if category else None,
+            state['current_set'] or 0,
+            state.get('lots_remaining', 0),
+            self._ms(state['start_time']),
+            bids,
+            [closed['sold'], closed['unsold'], closed['spent']],
+            1 if state['active_pool'] else 0
+        ]
+        return payload, new_teams
@@ -11,13 +11,14 @@ if path not in sys.path:
 os.chdir(path)
 
 # Import the Flask app and initialization functions
-from app import app, socketio, init_db, load_raw_data
+from app import app, socketio, init_db, load_raw_data, prepare_assets
 
 # Initialize database and load player data on first import
 # (This happens when PythonAnywhere loads the WSGI file)
 try:
     init_db()
     load_raw_data()
+    prepare_assets()
 except Exception as e:
     # If database already exists or data already loaded, that's fine
     # Only log if it's a real error (not just "already exists")